@@ -0,0 +1,105 @@
+"""Comparative benchmark of the MySQL drivers supported by bh_database.
+
+Times :py:meth:`~bh_database.base_table.ReadOnlyTable.run_select_sql`, 
+:py:meth:`~bh_database.base_table.WriteCapableTable.run_stored_proc` and
+:py:meth:`~bh_database.base_table.WriteCapableTable.write_to_database` against the 
+MySQL *Employees Sample Database* for each of the following configurations:
+
+    * mysql-connector-python, pure Python implementation, buffered and unbuffered cursors.
+    * mysql-connector-python, C extension, buffered and unbuffered cursors.
+    * mysqlclient (MySQLdb), buffered and unbuffered cursors.
+
+Configurations whose driver is not installed are skipped. The write benchmark 
+updates existing employees and always rolls back.
+
+To run from the repo root directory:
+
+    python benchmarks/bench_mysql_drivers.py [iterations]
+
+The server part of the connection URL can be set via environment variable
+``BH_BENCH_MYSQL_SERVER``, e.g. ``root:<password>@localhost/employees``.
+"""
+
+import os
+import sys
+import time
+
+from bh_database.core import Database
+from bh_database.constant import (
+    BH_REC_STATUS_FIELDNAME,
+    BH_RECORD_STATUS_MODIFIED,
+)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests import MYSQL_DB_URL
+from tests.employees import (
+    Employees,
+    SELECT_EMPLOYEES,
+)
+
+SERVER = os.environ.get('BH_BENCH_MYSQL_SERVER', MYSQL_DB_URL.split('://', 1)[1])
+
+CONFIGURATIONS = [
+    ('mysqlconnector pure, buffered', 'mysql+mysqlconnector', {'use_pure': True, 'buffered': True}),
+    ('mysqlconnector pure, unbuffered', 'mysql+mysqlconnector', {'use_pure': True, 'buffered': False}),
+    ('mysqlconnector C, buffered', 'mysql+mysqlconnector', {'use_pure': False, 'buffered': True}),
+    ('mysqlconnector C, unbuffered', 'mysql+mysqlconnector', {'use_pure': False, 'buffered': False}),
+    ('mysqldb, buffered', 'mysql+mysqldb', {'buffered': True}),
+    ('mysqldb, unbuffered', 'mysql+mysqldb', {'buffered': False}),
+]
+
+def bench_select(iterations: int) -> float:
+    employees = Employees()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        employees.run_select_sql(SELECT_EMPLOYEES, True)
+    return time.perf_counter() - start
+
+def bench_stored_proc(iterations: int) -> float:
+    employees = Employees()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        employees.run_stored_proc('get_employees', ['%nas%', '%an'], True)
+    return time.perf_counter() - start
+
+def bench_write(iterations: int) -> float:
+    employees = Employees()
+    records = employees.run_select_sql(SELECT_EMPLOYEES, True).data
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        data = []
+        for record in records:
+            data.append({'emp_no': record['emp_no'], 'first_name': record['first_name'], 
+                         BH_REC_STATUS_FIELDNAME: BH_RECORD_STATUS_MODIFIED})
+
+        Employees.begin_transaction(Employees)
+        employees.write_to_database(data)
+        Employees.rollback_transaction(Employees)
+    return time.perf_counter() - start
+
+def run(iterations: int):
+    print(f"{'configuration':<36}{'select':>12}{'stored proc':>14}{'write':>12}  (seconds, {iterations} iterations)")
+
+    for name, driver, options in CONFIGURATIONS:
+        Database.disconnect()
+        try:
+            Database.connect(f"{driver}://{SERVER}", None, **options)
+        except Exception as e:
+            print(f"{name:<36}skipped: {str(e).splitlines()[0]}")
+            continue
+
+        # Warm up: first calls establish pooled connection, compile statements.
+        bench_select(1)
+        bench_stored_proc(1)
+
+        print(f"{name:<36}{bench_select(iterations):>12.3f}{bench_stored_proc(iterations):>14.3f}"
+              f"{bench_write(iterations):>12.3f}")
+
+    Database.disconnect()
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
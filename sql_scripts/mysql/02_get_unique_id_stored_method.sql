@@ -27,7 +27,8 @@ begin
     unique_id
   where 
     (tablename = PM_TABLENAME)
-    and (columnname = PM_COLUMNNAME);
+    and (columnname = PM_COLUMNNAME)
+  for update;
 
   if isnull(LocalID) then #1
     set LocalID = 1;
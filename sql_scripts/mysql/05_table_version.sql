@@ -0,0 +1,63 @@
+/*
+    Description: Table versions, for cache invalidation. 
+       See bh_database.notifications.TableVersionPoller.
+
+    MySQL has no change notifications. Instead, the version of a table is bumped
+    on every change, and the poller reads table versions periodically. 
+
+    Bump versions application-side: set BaseTable.version_table = 'table_version'
+    on the table classes to version. The version is bumped after the writing 
+    transaction commits, in autocommit mode: the version row is locked only for 
+    the duration of the bump statement.
+
+    Alternatively, for changes made outside of the application, triggers can bump 
+    the version. MySQL triggers are row level only, and run inside the writing
+    transaction: the version row of the table stays locked until the transaction
+    ends, so concurrent writers to the table serialise on it, and transactions 
+    writing to several versioned tables in different orders may deadlock. Enable
+    the triggers at the end of this script only for rarely written tables. They are
+    created per table and per event: replace employees with the table to version.
+
+    To call ( tests ):
+
+    select * from table_version;
+
+    To drop: 
+
+    drop trigger if exists employees_version_ai;
+    drop trigger if exists employees_version_au;
+    drop trigger if exists employees_version_ad;
+    drop table if exists table_version;
+*/
+
+CREATE TABLE IF NOT EXISTS `table_version` (
+  `tablename` varchar(64) NOT NULL,
+  `version` bigint NOT NULL DEFAULT 0,
+  PRIMARY KEY (`tablename`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+/*
+    Optional triggers, see the serialisation cost above.
+
+delimiter //
+
+drop trigger if exists employees_version_ai; //
+
+create trigger employees_version_ai after insert on employees for each row
+  insert into table_version (tablename, version) values ('employees', 1)
+    on duplicate key update version = version + 1; //
+
+drop trigger if exists employees_version_au; //
+
+create trigger employees_version_au after update on employees for each row
+  insert into table_version (tablename, version) values ('employees', 1)
+    on duplicate key update version = version + 1; //
+
+drop trigger if exists employees_version_ad; //
+
+create trigger employees_version_ad after delete on employees for each row
+  insert into table_version (tablename, version) values ('employees', 1)
+    on duplicate key update version = version + 1; //
+
+delimiter ;
+*/
@@ -0,0 +1,64 @@
+/*
+    Description: Get a block of consecutive unique integer Ids based on a 
+       table name and a column name, in a single call. Shares table unique_id
+       with get_unique_id(...). See bh_database.unit_of_work.UnitOfWork.
+
+    Returns the first Id of the block: Ids from the returned value to the 
+    returned value + PM_COUNT - 1 are allocated to the caller.
+	   
+    To drop: 
+
+    drop function if exists get_unique_id_block;
+   
+    To call ( tests ):
+	
+    select get_unique_id_block('employees', 'emp_no', 10);
+*/
+
+delimiter //
+
+drop function if exists get_unique_id_block; //
+
+create function get_unique_id_block(PM_TABLENAME varchar(64), PM_COLUMNNAME varchar(64), PM_COUNT int) returns int
+begin
+  declare LocalID int;
+
+  select
+    id
+  into
+    LocalID
+  from
+    unique_id
+  where 
+    (tablename = PM_TABLENAME)
+    and (columnname = PM_COLUMNNAME)
+  for update;
+
+  if isnull(LocalID) then #1
+    set LocalID = 1;
+
+    insert into unique_id
+    (
+      tablename,
+      columnname,
+      id
+    )
+    values
+    (
+      PM_TABLENAME,
+      PM_COLUMNNAME,
+      LocalID + PM_COUNT
+    );
+
+  else
+    update
+      unique_id
+    set
+      id = LocalID + PM_COUNT
+    where
+      (tablename = PM_TABLENAME)
+      and (columnname = PM_COLUMNNAME);
+  end if; #1
+
+  return LocalID;
+end; //
@@ -0,0 +1,112 @@
+/*
+    Description: Migrate Id generation of a table from table unique_id to a 
+       sequence, or to an AUTO_INCREMENT column. See bh_database.id_generators.
+
+    MySQL has no sequences. Table bh_sequence holds one row per sequence, 
+    named <table>_<column>_seq, which SequenceIdGenerator updates with 
+    LAST_INSERT_ID(expr) in autocommit mode. last_id is the last allocated Id.
+
+    Both procedures seed the next Id from table unique_id, or from the largest 
+    Id in the table if that is larger: Ids never go backward.
+
+    bh_create_id_sequence(...) creates, or re-seeds, the row of the table's 
+    sequence, for SequenceIdGenerator.
+
+    bh_enable_auto_increment(...) makes the column AUTO_INCREMENT, for 
+    IdentityIdGenerator. Explicit Ids are still accepted. The column must be 
+    the primary key, or the first column of an index.
+
+    IdentityIdGenerator requires innodb_autoinc_lock_mode 0 or 1, so that a 
+    multi-row INSERT gets consecutive values:
+
+    select @@innodb_autoinc_lock_mode;
+
+    To call ( tests ):
+
+    call bh_create_id_sequence('employees', 'emp_no');
+    select * from bh_sequence;
+
+    call bh_enable_auto_increment('employees', 'emp_no');
+
+    To drop: 
+
+    drop procedure if exists bh_create_id_sequence;
+    drop procedure if exists bh_enable_auto_increment;
+    drop procedure if exists bh_next_id_seed;
+    drop table if exists bh_sequence;
+*/
+
+CREATE TABLE IF NOT EXISTS `bh_sequence` (
+  `name` varchar(200) NOT NULL,
+  `last_id` bigint NOT NULL,
+  PRIMARY KEY (`name`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+delimiter //
+
+drop procedure if exists bh_next_id_seed; //
+
+create procedure bh_next_id_seed(PM_TABLENAME varchar(64), PM_COLUMNNAME varchar(64), out PM_NEXT bigint)
+begin
+  declare LocalID bigint;
+
+  select
+    id
+  into
+    LocalID
+  from
+    unique_id
+  where 
+    (tablename = PM_TABLENAME)
+    and (columnname = PM_COLUMNNAME);
+
+  set @bh_max_id = null;
+  set @bh_sql = concat('select max(`', PM_COLUMNNAME, '`) into @bh_max_id from `', PM_TABLENAME, '`');
+  prepare stmt from @bh_sql;
+  execute stmt;
+  deallocate prepare stmt;
+
+  set PM_NEXT = greatest(ifnull(LocalID, 1), ifnull(@bh_max_id, 0) + 1);
+end; //
+
+drop procedure if exists bh_create_id_sequence; //
+
+create procedure bh_create_id_sequence(PM_TABLENAME varchar(64), PM_COLUMNNAME varchar(64))
+begin
+  declare LocalNext bigint;
+
+  call bh_next_id_seed(PM_TABLENAME, PM_COLUMNNAME, LocalNext);
+
+  insert into bh_sequence (name, last_id)
+  values (concat(PM_TABLENAME, '_', PM_COLUMNNAME, '_seq'), LocalNext - 1)
+  on duplicate key update last_id = greatest(last_id, LocalNext - 1);
+end; //
+
+drop procedure if exists bh_enable_auto_increment; //
+
+create procedure bh_enable_auto_increment(PM_TABLENAME varchar(64), PM_COLUMNNAME varchar(64))
+begin
+  declare LocalNext bigint;
+  declare LocalType varchar(64);
+
+  call bh_next_id_seed(PM_TABLENAME, PM_COLUMNNAME, LocalNext);
+
+  select
+    column_type
+  into
+    LocalType
+  from
+    information_schema.columns
+  where
+    (table_schema = database())
+    and (table_name = PM_TABLENAME)
+    and (column_name = PM_COLUMNNAME);
+
+  set @bh_sql = concat('alter table `', PM_TABLENAME, '` modify `', PM_COLUMNNAME, '` ', 
+                       LocalType, ' not null auto_increment, auto_increment = ', LocalNext);
+  prepare stmt from @bh_sql;
+  execute stmt;
+  deallocate prepare stmt;
+end; //
+
+delimiter ;
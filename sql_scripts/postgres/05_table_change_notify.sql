@@ -0,0 +1,58 @@
+/*
+    Description: Table change notifications, for cache invalidation. 
+       See bh_database.notifications.PostgreSQLChangeListener.
+
+    After any INSERT, UPDATE, DELETE or TRUNCATE statement on a table with 
+    notifications enabled, a NOTIFY is sent on channel bh_table_changes, the 
+    payload is the table name. Notifications are statement level: a statement
+    which changes many rows sends only one. Notifications are delivered when 
+    the transaction commits, and not at all if it rolls back.
+
+    To enable notifications on a table ( tests ):
+
+    select bh_enable_change_notify('employees');
+
+    To disable:
+
+    select bh_disable_change_notify('employees');
+
+    To drop:
+
+    drop function bh_enable_change_notify(varchar);
+    drop function bh_disable_change_notify(varchar);
+    drop function bh_notify_table_change();
+*/
+
+create or replace function bh_notify_table_change() 
+returns trigger
+language plpgsql
+as
+$$
+begin
+  perform pg_notify('bh_table_changes', TG_TABLE_NAME);
+  return null;
+end;
+$$;
+
+create or replace function bh_enable_change_notify( pmTableName varchar(64) ) 
+returns void
+language plpgsql
+as
+$$
+begin
+  execute format('drop trigger if exists bh_change_notify on %I', pmTableName);
+
+  execute format('create trigger bh_change_notify after insert or update or delete or truncate '
+                 'on %I for each statement execute function bh_notify_table_change()', pmTableName);
+end;
+$$;
+
+create or replace function bh_disable_change_notify( pmTableName varchar(64) ) 
+returns void
+language plpgsql
+as
+$$
+begin
+  execute format('drop trigger if exists bh_change_notify on %I', pmTableName);
+end;
+$$;
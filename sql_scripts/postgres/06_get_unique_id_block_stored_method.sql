@@ -0,0 +1,33 @@
+/*
+    Description: Get a block of consecutive unique integer Ids based on a 
+       table name and a column name, in a single call. Shares table unique_id
+       with get_unique_id(...). See bh_database.unit_of_work.UnitOfWork.
+
+    Returns the first Id of the block: Ids from the returned value to the 
+    returned value + pmCount - 1 are allocated to the caller.
+
+    To drop: 
+
+    drop function get_unique_id_block(varchar,varchar,int);
+
+    To call ( tests ):
+
+    select get_unique_id_block('employees', 'emp_no', 10) emp_no;
+*/
+
+create or replace function get_unique_id_block( pmTableName varchar(64), pmColumnName varchar(64), pmCount int ) 
+returns int
+language plpgsql
+as
+$$
+declare 
+    LocalId int;
+begin
+  insert into unique_id ( tablename, columnname, ID )
+  values ( pmTableName, pmColumnName, 1 + pmCount )
+  on conflict ( tablename, columnname ) do update set ID = unique_id.ID + pmCount
+  returning ID - pmCount into LocalId;
+
+  return LocalId;
+end;
+$$
@@ -0,0 +1,84 @@
+/*
+    Description: Migrate Id generation of a table from table unique_id to a 
+       native sequence, or to an IDENTITY column. See bh_database.id_generators.
+
+    Both functions seed the next Id from table unique_id, or from the largest 
+    Id in the table if that is larger: Ids never go backward.
+
+    bh_create_id_sequence(...) creates sequence <table>_<column>_seq, for 
+    SequenceIdGenerator. Running it again re-seeds the sequence.
+
+    bh_enable_id_identity(...) makes the column GENERATED BY DEFAULT AS IDENTITY, 
+    for IdentityIdGenerator. Explicit Ids are still accepted. The column must 
+    not already have a default, e.g. be serial.
+
+    To call ( tests ):
+
+    select bh_create_id_sequence('employees', 'emp_no');
+    select nextval('employees_emp_no_seq');
+
+    select bh_enable_id_identity('employees', 'emp_no');
+
+    To drop:
+
+    drop function bh_create_id_sequence(varchar,varchar);
+    drop function bh_enable_id_identity(varchar,varchar);
+    drop function bh_next_id_seed(varchar,varchar);
+*/
+
+create or replace function bh_next_id_seed( pmTableName varchar(64), pmColumnName varchar(64) ) 
+returns bigint
+language plpgsql
+as
+$$
+declare 
+    LocalId bigint;
+    LocalMax bigint;
+begin
+  select 
+    ID into LocalId
+  from
+    unique_id
+  where
+    ( tablename = pmTableName ) and ( columnname = pmColumnName );
+
+  execute format('select max(%I) from %I', pmColumnName, pmTableName) into LocalMax;
+
+  return greatest(coalesce(LocalId, 1), coalesce(LocalMax, 0) + 1);
+end;
+$$;
+
+create or replace function bh_create_id_sequence( pmTableName varchar(64), pmColumnName varchar(64) ) 
+returns bigint
+language plpgsql
+as
+$$
+declare 
+    LocalSequence varchar(200) := pmTableName || '_' || pmColumnName || '_seq';
+    LocalNext bigint := bh_next_id_seed(pmTableName, pmColumnName);
+begin
+  execute format('create sequence if not exists %I as bigint', LocalSequence);
+
+  perform setval(quote_ident(LocalSequence), LocalNext, false);
+
+  return LocalNext;
+end;
+$$;
+
+create or replace function bh_enable_id_identity( pmTableName varchar(64), pmColumnName varchar(64) ) 
+returns bigint
+language plpgsql
+as
+$$
+declare 
+    LocalNext bigint := bh_next_id_seed(pmTableName, pmColumnName);
+begin
+  execute format('alter table %I alter column %I add generated by default as identity', 
+                 pmTableName, pmColumnName);
+
+  execute format('alter table %I alter column %I restart with %s', 
+                 pmTableName, pmColumnName, LocalNext);
+
+  return LocalNext;
+end;
+$$;
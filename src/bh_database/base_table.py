@@ -25,13 +25,29 @@ Relevant test modules:
     * ./tests/test_31_base_table_exception_mysql.py
 """
 
+import time
+import uuid
+import decimal
+import datetime
 from http import HTTPStatus
-from contextlib import closing
+from contextlib import (
+    closing,
+    contextmanager,
+)
 
 from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 
 from sqlalchemy import (
+    Column,
+    MetaData,
+    Table,
+    and_,
+    or_,
+    insert,
     inspect,
+    select,
+    tuple_,
     update,
 )
 
@@ -50,22 +66,124 @@ from bh_database.core import(
     Database,
     DatabaseType,
     BaseSQLAlchemy,
+    BH_AFTER_COMMIT_KEY,
+)
+
+from bh_database.batch_loader import BatchLoader
+
+from bh_database.cache import (
+    CacheBackend,
+    make_key,
 )
 
+from bh_database.coalesce import (
+    SingleFlight,
+    make_flight_key,
+)
+
+from bh_database.request_scope import current_scope
+
+from bh_database.id_generators import IdGenerator
+
 from bh_database.constant import (
     BH_UNSUPPORTED_DATABASE_MSG,
     BH_REC_STATUS_FIELDNAME,
     BH_RECORD_STATUS_NEW,
     BH_RECORD_STATUS_MODIFIED,
+    BH_RECORD_STATUS_DELETED,
     BH_NEXT_ID_NO_RESULT_MSG,
     BH_STORED_PROC_NO_RESULT_SET_MSG,
     BH_SQL_NO_DATA_MSG,
     BH_RETRIEVED_SUCCESSFUL_MSG,
     BH_SAVED_SUCCESSFUL_MSG,
+    BH_DELETED_SUCCESSFUL_MSG,
+    BH_SAVED_PARTIALLY_MSG,
 )
 
 from bh_database import logger
 
+def _serialise(data: list) -> list:
+    """JSON round trip a list of records, so that values such as dates and decimals are
+    presented the same way for all methods which return data.
+    """
+    return json.loads(json.dumps(data, use_decimal=True, default=json_funcs.serialise))
+
+def _bump_version(version_table: str, tablename: str) -> None:
+    """Bump the version of a table in the table versions table, see 
+    :attr:`~BaseTable.version_table`. In autocommit mode, on a connection of its own: the 
+    row is locked only for the duration of the statement.
+    """
+    bump = text(f"update {version_table} set version = version + 1 where tablename = :tablename")
+    params = {'tablename': tablename}
+
+    try:
+        with Database.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            if (connection.execute(bump, params).rowcount > 0): return
+
+            try:
+                connection.execute(text(f"insert into {version_table} (tablename, version) "
+                                        "values (:tablename, 1)"), params)
+            except IntegrityError:
+                # Inserted by another process meanwhile.
+                connection.execute(bump, params)
+
+    except Exception as e:
+        logger.error(f"Version of {tablename} not bumped: {str(e)}")
+
+def _chunks(items: list, size: int):
+    for idx in range(0, len(items), size):
+        yield items[idx:idx + size]
+
+def _coerce(column, value):
+    """A value as the Python type of a column, e.g. an ISO date string as a ``date``, so 
+    that it compares equal to the value read from the database. A value which can not be 
+    converted is returned as is.
+    """
+    if (value == None): return None
+
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+
+    if (python_type is datetime.date) and isinstance(value, datetime.datetime): return value.date()
+    if isinstance(value, python_type): return value
+
+    try:
+        if (python_type in (datetime.date, datetime.datetime, datetime.time)):
+            return python_type.fromisoformat(value) if isinstance(value, str) else value
+        if (python_type is decimal.Decimal): return decimal.Decimal(str(value))
+        if (python_type in (int, float, str)): return python_type(value)
+    except (TypeError, ValueError, decimal.InvalidOperation):
+        pass
+
+    return value
+
+def _changed_values(typed: dict, row: dict, names: list) -> dict:
+    """Values of a record which differ from an existing row, compared as Python values 
+    of their columns, see :py:meth:`~BaseTable._typed`.
+
+    :param dict typed: the typed record.
+
+    :param dict row: the typed existing row. A column missing from it is changed.
+
+    :param list names: the names of the columns to compare.
+
+    :return: the changed typed values.
+    """
+    return {name: typed[name] for name in names 
+            if (name not in row) or (typed[name] != row[name])}
+
+def _group_by_columns(records: list) -> list:
+    """Group records by their set of columns, so that each group can be written with 
+    a single batched statement.
+
+    :return: list of lists of records.
+    """
+    groups = {}
+    for record in records: groups.setdefault(frozenset(record.keys()), []).append(record)
+    return list(groups.values())
+
 class BaseTable(BaseSQLAlchemy):
     """An abstract base model (table).
 
@@ -103,6 +221,40 @@ class BaseTable(BaseSQLAlchemy):
     """
     __abstract__ = True
 
+    #: Class attribute. When set, is of type :py:class:`~bh_database.cache.CacheBackend`.
+    #: The process-level (L2) cache for records read by :py:meth:`~get_by_pk` and
+    #: :py:meth:`~get_many_by_pk`. Set it on a table class to enable caching for that 
+    #: table, or on :py:class:`BaseTable` for all tables. Records read within a transaction
+    #: which has written are not cached: they may yet be rolled back.
+    l2_cache: CacheBackend = None
+
+    #: Class attribute. The name of the table versions table polled by 
+    #: :py:class:`~bh_database.notifications.TableVersionPoller`, e.g. ``'table_version'``. 
+    #: When set, the version of this table is bumped after each committed write, outside 
+    #: of the writing transaction: concurrent writers do not serialise on the version row.
+    #: ``None``, the default, for no versioning.
+    version_table: str = None
+
+    #: Class attribute. The maximum number of keys in a single ``WHERE pk IN (...)``.
+    pk_chunk_size = 1000
+
+    #: Class attribute. Single-flight group, see :py:mod:`bh_database.coalesce`. ``None``, 
+    #: the default, to not coalesce. Set it on a table class to coalesce identical concurrent 
+    #: standalone reads of that table, or on :py:class:`BaseTable` for all tables.
+    single_flight: SingleFlight = None
+
+    #: Class attribute. ``True``, the default, to select, update and delete records by 
+    #: composite keys with row value predicates, e.g. ``WHERE (a, b) IN ((?, ?), ...)``, 
+    #: which PostgreSQL and MySQL support. ``False`` to use ``OR`` of ``AND`` predicates, 
+    #: for databases without row values.
+    tuple_in: bool = True
+
+    #: Class attribute. ``True``, the default, to run stand-alone reads, i.e. called with 
+    #: ``auto_session=True`` and no transaction in progress, in driver autocommit mode where 
+    #: the driver allows it, see :py:meth:`~bh_database.drivers.DriverAdapter.begin_read`.
+    #: ``False`` to run them within a transaction.
+    autocommit_reads: bool = True
+
     def __get_primary_keys(self) -> list:
         """Collect primary key column names and return all as a list.
 
@@ -135,11 +287,16 @@ class BaseTable(BaseSQLAlchemy):
         """
         self.__dict__.update(kwargs)
 
-    def as_dict(self) -> dict:
+    def as_dict(self, columns: list = None) -> dict:
         """Convert all column-value pairs of model instance to a dictionary.
 
         For a full example usage, please see test module ``./tests/test_17_base_table_methods.py``.
 
+        :param list columns: optional. Names of the columns to convert. If not specified, all 
+            columns are converted, except those deferred and not yet loaded, e.g. columns 
+            excluded by :py:meth:`~bh_database.core.BaseQuery.columns`: converting them would 
+            load them from the database one instance at a time.
+
         :References:
             
             * `How to serialize SqlAlchemy result to JSON? \
@@ -151,7 +308,351 @@ class BaseTable(BaseSQLAlchemy):
         :return: all column-value pairs as a dictionary.
         :rtype: dict.
         """
-        return {c.name: getattr(self, c.name) for c in self.__table__.columns}
+        if (columns != None): return {name: getattr(self, name) for name in columns}
+
+        state = inspect(self)
+        deferred = state.unloaded - state.expired_attributes if (state.key != None) else ()
+
+        return {c.name: getattr(self, c.name) for c in self.__table__.columns if c.name not in deferred}
+
+    def _pk_columns(self) -> tuple:
+        """Primary key columns, from the table class metadata.
+        """
+        return inspect(type(self)).primary_key
+
+    def _identity(self, key) -> tuple:
+        """Normalise a primary key value, or a tuple of values, to a tuple.
+        """
+        return key if isinstance(key, tuple) else (key,)
+
+    def _record_identity(self, record: dict) -> tuple:
+        """Primary key values of a record (dictionary) as a tuple.
+        """
+        return tuple(record[column.key] for column in self._pk_columns())
+
+    def _typed(self, record: dict) -> dict:
+        """A record with its values as the Python types of their columns, as read from 
+        the database. Values of names which are not columns are kept as is.
+        """
+        columns = self.__table__.columns
+        return {name: _coerce(columns[name], value) if (name in columns) else value 
+                for name, value in record.items()}
+
+    def _pk_in(self, idents: list):
+        """``WHERE`` clause predicate: primary key is in a list of identities.
+        """
+        return self._key_in(self._pk_columns(), idents)
+
+    def _key_columns(self, key=None) -> list:
+        """Columns of a key which identifies records.
+
+        :param key: a column name, or a list of column names. ``None`` for the primary key.
+        """
+        if (key == None): return list(self._pk_columns())
+
+        names = [key] if isinstance(key, str) else list(key)
+        return [self.__table__.columns[name] for name in names]
+
+    def _key_in(self, columns: list, idents: list):
+        """``WHERE`` clause predicate: key columns are in a list of tuples of values.
+        """
+        if (len(columns) == 1): return columns[0].in_([ident[0] for ident in idents])
+
+        if (self.tuple_in): return tuple_(*columns).in_(idents)
+
+        return or_(*[self._key_equals(columns, ident) for ident in idents])
+
+    def _key_equals(self, columns: list, ident: tuple):
+        """``WHERE`` clause predicate: key columns are equal to a tuple of values.
+        """
+        return and_(*[column == value for column, value in zip(columns, ident)])
+
+    def _key_after(self, columns: list, ident: tuple):
+        """``WHERE`` clause predicate: key columns are after a tuple of values, in key order.
+        """
+        if (len(columns) == 1): return columns[0] > ident[0]
+
+        if (self.tuple_in): return tuple_(*columns) > tuple_(*ident)
+
+        # (a, b) > (x, y): a > x or (a = x and b > y).
+        return or_(*[and_(*[column == value for column, value in zip(columns[:idx], ident[:idx])], 
+                          columns[idx] > ident[idx]) for idx in range(len(columns))])
+
+    def _select_rows_in(self, columns: list, idents: list):
+        """Select rows by key values, directly from the database: chunked ``WHERE key IN (...)``.
+
+        :param list columns: the key columns.
+
+        :param list idents: list of tuples of key values.
+
+        :return: a generator of lists of rows, one list per chunk. Values are as read 
+            from the database, not serialised.
+        """
+        for chunk in _chunks(idents, self.pk_chunk_size):
+            result = self.session.execute(select(self.__table__).where(self._key_in(columns, chunk)))
+            yield [dict(row._mapping.items()) for row in result]
+
+    def _scan_rows(self, columns: list):
+        """Select all rows of this table, in key order, with keyset pagination: each chunk 
+        starts after the last key of the previous chunk.
+
+        :param list columns: the key columns.
+
+        :return: a generator of lists of rows, one list per chunk. Values are as read 
+            from the database, not serialised.
+        """
+        last = None
+
+        while True:
+            stmt = select(self.__table__).order_by(*columns).limit(self.pk_chunk_size)
+            if (last != None): stmt = stmt.where(self._key_after(columns, last))
+
+            rows = [dict(row._mapping.items()) for row in self.session.execute(stmt)]
+            if (len(rows) == 0): return
+
+            last = tuple(rows[-1][column.name] for column in columns)
+            yield rows
+
+    def __from_identity_map(self, ident: tuple):
+        key = self.session.identity_key(type(self), ident)
+        instance = self.session.identity_map.get(key)
+
+        if (instance == None): return None
+
+        state = inspect(instance)
+        if (state.deleted) or (len(state.expired_attributes) > 0): return None
+
+        return instance
+
+    @contextmanager
+    def _temp_table(self, names: list, rows: list, prefix: str = 'bh_temp'):
+        """Context manager. Create a temporary table with some columns of this table, and 
+        load ``rows`` into it, with multi-row inserts. The temporary table is dropped on exit.
+
+        The temporary table is created on the session connection, within the current 
+        transaction.
+
+        :param list names: names of the columns of this table to create the temporary 
+            table with. Primary key columns remain primary key columns.
+
+        :param list rows: list of dictionaries of column name, value pairs.
+
+        :param str prefix: prefix of the temporary table name.
+
+        :return: the temporary `sqlalchemy.schema.Table <https://docs.sqlalchemy.org/en/20/core/metadata.html#sqlalchemy.schema.Table>`_.
+        """
+        columns = self.__table__.columns
+        temp_table = Table(f"{prefix}_{uuid.uuid4().hex[:16]}", MetaData(), 
+            *[Column(name, columns[name].type, primary_key=columns[name].primary_key, 
+                     autoincrement=False) for name in names], prefixes=['TEMPORARY'])
+        
+        connection = self.session.connection()
+        temp_table.create(connection)
+        try:
+            for chunk in _chunks(rows, self.pk_chunk_size):
+                connection.execute(temp_table.insert(), chunk)
+
+            yield temp_table
+
+        except Exception:
+            """
+            On PostgreSQL, a failed statement aborts the transaction: the DROP fails, and 
+            the rollback discards the temporary table. The DROP must not hide the original 
+            exception.
+            """
+            try:
+                self._drop_temp_table(connection, temp_table)
+            except Exception as e:
+                logger.debug(f"Temporary table {temp_table.name} not dropped: {str(e)}")
+            raise
+
+        self._drop_temp_table(connection, temp_table)
+
+    def _drop_temp_table(self, connection, temp_table: Table) -> None:
+        """
+        On MySQL, DROP TABLE implicitly commits the current transaction, 
+        DROP TEMPORARY TABLE does not.
+        """
+        temporary = 'TEMPORARY ' if (Database.database_type() == DatabaseType.MySQL) else ''
+        name = connection.dialect.identifier_preparer.quote(temp_table.name)
+        connection.execute(text(f"DROP {temporary}TABLE {name}"))
+
+    def _key_temp_table(self, idents: list):
+        """Context manager. Create a temporary table of primary key values, and load 
+        ``idents`` into it. The temporary table is dropped on exit. See :py:meth:`~_temp_table`.
+
+        :param list idents: list of tuples of primary key values.
+
+        :return: the temporary `sqlalchemy.schema.Table <https://docs.sqlalchemy.org/en/20/core/metadata.html#sqlalchemy.schema.Table>`_.
+        """
+        names = [column.name for column in self._pk_columns()]
+        return self._temp_table(names, [dict(zip(names, ident)) for ident in idents], 'bh_keys')
+
+    def batch_loader(self, temp_table_threshold: int = None) -> BatchLoader:
+        """Create a batch loader for this table. See :py:doc:`batch_loader`.
+
+        :param int temp_table_threshold: see :py:class:`~bh_database.batch_loader.BatchLoader`.
+
+        :return: a new :py:class:`~bh_database.batch_loader.BatchLoader`.
+        """
+        return BatchLoader(self, temp_table_threshold)
+
+    def _load_by_pk(self, idents: list, use_temp_table: bool = False) -> dict:
+        """Load records by primary key identities.
+
+        Look in the session identity map first, then in the :attr:`~l2_cache`, finally 
+        query the database with chunked ``WHERE pk IN (...)``.
+
+        :param list idents: list of tuples of primary key values.
+
+        :param bool use_temp_table: ``True`` to query the database with a join against
+            a temporary table of keys, instead of ``WHERE pk IN (...)``.
+
+        :return: a dictionary of serialised records keyed by identity. Identities which 
+            do not exist are not in the dictionary.
+        :rtype: dict.
+        """
+        found = {}
+        missing = []
+        instances = {}
+
+        for ident in dict.fromkeys(idents):
+            instance = self.__from_identity_map(ident)
+            if (instance != None):
+                instances[ident] = instance.as_dict()
+                continue
+
+            record = None if (self.l2_cache == None) else \
+                self.l2_cache.get(make_key(self.__tablename__, ident))
+
+            if (record == None): missing.append(ident)
+            else: found[ident] = dict(record)
+
+        if (use_temp_table) and (len(missing) > 0):
+            with self._key_temp_table(missing) as keys:
+                onclause = and_(*[column == keys.c[column.name] for column in self._pk_columns()])
+                result = self.session.execute(select(type(self)).join(keys, onclause))
+
+                for instance in result.scalars():
+                    instances[inspect(instance).identity] = instance.as_dict()
+        else:
+            for chunk in _chunks(missing, self.pk_chunk_size):
+                result = self.session.execute(select(type(self)).where(self._pk_in(chunk)))
+
+                for instance in result.scalars():
+                    instances[inspect(instance).identity] = instance.as_dict()
+
+        if (len(instances) == 0): return found
+
+        # Loaded from the database, rather than from the identity map. Not if they may 
+        # be uncommitted writes.
+        loaded = set() if (self._has_written()) else set(missing)
+
+        for ident, record in zip(instances.keys(), _serialise(list(instances.values()))):
+            found[ident] = record
+
+            if (self.l2_cache != None) and (ident in loaded):
+                self.l2_cache.set(make_key(self.__tablename__, ident), dict(record), self.__tablename__)
+
+        return found
+
+    def _has_written(self) -> bool:
+        """``True`` if the current transaction has written, or has pending changes: write
+        methods register cache invalidation via :py:meth:`~bh_database.core.BaseSQLAlchemy.after_commit`.
+        """
+        session = self.session
+        return (BH_AFTER_COMMIT_KEY in session.info) or \
+            (len(session.new) + len(session.dirty) + len(session.deleted) > 0)
+
+    def get_by_pk(self, *keys, auto_session=False) -> ResultStatus:
+        """Get a single record by its primary key value(s).
+
+        Keyed lookups look in the session identity map first, then in the optional process 
+        level :attr:`~l2_cache`, and only then query the database. 
+
+        :param keys: primary key value(s), in the order of the primary key columns. E.g.::
+
+            status = Employees().get_by_pk(10001, auto_session=True)
+
+        :param bool auto_session: see :py:meth:`~ReadOnlyTable.run_select_sql`.
+
+        :return: `ResultStatus <https://bh-apistatus.readthedocs.io/en/latest/result-status.html>`_.
+            Same as :py:meth:`~ReadOnlyTable.run_select_sql`, ``data`` has at most one record.
+        """
+        return self.get_many_by_pk([tuple(keys)], auto_session)
+
+    def get_many_by_pk(self, keys: list, auto_session=False) -> ResultStatus:
+        """Get records by primary key values. See :py:meth:`~get_by_pk`.
+
+        Keys not found in the session identity map nor in the :attr:`~l2_cache` are 
+        queried with ``WHERE pk IN (...)``, in chunks of :attr:`~pk_chunk_size` keys.
+
+        :param list keys: list of primary key values. For tables with composite primary 
+            keys, each key is a tuple of values, in the order of the primary key columns.
+
+        :param bool auto_session: see :py:meth:`~ReadOnlyTable.run_select_sql`.
+
+        :return: `ResultStatus <https://bh-apistatus.readthedocs.io/en/latest/result-status.html>`_.
+            Same as :py:meth:`~ReadOnlyTable.run_select_sql`. Records in ``data`` are in the 
+            order of ``keys``, keys which do not exist are skipped.
+        """
+        logger.debug('Entered')
+        try:
+            if (auto_session) and (self.autocommit_reads): self._begin_read()
+
+            idents = [self._identity(key) for key in keys]
+
+            found = self._load_by_pk(idents)
+            data = [found[ident] for ident in idents if ident in found]
+
+            if (len(data) == 0):
+                status = make_status(text=BH_SQL_NO_DATA_MSG)
+            else:
+                status = make_status(text=BH_RETRIEVED_SUCCESSFUL_MSG, data=data)
+
+            if auto_session: self.commit_transaction()
+
+        except Exception as e:
+            logger.error(str(e))
+            status = make_500_status(str(e))
+
+            if auto_session: self.rollback_transaction()
+
+        finally:
+            logger.debug('Exited.')
+            return status
+
+    def _invalidate_cached(self, idents: list = None) -> None:
+        """Invalidate :attr:`~l2_cache` entries of this table, now and again after the 
+        current transaction commits. Bump the version of this table after the current
+        transaction commits, see :attr:`~version_table`.
+
+        :param list idents: list of tuples of primary key values. ``None`` to invalidate 
+            all entries of this table.
+
+        Results of this table memoised in the current request scope are dropped too, see 
+        :py:mod:`bh_database.request_scope`.
+        """
+        scope = current_scope()
+        if (scope != None): scope.invalidate(self.__tablename__)
+
+        if (self.version_table != None):
+            version_table, tablename = self.version_table, self.__tablename__
+            self.after_commit(lambda: _bump_version(version_table, tablename))
+
+        if (self.l2_cache == None): return
+
+        cache = self.l2_cache
+        tablename = self.__tablename__
+
+        def invalidate():
+            if (idents == None):
+                cache.invalidate(tablename)
+            else:
+                for ident in idents: cache.delete(make_key(tablename, ident))
+
+        invalidate()
+        self.after_commit(invalidate)
 
 class ReadOnlyTable(BaseTable):
     """Implement a *read-only* abstract base model (table) class.
@@ -190,7 +691,10 @@ class ReadOnlyTable(BaseTable):
             when finished: if the call was successful, the transaction is committed, otherwise 
             it rolls back. If it is called as a part of an ongoing transaction, in which case 
             SQLAlchemy does not start another transaction, then just ignore this param, the caller 
-            is responsible for managing transaction atomicity.
+            is responsible for managing transaction atomicity. A single call without a transaction 
+            in progress runs in driver autocommit mode where the driver allows it, see 
+            :attr:`~.BaseTable.autocommit_reads`. For several reads which must see the same data, 
+            use :py:meth:`~bh_database.core.BaseSQLAlchemy.read_only_transaction` instead.
 
         :return: `ResultStatus <https://bh-apistatus.readthedocs.io/en/latest/result-status.html>`_.
 
@@ -223,20 +727,117 @@ class ReadOnlyTable(BaseTable):
             }
 
         where ``500`` is ``HTTPStatus.INTERNAL_SERVER_ERROR.value``.
+
+        When :attr:`~.BaseTable.single_flight` is set and ``auto_session`` is ``True``, 
+        identical concurrent calls share a single database call, see 
+        :py:mod:`bh_database.coalesce`.
+
+        Within a request scope, identical calls are served from the scope, see 
+        :py:mod:`bh_database.request_scope`.
         """
 
+        scope = current_scope()
+        key = make_flight_key('run_select_sql', sql)
+
+        status = None if (scope == None) else scope.get(key)
+        if (status != None): return status
+
+        if (auto_session) and (self.single_flight != None):
+            status = self.single_flight.do(key, self._run_select_sql, sql, auto_session)
+        else:
+            status = self._run_select_sql(sql, auto_session)
+
+        if (scope != None) and (status.code == HTTPStatus.OK.value): 
+            scope.set(key, status, self.__tablename__, sql)
+
+        return status
+
+    def _run_select_sql(self, sql: str, auto_session: bool) -> ResultStatus:
+        """:py:meth:`~run_select_sql`, never memoised nor coalesced.
+        """
         logger.debug('Entered')
         try:
             status = {}
 
+            if (auto_session) and (self.autocommit_reads): self._begin_read()
+
             # raise Exception('Test exception from db_funcs.run_select_sql(engine, sql) 1')
 
             result = self.session.execute(text(sql))
 
             # raise Exception('Test exception from db_funcs.run_select_sql(engine, sql) 2')
 
-            data = json.loads(json.dumps([dict(row._mapping.items()) for row in result], \
-                use_decimal=True, default=json_funcs.serialise, indent="  "))
+            data = _serialise([dict(row._mapping.items()) for row in result])
+
+            if (len(data) == 0):
+                status = make_status(text=BH_SQL_NO_DATA_MSG)
+            else:
+                status = make_status(text=BH_RETRIEVED_SUCCESSFUL_MSG, data=data)
+
+            if auto_session: self.commit_transaction()
+
+        except Exception as e:
+            logger.error(str(e))
+            status = make_500_status(str(e))
+
+            if auto_session: self.commit_transaction()
+
+        finally:
+            logger.debug('Exited.')
+
+            if 'result' in locals():
+                result.close()
+
+            return status
+
+    def run_named_select(self, name: str, auto_session=False, **params) -> ResultStatus:
+        """Run a registered named SELECT statement and return the result.
+
+        See :py:mod:`bh_database.statements`. The statement is compiled once, and on 
+        PostgreSQL, if it is marked for preparing, it is run as ``EXECUTE`` of the 
+        statement prepared on the connection. The call is recorded in the statement 
+        statistics.
+
+        :param str name: the name of a statement registered in 
+            :attr:`~bh_database.core.Database.statements`.
+
+        :param bool auto_session: see :py:meth:`~run_select_sql`.
+
+        :param params: bind parameter values, e.g. ``last_name='%NAS%'``.
+
+        :return: `ResultStatus <https://bh-apistatus.readthedocs.io/en/latest/result-status.html>`_,
+            as :py:meth:`~run_select_sql`. An unregistered statement name is a failure.
+
+        Within a request scope, identical calls are served from the scope, see 
+        :py:mod:`bh_database.request_scope`.
+        """
+
+        scope = current_scope()
+        key = make_flight_key('run_named_select', name, sorted(params.items()))
+
+        status = None if (scope == None) else scope.get(key)
+        if (status != None): return status
+
+        status = self.__run_named_select(name, auto_session, params)
+
+        if (scope != None) and (status.code == HTTPStatus.OK.value): 
+            scope.set(key, status, self.__tablename__, Database.statements.get(name).sql)
+
+        return status
+
+    def __run_named_select(self, name: str, auto_session: bool, params: dict) -> ResultStatus:
+        logger.debug('Entered')
+        started = time.perf_counter()
+        try:
+            status = {}
+
+            if (auto_session) and (self.autocommit_reads): self._begin_read()
+
+            clause = Database.statements.clause_for(name, self.session.connection())
+
+            result = self.session.execute(clause, params)
+
+            data = _serialise([dict(row._mapping.items()) for row in result])
 
             if (len(data) == 0):
                 status = make_status(text=BH_SQL_NO_DATA_MSG)
@@ -257,6 +858,62 @@ class ReadOnlyTable(BaseTable):
             if 'result' in locals():
                 result.close()
 
+            Database.statements.record(name, time.perf_counter() - started, 
+                                       status.code != HTTPStatus.OK.value)
+
+            return status
+
+    def select_columns(self, *names: str, where=None, order_by=None, auto_session=False) -> ResultStatus:
+        """Select only the named columns of this table, and return the result.
+
+        Only the named columns are selected, decoded and serialised: wide tables with 
+        large TEXT or JSON columns do not ship them when they are not needed. E.g.::
+
+            status = Employees().select_columns('emp_no', 'last_name', 
+                where=Employees.last_name.like('%nas%'), order_by=Employees.emp_no, auto_session=True)
+
+        :param names: names of the columns to select.
+
+        :param where: optional. A SQLAlchemy column expression, or a full text SQL ``WHERE`` 
+            condition, e.g. ``"upper(last_name) like '%NAS%'"``.
+
+        :param order_by: optional. A SQLAlchemy column expression, or a list of them.
+
+        :param bool auto_session: see :py:meth:`~run_select_sql`.
+
+        :return: `ResultStatus <https://bh-apistatus.readthedocs.io/en/latest/result-status.html>`_.
+            Same as :py:meth:`~run_select_sql`, records have only the named columns.
+        """
+        logger.debug('Entered')
+        try:
+            if (auto_session) and (self.autocommit_reads): self._begin_read()
+
+            stmt = select(*[self.__table__.columns[name] for name in names])
+
+            if (where is not None): stmt = stmt.where(text(where) if isinstance(where, str) else where)
+
+            if (order_by is not None): 
+                stmt = stmt.order_by(*(order_by if isinstance(order_by, (list, tuple)) else [order_by]))
+
+            result = self.session.execute(stmt)
+
+            data = _serialise([dict(row._mapping.items()) for row in result])
+
+            if (len(data) == 0):
+                status = make_status(text=BH_SQL_NO_DATA_MSG)
+            else:
+                status = make_status(text=BH_RETRIEVED_SUCCESSFUL_MSG, data=data)
+
+            if auto_session: self.commit_transaction()
+
+        except Exception as e:
+            logger.error(str(e))
+            status = make_500_status(str(e))
+
+            if auto_session: self.rollback_transaction()
+
+        finally:
+            logger.debug('Exited.')
             return status
 
 class WriteCapableTable(ReadOnlyTable):
@@ -278,6 +935,30 @@ class WriteCapableTable(ReadOnlyTable):
 
     __abstract__ = True
 
+    #: Class attribute. When the number of modified records written at once exceeds this 
+    #: value, they are staged into a temporary table and applied with a single set-based 
+    #: UPDATE, see :py:meth:`~_staged_update`. ``None``, the default, to always update 
+    #: records by primary key.
+    staged_update_threshold: int = None
+
+    #: Class attribute. The name of the primary key column whose values of new records are 
+    #: allocated by stored method ``get_unique_id``. ``None``, the default, for the primary 
+    #: key column of tables with a single primary key column, and no allocation for tables 
+    #: with composite primary keys, e.g. association tables, whose new records must have 
+    #: all primary key values. See :py:meth:`~_id_column`.
+    id_column: str = None
+
+    #: Class attribute. The Id generator for new records, see :py:mod:`bh_database.id_generators`. 
+    #: ``None``, the default, to get new Ids with stored method ``get_unique_id``, one 
+    #: call per new record.
+    id_generator: IdGenerator = None
+
+    #: Class attribute. When the number of records deleted at once exceeds this value, 
+    #: their primary keys are staged into a temporary table and deleted with a single 
+    #: ``DELETE`` joined against it, see :py:meth:`~_bulk_delete`. ``None``, the default, 
+    #: to always delete with chunked ``DELETE ... WHERE pk IN (...)``.
+    delete_temp_table_threshold: int = None
+
     def run_execute_sql(self, sql: str, auto_session=False) -> ResultStatus:
         """Run an execute SQL full text statement and return a `ResultStatus 
         <https://bh-apistatus.readthedocs.io/en/latest/result-status.html>`_.
@@ -328,6 +1009,8 @@ class WriteCapableTable(ReadOnlyTable):
 
             # raise Exception('Test exception from db_funcs.run_select_sql(engine, sql)')
 
+            self._invalidate_cached()
+
             status = make_status(text='')
 
             if auto_session: self.commit_transaction()
@@ -347,19 +1030,71 @@ class WriteCapableTable(ReadOnlyTable):
 
             return status
 
-    def __collate_data(self, result, dataset) -> list:
-        columns = [column[0] for column in result.description]
+    def run_named_execute(self, name: str, auto_session=False, **params) -> ResultStatus:
+        """Run a registered named execute statement, i.e. an UPDATE or a DELETE statement, 
+        and return a `ResultStatus <https://bh-apistatus.readthedocs.io/en/latest/result-status.html>`_.
 
-        data = []
-        for row in dataset:
-            record = {}
+        See :py:mod:`bh_database.statements` and :py:meth:`~.ReadOnlyTable.run_named_select`.
+
+        :param str name: the name of a statement registered in 
+            :attr:`~bh_database.core.Database.statements`.
+
+        :param bool auto_session: see :py:meth:`~run_execute_sql`.
+
+        :param params: bind parameter values.
+
+        :return: `ResultStatus <https://bh-apistatus.readthedocs.io/en/latest/result-status.html>`_,
+            as :py:meth:`~run_execute_sql`. An unregistered statement name is a failure.
+        """
+
+        logger.debug('Entered')
+        started = time.perf_counter()
+        try:
+            if auto_session: self.begin_transaction()
+
+            clause = Database.statements.clause_for(name, self.session.connection())
+
+            result = self.session.execute(clause, params)
+
+            self._invalidate_cached()
+
+            status = make_status(text='')
+
+            if auto_session: self.commit_transaction()
+
+        except Exception as e:
+            logger.error(str(e))
+
+            status = make_500_status(str(e))
+
+            if auto_session: self.rollback_transaction()
+
+        finally:
+            logger.debug('Exited.')
+
+            if 'result' in locals():
+                result.close()
+
+            Database.statements.record(name, time.perf_counter() - started, 
+                                       status.code != HTTPStatus.OK.value)
+
+            return status
+
+    def __collate_data(self, result, dataset) -> list:
+        return self.__collate_rows([column[0] for column in result.description], dataset)
+
+    def __collate_rows(self, columns: list, dataset) -> list:
+        data = []
+        for row in dataset:
+            record = {}
             for idx, name in enumerate(columns):
                 record[name] = row[idx]
             data.append(record)
 
         return data
 
-    def run_stored_proc(self, stored_proc_name: str, params: list, auto_session=False) -> ResultStatus:
+    def run_stored_proc(self, stored_proc_name: str, params: list, auto_session=False, 
+                        coalesce=False) -> ResultStatus:
         """Execute a stored procedure which returns some data.
 
         It is **assumed** the stored procedure returns some data.
@@ -376,6 +1111,12 @@ class WriteCapableTable(ReadOnlyTable):
             SQLAlchemy does not start another transaction, then just ignore this param, the caller 
             is responsible for managing transaction atomicity.
 
+        :param bool coalesce: ``True`` to let identical concurrent calls share a single 
+            database call, see :py:mod:`bh_database.coalesce`. Only applicable when 
+            :attr:`~.BaseTable.single_flight` is set and ``auto_session`` is ``True``. 
+            Stored procedures may write, so they are coalesced only on request: only 
+            set it for stored procedures which do not.
+
         :return: `ResultStatus <https://bh-apistatus.readthedocs.io/en/latest/result-status.html>`_.
 
         Further illustrations of return value, as a dictionary.
@@ -404,6 +1145,18 @@ class WriteCapableTable(ReadOnlyTable):
             }        
         """
 
+        # A stored procedure may write anything.
+        scope = current_scope()
+        if (scope != None): scope.clear()
+
+        if (coalesce) and (auto_session) and (self.single_flight != None):
+            return self.single_flight.do(
+                make_flight_key('run_stored_proc', stored_proc_name, params), 
+                self.__run_stored_proc, stored_proc_name, params, auto_session)
+
+        return self.__run_stored_proc(stored_proc_name, params, auto_session)
+
+    def __run_stored_proc(self, stored_proc_name: str, params: list, auto_session: bool) -> ResultStatus:
         logger.debug('Entered')
         try:
             if auto_session: self.begin_transaction()
@@ -415,9 +1168,9 @@ class WriteCapableTable(ReadOnlyTable):
 
                 match Database.database_type():
                     case DatabaseType.MySQL:
-                        try:
-                            result = next(cursor.stored_results())
-                        except StopIteration:
+                        result = Database.adapter.stored_proc_result(cursor)
+
+                        if (result == None):
                             msg = BH_STORED_PROC_NO_RESULT_SET_MSG.format(stored_proc_name)
                             status = make_status(text=msg)
                             
@@ -425,13 +1178,13 @@ class WriteCapableTable(ReadOnlyTable):
 
                             return
 
-                        dataset = result.fetchall()
+                        columns, dataset = result
 
                         if (len(dataset) == 0):
                             status = make_status(text=BH_SQL_NO_DATA_MSG)
                             return
 
-                        data = self.__collate_data(result, dataset)
+                        data = self.__collate_rows(columns, dataset)
 
                     case DatabaseType.PostgreSQL:
                         dataset = cursor.fetchall()
@@ -454,16 +1207,14 @@ class WriteCapableTable(ReadOnlyTable):
 
         finally:
             logger.debug('Exited.')
-
-            if 'result' in locals():
-                result.close()
-
             return status
 
-    def __split_data(self, data: list, new_list: list, updated_list: list) -> None:
+    def _split_data(self, data: list, new_list: list, updated_list: list, 
+                    deleted_list: list) -> None:
         for record in data:
             rec_status = record[BH_REC_STATUS_FIELDNAME]
-            del record[BH_REC_STATUS_FIELDNAME]
+            # A copy: callers' records are left as they are, e.g. for a retry to write again.
+            record = {name: value for name, value in record.items() if name != BH_REC_STATUS_FIELDNAME}
 
             if rec_status == BH_RECORD_STATUS_NEW:
                 new_list.append(record)
@@ -471,10 +1222,14 @@ class WriteCapableTable(ReadOnlyTable):
             elif rec_status == BH_RECORD_STATUS_MODIFIED:
                 updated_list.append(record)
 
+            elif rec_status == BH_RECORD_STATUS_DELETED:
+                deleted_list.append(record)
+
     def __get_next_id(self, tablename, columnname):
         sql = "select get_unique_id('{0}', '{1}') {1}".format(tablename, columnname)
 
-        status = self.run_select_sql(sql)
+        # Each call allocates a new Id: it must never be memoised.
+        status = self._run_select_sql(sql, False)
 
         if (status.code == HTTPStatus.OK.value):
             if (not status.has_data) or (len(status.data) == 0): 
@@ -482,26 +1237,315 @@ class WriteCapableTable(ReadOnlyTable):
 
         return status
 
+    def _id_column(self) -> str:
+        """The name of the column whose values of new records are allocated, see 
+        :attr:`~id_column`.
+
+        :return: the column name, ``None`` if values are not allocated.
+        """
+        if (self.id_column != None): return self.id_column
+
+        return self._primary_key if (len(self._primary_keys) == 1) else None
+
+    def _without_id(self, new_list: list) -> list:
+        """New records which need a new Id: :py:meth:`~_id_column` is not in the record, 
+        or its value is not a valid integer.
+        """
+        id_column = self._id_column()
+        if (id_column == None): return []
+
+        return [record for record in new_list 
+                if (id_column not in record) or (not is_integer(record[id_column]))]
+
+    def _ids_on_insert(self) -> bool:
+        """``True`` if new Ids are assigned by the database on ``INSERT``, see 
+        :py:class:`~bh_database.id_generators.IdentityIdGenerator`.
+        """
+        return (self._id_column() != None) and (self.id_generator != None) and \
+            (self.id_generator.on_insert)
+
     def __set_new_id(self, new_list: list) -> ResultStatus:
         """Getting new Ids for new records.
 
         If new records already have Ids set, then skip getting.
         """
+        id_column = self._id_column()
+        if (id_column == None): return make_status()
+
+        if (self.id_generator != None):
+            # Assigned by the database on INSERT.
+            if (self.id_generator.on_insert): return make_status()
+
+            pending = self._without_id(new_list)
+            if (len(pending) == 0): return make_status()
+
+            for record, new_id in zip(pending, self._allocate_ids(len(pending))):
+                record[id_column] = new_id
+
+            return make_status()
+
         for record in new_list:
             """
             If primary key is in record, and its value is a valid integer, then don't get one.
             """
-            if (self._primary_key in record) and (is_integer(record[self._primary_key])):
+            if (id_column in record) and (is_integer(record[id_column])):
                 continue
 
-            id_status = self.__get_next_id(self.__tablename__, self._primary_key)
+            id_status = self.__get_next_id(self.__tablename__, id_column)
             if (id_status.code != HTTPStatus.OK.value):
                 return make_500_status(id_status.text)
 
-            record[self._primary_key] = id_status.data[0][self._primary_key]
+            record[id_column] = id_status.data[0][id_column]
 
         return make_status()
 
+    def _allocate_ids(self, count: int) -> list:
+        """Allocate ``count`` new unique integer Ids for :py:meth:`~_id_column`, with 
+        :attr:`~id_generator`, or, by default, with :py:meth:`~_allocate_unique_ids`.
+
+        :param int count: the number of Ids to allocate.
+
+        :return: list of ``count`` Ids.
+        :rtype: list.
+        """
+        if (self.id_generator != None): return self.id_generator.allocate(self, count)
+
+        return self._allocate_unique_ids(count)
+
+    def _allocate_unique_ids(self, count: int) -> list:
+        """Allocate a block of ``count`` new unique integer Ids for :py:meth:`~_id_column`, with a 
+        single call of stored method ``get_unique_id_block``. See 
+        ``./sql_scripts/<database>/06_get_unique_id_block_stored_method.sql``.
+
+        :param int count: the number of Ids to allocate.
+
+        :return: list of ``count`` consecutive Ids.
+        :rtype: list.
+
+        :raises Exception: if the stored method returns nothing.
+        """
+        id_column = self._id_column()
+
+        sql = "select get_unique_id_block('{0}', '{1}', {2}) {1}".format(
+            self.__tablename__, id_column, int(count))
+
+        # Each call allocates new Ids: it must never be memoised.
+        status = self._run_select_sql(sql, False)
+
+        if (status.code != HTTPStatus.OK.value): raise Exception(status.text)
+        if (not status.has_data) or (len(status.data) == 0): 
+            raise Exception(BH_NEXT_ID_NO_RESULT_MSG.format(self.__tablename__, id_column))
+
+        first_id = status.data[0][id_column]
+        return list(range(first_id, first_id + count))
+
+    def _bulk_insert(self, list):
+        """Insert all records with a single batched INSERT, `ORM bulk INSERT 
+        <https://docs.sqlalchemy.org/en/20/orm/queryguide/dml.html#orm-bulk-insert-statements>`_.
+        Records are not added to the session.
+        """
+        self.session.execute(insert(self._type), list)
+
+    def _supports_returning(self, update: bool = False) -> bool:
+        """``True`` if the database supports ``INSERT ... RETURNING``, or ``UPDATE ... RETURNING`` 
+        if ``update`` is ``True``: e.g. PostgreSQL and MariaDB, not MySQL.
+        """
+        dialect = self.session.get_bind().dialect
+        return dialect.update_returning if (update) else dialect.insert_returning
+
+    def _insert_returning(self, list, names: list):
+        """Insert records with batched ``INSERT ... RETURNING``, one statement per set of 
+        columns, and set the returned columns in the records.
+
+        :param list names: names of the columns to return.
+        """
+        columns = [self.__table__.columns[name] for name in names]
+
+        for group in _group_by_columns(list):
+            stmt = insert(self.__table__).returning(*columns, sort_by_parameter_order=True)
+            for record, row in zip(group, self.session.execute(stmt, group)): 
+                record.update(row._mapping)
+
+    def _reselect(self, list, names: list):
+        """Select columns of written records by primary key, with chunked 
+        ``WHERE pk IN (...)``, and set them in the records.
+
+        :param list names: names of the columns to select.
+        """
+        pk_columns = self._pk_columns()
+        columns = [*pk_columns, *[self.__table__.columns[name] for name in names]]
+
+        rows = {}
+        idents = [*dict.fromkeys(self._record_identity(record) for record in list)]
+        for chunk in _chunks(idents, self.pk_chunk_size):
+            for row in self.session.execute(select(*columns).where(self._pk_in(chunk))):
+                rows[tuple(row._mapping[column.name] for column in pk_columns)] = row._mapping
+
+        for record in list:
+            row = rows.get(self._record_identity(record))
+            if (row != None): record.update({name: row[name] for name in names})
+
+    def _insert_new(self, list, bulk: bool = True, returning: list = None) -> bool:
+        """Insert new records with :py:meth:`~_bulk_insert`, or :py:meth:`~_insert`.
+
+        When new Ids are assigned by the database on ``INSERT``, see :py:meth:`~_ids_on_insert`,
+        records without Ids are inserted by :attr:`~id_generator`, which sets their Ids.
+
+        :param list returning: optional. Names of columns to return in the records, with 
+            :py:meth:`~_insert_returning`, if the database supports it.
+
+        :return: ``True`` if ``returning`` columns have been set in the records.
+        """
+        if (returning != None) and (self._supports_returning()):
+            names = returning + [self._id_column()] if (self._ids_on_insert()) else returning
+            self._insert_returning(list, [*dict.fromkeys(names)])
+            return True
+
+        pending = self._without_id(list) if (self._ids_on_insert()) else []
+        if (len(pending) > 0): self.id_generator.insert(self, pending)
+
+        inserted = set(id(record) for record in pending)
+        remaining = [record for record in list if id(record) not in inserted]
+        if (len(remaining) == 0): return False
+
+        if (bulk): self._bulk_insert(remaining)
+        else: self._insert(remaining)
+
+        return False
+
+    def _bulk_update(self, list):
+        """Update all records by primary key with a single batched UPDATE, `ORM bulk UPDATE 
+        by primary key <https://docs.sqlalchemy.org/en/20/orm/queryguide/dml.html#orm-bulk-update-by-primary-key>`_.
+        Or with :py:meth:`~_staged_update` when there are more than 
+        :attr:`~staged_update_threshold` records. Each record must have all primary key columns.
+
+        Instances of the updated records in the session identity map are expired, they 
+        are reloaded on next access.
+        """
+        if (self._use_staged_update(list)): 
+            self._staged_update(list)
+        else:
+            self.session.execute(update(self._type), list)
+            self._expire([self._record_identity(record) for record in list])
+
+    def _use_staged_update(self, list) -> bool:
+        return (self.staged_update_threshold != None) and (len(list) > self.staged_update_threshold)
+
+    def _staged_update(self, list):
+        """Update records with set-based UPDATEs: records are loaded into a temporary 
+        table with multi-row inserts, then applied to this table with a single 
+        ``UPDATE ... FROM`` on PostgreSQL, or ``UPDATE ... JOIN`` on MySQL.
+
+        Records are grouped by their set of columns: each group is staged and applied 
+        separately. Each record must have all primary key columns.
+
+        Instances of the updated records in the session identity map are expired, they 
+        are reloaded on next access.
+        """
+        pk_names = [column.name for column in self._pk_columns()]
+
+        table = self.__table__
+        for records in _group_by_columns(list):
+            names = [name for name in records[0].keys()]
+            set_names = [name for name in names if name not in pk_names]
+            if (len(set_names) == 0): continue
+
+            with self._temp_table(names, records, 'bh_stage') as stage:
+                stmt = (
+                    update(table)
+                    .values({name: stage.c[name] for name in set_names})
+                    .where(and_(*[table.c[name] == stage.c[name] for name in pk_names]))
+                )
+                self.session.execute(stmt)
+
+        self._expire([self._record_identity(record) for record in list])
+
+    def _expire(self, idents: list):
+        """Expire instances of updated records in the session identity map: UPDATE 
+        statements by primary key do not synchronise them.
+
+        :param list idents: list of tuples of primary key values.
+        """
+        identity_map = self.session.identity_map
+        for ident in idents:
+            instance = identity_map.get(self.session.identity_key(self._type, ident))
+            if (instance != None): self.session.expire(instance)
+
+    def _bulk_delete(self, idents: list):
+        """Delete records by primary key, with chunked ``DELETE ... WHERE pk IN (...)``, 
+        in chunks of :attr:`~pk_chunk_size` keys. Or, when there are more than 
+        :attr:`~delete_temp_table_threshold` keys, with a single ``DELETE`` joined against 
+        a temporary table of the keys, see :py:meth:`~_key_temp_table`.
+
+        Instances of the deleted records are removed from the session identity map.
+
+        :param list idents: list of tuples of primary key values.
+        """
+        idents = list(dict.fromkeys(idents))
+        table = self.__table__
+
+        if (self.delete_temp_table_threshold != None) and (len(idents) > self.delete_temp_table_threshold):
+            with self._key_temp_table(idents) as keys:
+                matched = select(keys).where(
+                    and_(*[column == keys.c[column.name] for column in self._pk_columns()])).exists()
+                self.session.execute(table.delete().where(matched))
+        else:
+            for chunk in _chunks(idents, self.pk_chunk_size):
+                self.session.execute(table.delete().where(self._pk_in(chunk)))
+
+        identity_map = self.session.identity_map
+        for ident in idents:
+            instance = identity_map.get(self.session.identity_key(self._type, ident))
+            if (instance != None): self.session.expunge(instance)
+
+    def _update_changed(self, list, originals: list = None):
+        """Update only the changed columns of modified records, by primary key. 
+
+        Records are compared with their original values, as the Python types of their 
+        columns, see :py:meth:`~BaseTable._typed`. Original values not supplied are fetched 
+        from the database, in bulk, with chunked ``WHERE pk IN (...)``. Records are then grouped by set of changed columns, and 
+        each group is written with :py:meth:`~_bulk_update`. Records without changes 
+        are not written.
+
+        :param list list: the modified records, each must have all primary key columns.
+
+        :param list originals: optional. The original values of the modified records, 
+            each must have all primary key columns.
+        """
+        pk_names = [column.name for column in self._pk_columns()]
+
+        def pk_of(typed: dict) -> tuple:
+            return tuple(typed[name] for name in pk_names)
+
+        # Typed primary key: typed original row.
+        rows = {}
+        if (originals != None): 
+            for row in originals: 
+                row = self._typed(row)
+                rows[pk_of(row)] = row
+
+        typed_list = [self._typed(record) for record in list]
+
+        missing = [pk_of(typed) for typed in typed_list if pk_of(typed) not in rows]
+        if (len(missing) > 0):
+            for chunk in self._select_rows_in(self._pk_columns(), missing):
+                for row in chunk: 
+                    row = self._typed(row)
+                    rows[pk_of(row)] = row
+
+        changes = []
+        for typed in typed_list:
+            names = [name for name in typed if name not in pk_names]
+
+            # No such row: nothing to compare with, nor to update.
+            row = rows.get(pk_of(typed))
+            if (row == None): continue
+
+            changed = _changed_values(typed, row, names)
+            if (len(changed) > 0): changes.append(dict({name: typed[name] for name in pk_names}, **changed))
+
+        for group in _group_by_columns(changes): self._bulk_update(group)
+
     def _insert(self, list):
         """Within a transaction, any database exception is not raised at this point,
         they will be raised when calling flush or commit the current transaction.
@@ -511,22 +1555,35 @@ class WriteCapableTable(ReadOnlyTable):
         for record in list:
             self.session.add(self._type(**record))
 
-    def _update(self, list):
+    def _update(self, list, returning: list = None):
         """Within a transaction, any database exception is not raised at this point,
         they will be raised when calling flush or commit the current transaction.
         Rollback the current transaction will not raise an exception, i.e. any database
         violations seem to be removed by the rollback.
+
+        :param list returning: optional. Names of columns to return in the records, with 
+            ``UPDATE ... RETURNING``. Caller must check :py:meth:`~_supports_returning`.
         """
+        pk_columns = self._pk_columns()
+        columns = [] if (returning == None) else [self.__table__.columns[name] for name in returning]
+
         for entry in list:
             stmt = (
                 update(self._type)
-                .where(self._type.__table__.columns[self._primary_key] == entry[self._primary_key])
+                .where(self._key_equals(pk_columns, self._record_identity(entry)))
                 .values(entry)
                 .execution_options(synchronize_session="fetch")
           )
-            self.session.execute(stmt)
+            if (len(columns) == 0):
+                self.session.execute(stmt)
+                continue
+
+            row = self.session.execute(stmt.returning(*columns)).first()
+            if (row != None): entry.update(row._mapping)
 
-    def write_to_database(self, data: list) -> ResultStatus:
+    def write_to_database(self, data: list, changed_only: bool = False, 
+                          originals: list = None, returning: list = None, 
+                          batch_size: int = None) -> ResultStatus:
         """Write new records and modified records to the underlying database table.
 
         When all data have been written, it will flush the transaction to cause any
@@ -539,7 +1596,10 @@ class WriteCapableTable(ReadOnlyTable):
 
         :Assumptions:
 
-            1. The table has a single primary key of type integer.
+            1. The table has a single primary key of type integer, or :attr:`~id_column` \
+                names an integer primary key column. Otherwise, for composite primary \
+                keys, new records must have all primary key values, and records are \
+                updated and deleted by all primary key columns.
             2. The database already has table ``unique_id`` and stored method ``get_unique_id`` \
                 defined. Please see :ref:`getting-started-database-requirements` for more detail.
 
@@ -552,26 +1612,69 @@ class WriteCapableTable(ReadOnlyTable):
                 status = Employees().write_to_database([new_emp1, new_emp2])
                 Employees.commit_transaction(Employees)
 
-        :param list data: data contains both new records and updated records.
+        :param list data: data contains new records, updated records and deleted records.
 
         An example of ``data``::
 
             [
             	{
                     "col_1": 999, ..., "col_n": "xxx",
-                    "recStatus": "<new> | <modified>"
+                    "recStatus": "<new> | <modified> | <deleted>"
             	},
                 ...,
             	{
                     "col_1": 999, ..., "col_n": "xxx",
-                    "recStatus": "<new> | <modified>"
+                    "recStatus": "<new> | <modified> | <deleted>"
             	},
            ]           
 
+        Deleted records need only have the primary key columns. They are deleted first, 
+        with :py:meth:`~_bulk_delete`, then new records are inserted, and modified records 
+        updated, all within the same transaction.
+
         For each new record (row) in ``data``, if primary key is present, and has a valid 
         integer value, then a new unique integer Id is not requested. Otherwise, calls stored 
-        method ``get_unique_id`` with the table name and primary key column name to get next 
-        unique integer Id.
+        method ``get_unique_id`` with the table name and primary key column name, see 
+        :py:meth:`~_id_column`, to get next unique integer Id.
+
+        :param bool changed_only: ``True`` to update only the changed columns of modified 
+            records, rather than all columns present: unchanged columns, including indexed 
+            ones, are not rewritten. Modified records are compared with their original 
+            values: from ``originals``, or fetched from the database in bulk. Values are 
+            compared as the Python types of their columns, e.g. an ISO format date string 
+            and the ``date`` read from the database are equal. Records are 
+            grouped by set of changed columns, each group is written with a single batched 
+            UPDATE. Records without changes are not written. See :py:meth:`~_update_changed`.
+
+        :param list originals: optional. The original values of modified records, e.g. as 
+            read before editing, each with all primary key columns. Implies ``changed_only``.
+            Original values of modified records not in this list are fetched from the 
+            database.
+
+        :param list returning: optional. Names of columns to read back from the database, 
+            e.g. columns set by server-side defaults, triggers or computed columns. Their 
+            values are set in the records of ``{__tablename__}_new_list`` and 
+            ``{__tablename__}_updated_list``, saving a read after the write:
+
+                * New records: with batched ``INSERT ... RETURNING`` on databases which \
+                    support it, e.g. PostgreSQL, MariaDB.
+                * Modified records: with ``UPDATE ... RETURNING`` on databases which \
+                    support it, when records are updated one statement per record.
+                * Otherwise, e.g. on MySQL, or for batched updates: after writing, with a \
+                    single chunked ``SELECT ... WHERE pk IN (...)``.
+
+            ``RETURNING`` returns rows as written by the statement: changes made by 
+            ``AFTER`` triggers are not included.
+
+        :param int batch_size: optional. ``None``, the default, to write all records at once: 
+            any failure fails the whole write. Otherwise, records are written in batches of 
+            ``batch_size``, each within a savepoint. When a batch fails, it is rolled back to 
+            its savepoint and bisected, until the failing records are isolated. Valid records 
+            are written, failed records are reported in ``{__tablename__}_failed_list``, with 
+            their errors, and the write is still successful: callers commit the valid records.
+
+        When there are more modified records than :attr:`~staged_update_threshold`, they are 
+        applied with set-based UPDATEs, see :py:meth:`~_staged_update`.
            
         :return: `ResultStatus <https://bh-apistatus.readthedocs.io/en/latest/result-status.html>`_.
 
@@ -589,6 +1692,9 @@ class WriteCapableTable(ReadOnlyTable):
                 ],
                 "{__tablename__}_updated_list": [
                     {...}, ... ,{}
+                ],
+                "{__tablename__}_deleted_list": [
+                    {...}, ... ,{}
                 ]
             }
 
@@ -596,11 +1702,20 @@ class WriteCapableTable(ReadOnlyTable):
 
             | ``service_new_list``
             | ``service_updated_list``
+            | ``service_deleted_list``
+
+        Any of these lists can be empty, but not all. At least one list must have a single 
+        object in it.
 
-        Either ``{__tablename__}_new_list`` or ``{__tablename__}_updated_list`` can be empty, 
-        but not both. At least one list must have a single object in it.
+        Record/row objects in these lists have ``recStatus`` removed. With ``changed_only``, 
+        ``{__tablename__}_updated_list`` still has the modified records as given.
 
-        Record/row objects in these lists have ``recStatus`` removed.
+        With ``batch_size``, there is also ``{__tablename__}_failed_list``, and the above lists 
+        have only the records written::
+
+            "{__tablename__}_failed_list": [
+                {"record": {...}, "error": "...error text..."}, ... ,{}
+            ]
 
         On failure::
 
@@ -622,8 +1737,9 @@ class WriteCapableTable(ReadOnlyTable):
             # Prepares list of new records and updated records.
             new_list = []
             updated_list = []
+            deleted_list = []
 
-            self.__split_data(data, new_list, updated_list)
+            self._split_data(data, new_list, updated_list, deleted_list)
 
             # raise Exception('WriteCapableTable::write_to_database(...) test exception...')
 
@@ -632,22 +1748,331 @@ class WriteCapableTable(ReadOnlyTable):
 
             if (status.code != HTTPStatus.OK.value): return
 
-            if len(new_list) > 0:
-                self._insert(new_list)
+            failed_list = None
+            if (batch_size != None):
+                failed_list = self.__write_batches(batch_size, new_list, updated_list, deleted_list, 
+                                                   changed_only, originals, returning)
+            else:
+                self._write_lists(new_list, updated_list, deleted_list, changed_only, originals, returning)
+
+            deleted_idents = [self._record_identity(record) for record in deleted_list]
+            self._invalidate_cached([self._record_identity(record) for record in updated_list] + 
+                                    deleted_idents)
+
+            status = make_status(text=BH_SAVED_SUCCESSFUL_MSG)
+            status.add_data(new_list, '{}_new_list'.format(self.__tablename__.lower()))
+            status.add_data(updated_list, '{}_updated_list'.format(self.__tablename__.lower()))
+            status.add_data(deleted_list, '{}_deleted_list'.format(self.__tablename__.lower()))
+
+            if (failed_list != None):
+                status.add_data(failed_list, '{}_failed_list'.format(self.__tablename__.lower()))
+                if (len(failed_list) > 0): status.text = BH_SAVED_PARTIALLY_MSG.format(len(failed_list))
+
+        except Exception as e:
+            logger.error(str(e))
+            
+            status = make_500_status(str(e))
 
-            if len(updated_list) > 0:
+        finally:
+            logger.debug('Exited.')
+            return status
+
+    def _write_lists(self, new_list: list, updated_list: list, deleted_list: list, 
+                     changed_only: bool, originals: list, returning: list) -> None:
+        """Write split records, then flush, see :py:meth:`~write_to_database`.
+
+        :Note on Exception:
+
+        Potential unhandled exception: caller must handle the exception.
+        """
+        deleted_idents = [self._record_identity(record) for record in deleted_list]
+        if len(deleted_idents) > 0:
+            self._bulk_delete(deleted_idents)
+
+        # Records whose returning columns are to be selected after writing.
+        reselect = []
+
+        if len(new_list) > 0:
+            if (not self._insert_new(new_list, bulk=False, returning=returning)):
+                reselect.extend(new_list)
+
+        if len(updated_list) > 0:
+            if (changed_only) or (originals != None):
+                self._update_changed(updated_list, originals)
+                reselect.extend(updated_list)
+            elif (self._use_staged_update(updated_list)):
+                self._staged_update(updated_list)
+                reselect.extend(updated_list)
+            elif (returning != None) and (self._supports_returning(update=True)):
+                self._update(updated_list, returning)
+            else:
                 self._update(updated_list)
+                reselect.extend(updated_list)
+
+        # 
+        # This is to cause any potential database violation to raise exception, so
+        # that it will be handled by the caller: callers of write_to_database() just 
+        # have to work with the returned result.
+        #
+        self.session.flush()
+
+        if (returning != None) and (len(reselect) > 0): self._reselect(reselect, returning)
+
+    def __write_batches(self, batch_size: int, new_list: list, updated_list: list, deleted_list: list, 
+                        changed_only: bool, originals: list, returning: list) -> list:
+        """Write split records in batches, each within a savepoint. A failed batch is rolled 
+        back to its savepoint, then bisected: each half is written again within its own 
+        savepoint, until failing records are isolated.
+
+        Failed records are removed from ``new_list``, ``updated_list`` and ``deleted_list``.
+
+        :return: list of failed records, with their errors.
+        :rtype: list.
+        """
+        # Deleted records first, as in a single write.
+        entries = [(deleted_list, record) for record in deleted_list] + \
+            [(new_list, record) for record in new_list] + \
+            [(updated_list, record) for record in updated_list]
+
+        failed_list = []
+        failed = set()
+
+        def write(batch: list):
+            try:
+                with self.session.begin_nested():
+                    self._write_lists([record for target, record in batch if target is new_list],
+                                      [record for target, record in batch if target is updated_list],
+                                      [record for target, record in batch if target is deleted_list],
+                                      changed_only, originals, returning)
+                return
+
+            except Exception as e:
+                if (len(batch) > 1):
+                    logger.debug(f"Batch of {len(batch)} records failed, bisecting: {str(e)}")
+                else:
+                    logger.error(str(e))
+
+                    failed_list.append({'record': batch[0][1], 'error': str(e)})
+                    failed.add(id(batch[0][1]))
+                    return
+
+            middle = len(batch) // 2
+            write(batch[:middle])
+            write(batch[middle:])
+
+        for batch in _chunks(entries, batch_size): write(batch)
+
+        for target in (new_list, updated_list, deleted_list):
+            target[:] = [record for record in target if id(record) not in failed]
+
+        return failed_list
+
+    def delete_by_pk(self, keys: list) -> ResultStatus:
+        """Delete records by primary key values, with :py:meth:`~_bulk_delete`: chunked 
+        ``DELETE ... WHERE pk IN (...)``, or a single ``DELETE`` joined against a temporary 
+        table of keys for more than :attr:`~delete_temp_table_threshold` keys.
+
+        :Transaction: callers must either call 
+            :py:meth:`~bh_database.core.BaseSQLAlchemy.commit_transaction` 
+            or :py:meth:`~bh_database.core.BaseSQLAlchemy.rollback_transaction`, as for
+            :py:meth:`~write_to_database`. Deletes can be in the same transaction as other 
+            writes.
+
+        :param list keys: list of primary key values. For tables with composite primary 
+            keys, each key is a tuple of values, in the order of the primary key columns. 
+            Keys which do not exist are ignored.
+
+        :return: `ResultStatus <https://bh-apistatus.readthedocs.io/en/latest/result-status.html>`_.
+
+        On successful::
+
+            {
+                "status": {
+                    "code": 200,
+                    "text": "Data has been deleted successfully."
+                },
+                "{__tablename__}_deleted_list": [
+                    {primary key columns}, ... ,{}
+                ]
+            }
+
+        On failure::
+
+            {
+                "status": {
+                    "code": 500,
+                    "text": "...error text..."
+                }
+            }
+        """
+
+        logger.debug('Entered')
+        try:
+            idents = [self._identity(key) for key in keys]
+            pk_names = [column.name for column in self._pk_columns()]
+
+            if (len(idents) > 0): self._bulk_delete(idents)
+
+            # 
+            # This is to cause any potential database violation to raise exception.
+            #
+            self.session.flush()
+
+            self._invalidate_cached(idents)
+
+            status = make_status(text=BH_DELETED_SUCCESSFUL_MSG)
+            status.add_data([dict(zip(pk_names, ident)) for ident in idents], 
+                            '{}_deleted_list'.format(self.__tablename__.lower()))
+
+        except Exception as e:
+            logger.error(str(e))
+            
+            status = make_500_status(str(e))
+
+        finally:
+            logger.debug('Exited.')
+            return status
+
+    def sync_to_database(self, records: list, key=None, delete: bool = False) -> ResultStatus:
+        """Synchronise a dataset with the underlying database table: write only the 
+        differences.
+
+        Records need not be tagged ``new`` or ``modified``. Existing rows are fetched in 
+        chunks, and compared with incoming records client-side, on the compared columns. 
+        Then:
+
+            * Incoming records with no existing row, or without key values, are inserted, \
+                with a single batched INSERT. New Ids are requested as for \
+                :py:meth:`~write_to_database` for records without a primary key value.
+            * Changed rows are updated, only the changed columns, with batched UPDATEs \
+                grouped by set of changed columns.
+            * Unchanged rows are not written.
+            * If ``delete`` is ``True``, existing rows with no incoming record are deleted.
+
+        Compared columns are the columns of the incoming records, except key and primary 
+        key columns. Values are compared as the Python types of their columns: e.g. an ISO 
+        format string ``'1986-06-26'`` and the ``date`` read from the database are equal. 
+        Changed values are written as such typed values.
+
+        :Transaction: callers must either call 
+            :py:meth:`~bh_database.core.BaseSQLAlchemy.commit_transaction` 
+            or :py:meth:`~bh_database.core.BaseSQLAlchemy.rollback_transaction`, as for
+            :py:meth:`~write_to_database`.
+
+        :param list records: the dataset, list of dictionaries of column name, value pairs.
+            ``recStatus``, if present, is ignored and removed.
+
+        :param key: a column name, or a list of column names, which identifies records. It
+            must be unique. ``None``, the default, for the primary key.
+
+        :param bool delete: ``True`` if ``records`` is the full dataset: rows which are not in 
+            it are deleted. Then all rows of the table are fetched, in key order, with keyset 
+            pagination. Otherwise, only rows with incoming keys are fetched, with chunked 
+            ``WHERE key IN (...)``.
+
+        :return: `ResultStatus <https://bh-apistatus.readthedocs.io/en/latest/result-status.html>`_.
+
+        On successful, with lists of what was written::
+
+            {
+                "status": {
+                    "code": 200,
+                    "text": "Data has been saved successfully."
+                },
+                "{__tablename__}_new_list": [
+                    {...}, ... ,{}
+                ],
+                "{__tablename__}_updated_list": [
+                    {primary key columns and changed columns}, ... ,{}
+                ],
+                "{__tablename__}_deleted_list": [
+                    {primary key columns}, ... ,{}
+                ]
+            }
+
+        On failure::
+
+            {
+                "status": {
+                    "code": 500,
+                    "text": "...error text..."
+                }
+            }
+        """
+
+        logger.debug('Entered')
+        try:
+            key_columns = self._key_columns(key)
+            key_names = [column.name for column in key_columns]
+            pk_names = [column.name for column in self._pk_columns()]
+
+            for record in records: record.pop(BH_REC_STATUS_FIELDNAME, None)
+
+            new_list = []
+            updated_list = []
+            deleted_list = []
+
+            # Typed key: (record, typed record)
+            incoming = {}
+            for record in records:
+                typed = self._typed(record)
+
+                # No key to match: new, Ids are allocated below.
+                if any(typed.get(name) == None for name in key_names):
+                    new_list.append(record)
+                    continue
+
+                incoming[tuple(typed[name] for name in key_names)] = (record, typed)
+
+            if (delete):
+                chunks = self._scan_rows(key_columns)
+            else:
+                chunks = self._select_rows_in(key_columns, [*incoming.keys()])
+
+            seen = set()
+
+            for rows in chunks:
+                for row in rows:
+                    row = self._typed(row)
+                    ident = tuple(row[name] for name in key_names)
+                    pk = {name: row[name] for name in pk_names}
+
+                    if (ident not in incoming):
+                        deleted_list.append(pk)
+                        continue
+
+                    seen.add(ident)
+                    _, typed = incoming[ident]
+
+                    names = [name for name in typed 
+                             if (name not in key_names) and (name not in pk_names)]
+
+                    changed = _changed_values(typed, row, names)
+                    if (len(changed) > 0): updated_list.append(dict(pk, **changed))
+
+            new_list.extend(record for ident, (record, _) in incoming.items() if ident not in seen)
+
+            status = self.__set_new_id(new_list)
+            if (status.code != HTTPStatus.OK.value): return
+
+            if (len(new_list) > 0): self._insert_new(new_list)
+
+            for group in _group_by_columns(updated_list): self._bulk_update(group)
+
+            idents = [self._record_identity(record) for record in deleted_list]
+            if (len(idents) > 0): self._bulk_delete(idents)
 
             # 
-            # This is to cause any potential database violation to raise exception, so
-            # that it will be handled by the exception block below: callers just have
-            # to work with the returned result.
+            # This is to cause any potential database violation to raise exception.
             #
             self.session.flush()
 
+            self._invalidate_cached([self._record_identity(record) for record in updated_list] + idents)
+
             status = make_status(text=BH_SAVED_SUCCESSFUL_MSG)
             status.add_data(new_list, '{}_new_list'.format(self.__tablename__.lower()))
             status.add_data(updated_list, '{}_updated_list'.format(self.__tablename__.lower()))
+            status.add_data(deleted_list, '{}_deleted_list'.format(self.__tablename__.lower()))
 
         except Exception as e:
             logger.error(str(e))
@@ -656,4 +2081,4 @@ class WriteCapableTable(ReadOnlyTable):
 
         finally:
             logger.debug('Exited.')
-            return status
\ No newline at end of file
+            return status
@@ -0,0 +1,136 @@
+"""Batch loader, the DataLoader pattern: coalesce many keyed lookups into one query.
+
+Business code often resolves keys one at a time in loops, which produces one query
+per key, the so-called N+1 queries problem. A batch loader collects key requests
+during a unit of work, e.g. an HTTP request, and resolves all pending keys at once
+with a single chunked ``WHERE pk IN (...)`` query, or a join against a temporary
+table of keys when there are very many of them.
+
+A batch loader is created via :py:meth:`~bh_database.base_table.BaseTable.batch_loader`.
+E.g.::
+
+    loader = Employees().batch_loader()
+
+    # Nothing is queried yet.
+    pending = [loader.load(emp_no) for emp_no in emp_numbers]
+
+    # The first access to a value resolves all pending keys in one go.
+    records = [item.value for item in pending]
+
+    # Or, in one call:
+    records = loader.load_many(emp_numbers)
+
+Loaded records are remembered for the lifetime of the loader, so a batch loader
+should be request scoped: create a new one for each unit of work.
+
+For usage examples, see ``./tests/test_41_batch_loader.py``.
+"""
+
+class LoaderItem:
+    """A pending key lookup, returned by :py:meth:`BatchLoader.load`.
+
+    :param BatchLoader loader: the batch loader which created this item.
+
+    :param tuple ident: primary key values.
+    """
+
+    def __init__(self, loader, ident: tuple):
+        self._loader = loader
+        self._ident = ident
+
+    @property
+    def value(self) -> dict:
+        """Read only property. The record, a serialised dictionary, ``None`` if the
+        key does not exist.
+
+        If the key has not been resolved, all pending keys of the batch loader are
+        resolved first.
+        """
+        return self._loader._resolve(self._ident)
+
+class BatchLoader:
+    """Collect primary key lookups against a table, and resolve them in batch.
+
+    :param table: an instance of a :py:class:`~bh_database.base_table.BaseTable`
+        subclass, the table to load records from.
+
+    :param int temp_table_threshold: when the number of keys to be queried exceeds
+        this value, the keys are loaded into a temporary table, and records are
+        selected with a join against it, instead of ``WHERE pk IN (...)``. ``None``
+        to always use ``WHERE pk IN (...)``.
+    """
+
+    def __init__(self, table, temp_table_threshold: int = None):
+        self._table = table
+        self._temp_table_threshold = temp_table_threshold
+        self._pending = {}
+        self._results = {}
+
+    def load(self, key) -> LoaderItem:
+        """Request a record by its primary key value(s). Nothing is queried.
+
+        :param key: primary key value, or a tuple of values for composite keys.
+
+        :return: a :py:class:`LoaderItem`, whose :attr:`~LoaderItem.value` is the record.
+        """
+        ident = self._table._identity(key)
+        if (ident not in self._results): self._pending[ident] = None
+
+        return LoaderItem(self, ident)
+
+    def load_many(self, keys: list) -> list:
+        """Request records by primary key values, and resolve them.
+
+        :param list keys: list of primary key values, or of tuples of values for
+            composite keys.
+
+        :return: list of records, serialised dictionaries, in the order of ``keys``.
+            ``None`` in place of keys which do not exist.
+        :rtype: list.
+        """
+        items = [self.load(key) for key in keys]
+        self.dispatch()
+        return [item.value for item in items]
+
+    def prime(self, key, record: dict) -> None:
+        """Put a record already at hand into the loader, so it is not queried.
+
+        :param key: primary key value, or a tuple of values for composite keys.
+
+        :param dict record: the record, a serialised dictionary.
+        """
+        ident = self._table._identity(key)
+        self._pending.pop(ident, None)
+        self._results[ident] = record
+
+    def clear(self) -> None:
+        """Forget all loaded records and all pending keys.
+        """
+        self._pending.clear()
+        self._results.clear()
+
+    def dispatch(self) -> None:
+        """Resolve all pending keys, with as few queries as possible.
+
+        :Note on Exception:
+
+        Potential unhandled exception: caller must handle the exception.
+        """
+        if (len(self._pending) == 0): return
+
+        idents = list(self._pending.keys())
+        self._pending.clear()
+
+        use_temp_table = (self._temp_table_threshold != None) and \
+            (len(idents) > self._temp_table_threshold)
+
+        found = self._table._load_by_pk(idents, use_temp_table)
+        for ident in idents:
+            self._results[ident] = found.get(ident)
+
+    def _resolve(self, ident: tuple) -> dict:
+        if (ident not in self._results):
+            self._pending[ident] = None
+            self.dispatch()
+
+        return self._results[ident]
@@ -0,0 +1,275 @@
+"""Result caches for data read from the database.
+
+A cache stores serialised records, i.e. dictionaries as returned in
+`ResultStatus <https://bh-apistatus.readthedocs.io/en/latest/result-status.html>`_
+``data``, under string keys. Each entry is tagged with the name of the table it
+was read from, so that all entries of a table can be invalidated when the table
+is written to.
+
+Applications enable caching by assigning a cache instance to the
+:attr:`~bh_database.base_table.BaseTable.l2_cache` class attribute of a table class,
+or of :py:class:`~bh_database.base_table.BaseTable` for all tables. E.g.::
+
+    Employees.l2_cache = TTLCache(ttl=60, max_entries=50000)
+
+:py:class:`TTLCache` is per process. Multi-worker deployments, e.g. gunicorn with many
+workers on one host, should rather use :py:class:`SQLiteCache`: a single cache shared by
+all workers, which needs no external service. E.g.::
+
+    BaseTable.l2_cache = SQLiteCache('/var/cache/myapp/bh_cache.db', ttl=60)
+
+For usage examples, see ``./tests/test_40_cache.py``.
+"""
+
+import os
+import time
+import pickle
+import sqlite3
+import threading
+import itertools
+from collections import OrderedDict
+
+from bh_database import logger
+
+def make_key(tablename: str, keys: tuple) -> str:
+    """Make a cache key for a record identified by its primary key values.
+
+    :param str tablename: the table name.
+
+    :param tuple keys: primary key value(s) of the record.
+
+    :return: the cache key, e.g. ``employees:(10001,)``.
+    :rtype: str.
+    """
+    return f"{tablename}:{keys!r}"
+
+class CacheBackend:
+    """The interface of all cache backends.
+
+    All methods must be thread-safe.
+    """
+
+    def get(self, key: str):
+        """Get a cached value.
+
+        :param str key: the cache key, see :py:func:`make_key`.
+
+        :return: the cached value, ``None`` if not cached or expired.
+        """
+        raise NotImplementedError
+
+    def set(self, key: str, value, table: str) -> None:
+        """Cache a value.
+
+        :param str key: the cache key, see :py:func:`make_key`.
+
+        :param value: the value to cache.
+
+        :param str table: the name of the table the value was read from.
+        """
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """Remove a value from the cache, if it is cached.
+
+        :param str key: the cache key, see :py:func:`make_key`.
+        """
+        raise NotImplementedError
+
+    def invalidate(self, table: str) -> None:
+        """Remove all values read from a table.
+
+        :param str table: the table name.
+        """
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Remove all values.
+        """
+        raise NotImplementedError
+
+class TTLCache(CacheBackend):
+    """An in-process cache, with time-to-live expiry and least recently used eviction.
+
+    :param float ttl: time-to-live of entries in seconds.
+
+    :param int max_entries: the maximum number of entries. When full, the least
+        recently used entry is evicted.
+    """
+
+    def __init__(self, ttl: float = 300, max_entries: int = 10000):
+        self._ttl = ttl
+        self._max_entries = max_entries
+        # key: (expires_at, table, value)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if (entry == None): return None
+
+            if (entry[0] <= time.monotonic()):
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def set(self, key: str, value, table: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl, table, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate(self, table: str) -> None:
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[1] == table]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class SQLiteCache(CacheBackend):
+    """A cache shared by all processes on one host, stored in a SQLite database file, with
+    time-to-live expiry and least recently used eviction.
+
+    Values are stored in `pickle <https://docs.python.org/3/library/pickle.html>`_ binary 
+    format. The database is in `WAL <https://www.sqlite.org/wal.html>`_ journal mode, 
+    readers do not block the writer and vice versa. Since all processes share the same 
+    store, invalidating a table, e.g. when it is written to, applies to all of them.
+
+    Each thread of each process uses its own SQLite connection. It is safe to create an 
+    instance before forking worker processes: connections are never shared with forked 
+    children.
+
+    All processes share the database's single write lock. Reads write only to record the
+    last access of an entry, for least recently used eviction, and at most once every 
+    ``touch_interval`` seconds per entry. Expired entries are left to eviction.
+
+    The cache is an optimisation: SQLite errors, e.g. ``database is locked`` after 
+    ``timeout``, are logged, then a read is a miss and a write does nothing.
+
+    :param str path: the database file path. It is created if it does not exist. All 
+        processes sharing the cache must use the same path.
+
+    :param float ttl: time-to-live of entries in seconds.
+
+    :param int max_entries: the approximate maximum number of entries. Expired and least
+        recently used entries are evicted once every ``max_entries // 100`` writes, so 
+        the cache may briefly exceed this number.
+
+    :param float timeout: seconds to wait for a lock held by another process.
+
+    :param float touch_interval: seconds between recordings of the last access of an entry.
+    """
+
+    def __init__(self, path: str, ttl: float = 300, max_entries: int = 100000, timeout: float = 5.0,
+                 touch_interval: float = 10.0):
+        self._path = path
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._timeout = timeout
+        self._touch_interval = touch_interval
+        self._evict_every = max(1, max_entries // 100)
+        # next() is atomic, and unlike a lock, never left held in a forked child.
+        self._writes = itertools.count(1)
+        self._local = threading.local()
+
+        with self._connection() as connection:
+            connection.execute("create table if not exists bh_cache (key text primary key, "
+                               "tbl text not null, expires real not null, accessed real not null, "
+                               "value blob not null)")
+            connection.execute("create index if not exists bh_cache_tbl on bh_cache (tbl)")
+            connection.execute("create index if not exists bh_cache_accessed on bh_cache (accessed)")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+
+        # A connection inherited from the parent process must not be used.
+        if (connection == None) or (self._local.pid != os.getpid()):
+            connection = sqlite3.connect(self._path, timeout=self._timeout, isolation_level=None)
+            connection.execute("pragma journal_mode=wal")
+            connection.execute("pragma synchronous=normal")
+
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+
+        return connection
+
+    def _failed(self, action: str, e: Exception) -> None:
+        logger.error(f"SQLiteCache {action}: {str(e)}")
+
+    def get(self, key: str):
+        try:
+            connection = self._connection()
+            now = time.time()
+
+            row = connection.execute("select expires, accessed, value from bh_cache where key = ?", 
+                                     (key,)).fetchone()
+            if (row == None) or (row[0] <= now): return None
+
+            if (now - row[1] >= self._touch_interval):
+                connection.execute("update bh_cache set accessed = ? where key = ?", (now, key))
+
+            return pickle.loads(row[2])
+
+        except sqlite3.Error as e:
+            self._failed('get', e)
+            return None
+
+    def set(self, key: str, value, table: str) -> None:
+        try:
+            self._set(key, value, table)
+        except sqlite3.Error as e:
+            self._failed('set', e)
+
+    def _set(self, key: str, value, table: str) -> None:
+        connection = self._connection()
+        now = time.time()
+
+        connection.execute("insert or replace into bh_cache (key, tbl, expires, accessed, value) "
+                           "values (?, ?, ?, ?, ?)", (key, table, now + self._ttl, now, 
+                           pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)))
+
+        if (next(self._writes) % self._evict_every == 0): self._evict(connection, now)
+
+    def _evict(self, connection: sqlite3.Connection, now: float) -> None:
+        connection.execute("delete from bh_cache where expires <= ?", (now,))
+
+        excess = connection.execute("select count(*) from bh_cache").fetchone()[0] - self._max_entries
+        if (excess > 0):
+            connection.execute("delete from bh_cache where key in "
+                               "(select key from bh_cache order by accessed limit ?)", (excess,))
+
+    def delete(self, key: str) -> None:
+        try:
+            self._connection().execute("delete from bh_cache where key = ?", (key,))
+        except sqlite3.Error as e:
+            self._failed('delete', e)
+
+    def invalidate(self, table: str) -> None:
+        try:
+            self._connection().execute("delete from bh_cache where tbl = ?", (table,))
+        except sqlite3.Error as e:
+            self._failed('invalidate', e)
+
+    def clear(self) -> None:
+        try:
+            self._connection().execute("delete from bh_cache")
+        except sqlite3.Error as e:
+            self._failed('clear', e)
+
+    def __len__(self) -> int:
+        return self._connection().execute("select count(*) from bh_cache where expires > ?", 
+                                          (time.time(),)).fetchone()[0]
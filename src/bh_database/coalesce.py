@@ -0,0 +1,199 @@
+"""Single-flight request coalescing for identical concurrent reads.
+
+Under traffic spikes, many threads or asyncio tasks often run the very same read at the
+same moment: the same search page, the same lookup. Each of them takes its own pooled
+connection, and the database server does the same work many times over.
+
+A single-flight group coalesces such calls: calls are keyed, typically by statement plus
+parameters, the first caller of a key, the *leader*, runs the database call, while later
+callers of the same key, *followers*, which arrive whilst the leader's call is in flight
+wait for it, and all receive its result. Once the call completes the key is forgotten:
+there is no caching, hence no staleness, the next call of the same key runs again.
+
+    * :py:class:`SingleFlight`: for threads.
+    * :py:class:`AsyncSingleFlight`: for asyncio tasks, within a single event loop.
+
+Applications enable coalescing of :py:meth:`~bh_database.base_table.ReadOnlyTable.run_select_sql`
+and :py:meth:`~bh_database.base_table.WriteCapableTable.run_stored_proc` by assigning a
+:py:class:`SingleFlight` instance to the :attr:`~bh_database.base_table.BaseTable.single_flight`
+class attribute of a table class, or of :py:class:`~bh_database.base_table.BaseTable` for
+all tables. E.g.::
+
+    BaseTable.single_flight = SingleFlight()
+
+Only standalone reads, i.e. called with ``auto_session=True``, are coalesced: a read within
+an ongoing transaction must see the transaction's own writes.
+
+For usage examples, see ``./tests/test_43_coalesce.py``.
+"""
+
+import copy
+import asyncio
+import threading
+
+from bh_database.drivers import tenant_schema
+
+def make_flight_key(*parts) -> str:
+    """Make a single-flight key.
+
+    The schema of the current tenant, see :py:data:`~bh_database.drivers.tenant_schema`,
+    is part of the key: identical statements of different tenants are not coalesced.
+
+    :param parts: the parts identifying a call, e.g. a method name, a SQL statement and
+        its parameters.
+
+    :return: the key.
+    :rtype: str.
+    """
+    return repr((tenant_schema.get(),) + parts)
+
+class _Call:
+    """A call in flight.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+class _FlightGroup:
+    """Common to :py:class:`SingleFlight` and :py:class:`AsyncSingleFlight`.
+    """
+
+    def __init__(self, copy_results: bool = True):
+        self._copy_results = copy_results
+        self._calls = {}
+
+        #: The number of calls which ran, as leaders.
+        self.calls = 0
+        #: The number of calls which received the result of another call in flight.
+        self.shared = 0
+
+    def _share(self, result):
+        return copy.deepcopy(result) if self._copy_results else result
+
+    def in_flight(self) -> int:
+        """The number of keys which have a call in flight.
+        """
+        return len(self._calls)
+
+class SingleFlight(_FlightGroup):
+    """Coalesce identical concurrent calls made from multiple threads.
+
+    :param bool copy_results: ``True`` to give each caller its own deep copy of a shared
+        result, so that callers can modify results independently. ``False`` to give all
+        callers the very same object, which they then must treat as read only. A result
+        which is not shared is never copied.
+    """
+
+    def __init__(self, copy_results: bool = True):
+        super().__init__(copy_results)
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn, *args, **kwargs):
+        """Call ``fn(*args, **kwargs)``, unless a call of the same key is in flight, in
+        which case wait for it and return its result.
+
+        :param str key: the call key, see :py:func:`make_flight_key`.
+
+        :param fn: the function to call.
+
+        :return: the result of ``fn``.
+
+        :Note on Exception:
+
+        An exception raised by ``fn`` is raised to the leader and to all followers.
+        Caller must handle the exception.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = (call == None)
+
+            if (leader):
+                call = _Call()
+                self._calls[key] = call
+                self.calls += 1
+            else:
+                call.followers += 1
+                self.shared += 1
+
+        if (not leader):
+            call.done.wait()
+            if (call.error != None): raise call.error
+            return self._share(call.result)
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # No follower can join once the key is removed.
+            with self._lock:
+                del self._calls[key]
+                shared = (call.followers > 0)
+
+            call.done.set()
+
+        """
+        Followers copy the result the leader holds: the leader must not return the very
+        same object, the caller could modify it while followers are copying it.
+        """
+        return self._share(call.result) if shared else call.result
+
+class AsyncSingleFlight(_FlightGroup):
+    """Coalesce identical concurrent calls made from asyncio tasks of a single event loop.
+
+    If the leader task is cancelled, followers waiting for its call are cancelled too.
+    Cancelling a follower does not affect the leader nor other followers.
+
+    :param bool copy_results: see :py:class:`SingleFlight`.
+    """
+
+    async def do(self, key: str, fn, *args, **kwargs):
+        """Await ``fn(*args, **kwargs)``, unless a call of the same key is in flight, in
+        which case wait for it and return its result.
+
+        :param str key: the call key, see :py:func:`make_flight_key`.
+
+        :param fn: the coroutine function to call.
+
+        :return: the result of ``fn``.
+
+        :Note on Exception:
+
+        An exception raised by ``fn`` is raised to the leader and to all followers.
+        Caller must handle the exception.
+        """
+        call = self._calls.get(key)
+
+        if (call != None):
+            call.followers += 1
+            self.shared += 1
+
+            # Shielded: cancelling this follower must not cancel the call of the others.
+            result = await asyncio.shield(call.future)
+            return self._share(result)
+
+        call = _Call()
+        call.future = asyncio.get_running_loop().create_future()
+        self._calls[key] = call
+        self.calls += 1
+
+        try:
+            result = await fn(*args, **kwargs)
+        except asyncio.CancelledError:
+            call.future.cancel()
+            raise
+        except BaseException as e:
+            # Without followers, nobody retrieves the exception from the future.
+            if (call.followers > 0): call.future.set_exception(e)
+            else: call.future.cancel()
+            raise
+        else:
+            call.future.set_result(result)
+        finally:
+            del self._calls[key]
+
+        return self._share(result) if (call.followers > 0) else result
@@ -14,6 +14,10 @@ BH_RECORD_STATUS_NEW = "new"
 #: :meth:`write_to_database(self, data: list) -> ResultStatus \
 #: <bh_database.base_table.WriteCapableTable.write_to_database>`.
 BH_RECORD_STATUS_MODIFIED = "modified"
+#: Write-pending ``deleted`` records -- these records are to be deleted. See \
+#: :meth:`write_to_database(self, data: list) -> ResultStatus \
+#: <bh_database.base_table.WriteCapableTable.write_to_database>`.
+BH_RECORD_STATUS_DELETED = "deleted"
 #: Write-pending ``unchanged`` records. Not used.
 BH_RECORD_STATUS_UNCHANGED = "unchanged"
 
@@ -35,4 +39,27 @@ BH_RETRIEVED_SUCCESSFUL_MSG = "Data has been retrieved successfully."
 #: Pending data have been successfully written to the database. See \
 #: :meth:`write_to_database(self, data: list) -> ResultStatus \
 #: <bh_database.base_table.WriteCapableTable.write_to_database>`.
-BH_SAVED_SUCCESSFUL_MSG = "Data has been saved successfully."
\ No newline at end of file
+BH_SAVED_SUCCESSFUL_MSG = "Data has been saved successfully."
+#: Pending data have been written to the database, except some failed records. See \
+#: :meth:`write_to_database(self, data: list) -> ResultStatus \
+#: <bh_database.base_table.WriteCapableTable.write_to_database>`.
+BH_SAVED_PARTIALLY_MSG = "Data has been saved, except {0} record(s) which failed."
+#: Records have been deleted successfully. See \
+#: :meth:`delete_by_pk(self, keys: list) -> ResultStatus \
+#: <bh_database.base_table.WriteCapableTable.delete_by_pk>`.
+BH_DELETED_SUCCESSFUL_MSG = "Data has been deleted successfully."
+#: A record references a :py:class:`~bh_database.unit_of_work.TempId` which is not the primary 
+#: key of any new record in the unit of work. See :meth:`write(self) -> ResultStatus \
+#: <bh_database.unit_of_work.UnitOfWork.write>`.
+BH_UNRESOLVED_TEMP_ID_MSG = "{0}.{1} references a TempId which is not the primary key of any new record."
+#: A sequence for new Ids does not exist. See :py:class:`~bh_database.id_generators.SequenceIdGenerator`.
+BH_ID_SEQUENCE_NOT_FOUND_MSG = "Id sequence {!r} does not exist."
+#: MySQL ``AUTO_INCREMENT`` values of a multi-row ``INSERT`` may not be consecutive. See \
+#: :py:class:`~bh_database.id_generators.IdentityIdGenerator`.
+BH_AUTOINC_LOCK_MODE_MSG = "innodb_autoinc_lock_mode {} does not guarantee consecutive AUTO_INCREMENT values of a multi-row INSERT."
+#: A worker Id does not fit its bits. See :py:class:`~bh_database.id_generators.SnowflakeIdGenerator`.
+BH_WORKER_ID_RANGE_MSG = "Worker Id {0} does not fit in {1} bits."
+#: No worker Id is configured. See :py:class:`~bh_database.id_generators.SnowflakeIdGenerator`.
+BH_WORKER_ID_REQUIRED_MSG = "No worker Id: pass worker_id, or set environment variable {0}."
+#: The clock has moved backwards. See :py:class:`~bh_database.id_generators.SnowflakeIdGenerator`.
+BH_CLOCK_BACKWARDS_MSG = "Clock moved backwards by {0} milliseconds, refusing to generate Ids."
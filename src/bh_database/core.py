@@ -3,9 +3,12 @@
 These classes currently support only two database types: MySQL and PostgreSQL. Drivers 
 required, respectively:
 
-    * `https://pypi.org/project/mysql-connector-python/ <https://pypi.org/project/mysql-connector-python/>`_.
+    * `https://pypi.org/project/mysql-connector-python/ <https://pypi.org/project/mysql-connector-python/>`_, 
+      or `https://pypi.org/project/mysqlclient/ <https://pypi.org/project/mysqlclient/>`_.
     * `https://pypi.org/project/psycopg2/ <https://pypi.org/project/psycopg2/>`_.
 
+Driver differences are encapsulated in module :py:doc:`drivers`.
+
 Later classes, see module :py:doc:`base_table`, which implement base models (tables) that 
 provide wrapper methods to run full SQL statements, and stored methods. There are some 
 differences between drivers on stored methods execution, that is why only MySQL and PostgreSQL 
@@ -44,16 +47,21 @@ To connect to a database server, applications should not have do not more than::
     Database.connect(db_url, [schema | None])
 """
 
+import os
 from enum import Enum
+from contextlib import contextmanager
 
 from http import HTTPStatus
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import (
     sessionmaker, 
     scoped_session,
     DeclarativeBase,
     close_all_sessions,
+    configure_mappers,
+    load_only,
     Query,
 )
 from sqlalchemy.orm.decl_api import DeclarativeMeta
@@ -61,9 +69,20 @@ from sqlalchemy.orm.decl_api import DeclarativeMeta
 from bh_apistatus.result_status import ResultStatus
 
 from bh_database.paginator import Paginator
+from bh_database.drivers import (
+    DriverAdapter,
+    make_adapter,
+    tenant_schema,
+)
+from bh_database.statements import StatementRegistry
+from bh_database.request_scope import current_scope
 
 from bh_database import logger
 
+#: Key in `Session.info <https://docs.sqlalchemy.org/en/20/orm/session_api.html#sqlalchemy.orm.Session.info>`_
+#: for callables to be called after the current transaction commits.
+BH_AFTER_COMMIT_KEY = 'bh_after_commit'
+
 #: 
 class Base(DeclarativeBase):
     metaclass=DeclarativeMeta
@@ -77,16 +96,45 @@ class BaseQuery(Query):
     :attr:`~.BaseSQLAlchemy.query` set to this custom query class, therefore, automatically has 
     pagination capability.
     """
-    def paginate(self, page: int, per_page: int) -> Paginator:
+    def paginate(self, page: int, per_page: int, read_only: bool = False) -> Paginator:
         """Pagination method.
 
         :param int page: the page number to retrieve data for.
 
         :param int per_page: how many records to retrieve for each page.
 
+        :param bool read_only: when no transaction is in progress, ``True`` to count and 
+            retrieve within a read only transaction, see 
+            :py:meth:`~bh_database.drivers.DriverAdapter.begin_read_only`: both see the 
+            same data. As with the transaction SQLAlchemy otherwise starts, it is left in 
+            progress, and paginated instances stay attached to the session: the caller 
+            ends it, and must not write within it. Default is ``False``. Within a 
+            transaction in progress, ignored.
+
         :return: a :py:class:`.paginator.Paginator` instance.
         """
+        if (read_only) and (not self.session.in_transaction()): 
+            Database.adapter.begin_read_only(self.session)
+
         return Paginator(self, page, per_page).execute()
+
+    def columns(self, *names: str) -> 'BaseQuery':
+        """Column projection: load only the named columns of the query's model (table).
+
+        The other columns are deferred: they are neither selected nor decoded, they are 
+        loaded on first access. :py:meth:`~bh_database.base_table.BaseTable.as_dict` 
+        serialises only the loaded columns. E.g.::
+
+            query = Employees.query.columns('emp_no', 'last_name').filter(Employees.emp_no < 10100)
+            records = [employee.as_dict() for employee in query.paginate(1, 10).items]
+
+        :param names: attribute names of the columns to load. Primary key columns are 
+            always loaded.
+
+        :return: a new :py:class:`BaseQuery`.
+        """
+        entity = self.column_descriptions[0]['entity']
+        return self.options(load_only(*[getattr(entity, name) for name in names]))
     
 class BaseModel(object):
     """A custom base model / table class for `SQLAlchemy declarative base model 
@@ -160,6 +208,49 @@ class BaseSQLAlchemy(Base, BaseModel):
         """
         if not self.session.in_transaction(): self.session.begin()
 
+    def begin_read_only_transaction(self):
+        """Start a new read only transaction: several reads see the same data, and the 
+        database server can skip work needed only by writes. Writes fail within a read 
+        only transaction. See :py:meth:`~bh_database.drivers.DriverAdapter.begin_read_only`.
+
+        Does nothing if a transaction is in progress. End it with 
+        :py:meth:`~commit_transaction`, or rather use :py:meth:`~read_only_transaction`.
+        """
+        if not self.session.in_transaction(): Database.adapter.begin_read_only(self.session)
+
+    @contextmanager
+    def read_only_transaction(self):
+        """Context manager. Run reads within a read only transaction, see 
+        :py:meth:`~begin_read_only_transaction`, which is committed on exit, or rolled 
+        back on exception. E.g.::
+
+            employees = Employees()
+            with employees.read_only_transaction():
+                status = employees.run_select_sql(SELECT_EMPLOYEES)
+                totals = employees.run_select_sql(SELECT_TOTALS)
+
+        Within a transaction in progress, reads are part of that transaction, which is 
+        not ended on exit.
+        """
+        if (self.session.in_transaction()):
+            yield
+            return
+
+        self.begin_read_only_transaction()
+        try:
+            yield
+        except BaseException:
+            self.rollback_transaction()
+            raise
+
+        self.commit_transaction()
+
+    def _begin_read(self) -> None:
+        """Begin a stand-alone read, unless a transaction is in progress. See 
+        :py:meth:`~bh_database.drivers.DriverAdapter.begin_read`.
+        """
+        if not self.session.in_transaction(): Database.adapter.begin_read(self.session)
+
     def flush_transaction(self):
         """Flush an ongoing transaction.
 
@@ -189,18 +280,41 @@ class BaseSQLAlchemy(Base, BaseModel):
         It is recommended to call :py:meth:`~finalise_transaction` instead.
         """
         self.session.commit()
+        callbacks = self.session.info.pop(BH_AFTER_COMMIT_KEY, [])
         self.session.close()
 
+        for callback in callbacks: callback()
+
     def rollback_transaction(self):
         """Rollback a current transaction.
 
         When absolutely certain that the ongoing transaction must be rolled back, then call
         this method. Otherwise it is recommended to call :py:meth:`~finalise_transaction` 
         instead.
+
+        Results memoised in the current request scope are dropped, they may have read 
+        rolled back data. See :py:mod:`bh_database.request_scope`.
         """
         self.session.rollback()
+        self.session.info.pop(BH_AFTER_COMMIT_KEY, None)
         self.session.close()
 
+        scope = current_scope()
+        if (scope != None): scope.clear()
+
+    def after_commit(self, callback) -> None:
+        """Register a callable to be called, without arguments, after the current transaction 
+        has been committed via :py:meth:`~commit_transaction`. 
+        
+        Callbacks are discarded if the transaction is rolled back via :py:meth:`~rollback_transaction`.
+
+        For example, cached data invalidation must also happen after the commit, otherwise another 
+        connection could read and cache the old data again before the commit.
+
+        :param callback: a callable which takes no argument.
+        """
+        self.session.info.setdefault(BH_AFTER_COMMIT_KEY, []).append(callback)
+
     def finalise_transaction(self, status: ResultStatus):
         """Commit or rollback a transaction based on ``status.code``.
 
@@ -245,6 +359,28 @@ class Database:
         | engine = None. When set, is of type `sqlalchemy.future.engine.Engine <https://docs.sqlalchemy.org/en/14/core/future.html>`_.
         | session_factory = None. When set, is of type `sqlalchemy.orm.sessionmaker <https://docs.sqlalchemy.org/en/20/orm/session_api.html#sqlalchemy.orm.sessionmaker>`_.
         | database_session = None. When set, is of type `sqlalchemy.orm.scoping.scoped_session <https://docs.sqlalchemy.org/en/20/orm/contextual.html#sqlalchemy.orm.scoping.scoped_session>`_.
+        | adapter = None. When set, is of type :py:class:`~bh_database.drivers.DriverAdapter`.
+        | statements, of type :py:class:`~bh_database.statements.StatementRegistry`.
+
+    :Pre-forking servers:
+
+    Servers such as `gunicorn <https://gunicorn.org/>`_ with ``--preload`` call 
+    :py:meth:`~connect` in the master process, then fork the workers. Pooled connections 
+    are sockets, they must not be shared between processes. On connecting, a fork handler 
+    is registered via `os.register_at_fork(...) <https://docs.python.org/3/library/os.html#os.register_at_fork>`_,
+    in a forked child process, it:
+
+        * Disposes the connection pool inherited from the parent process without closing \
+            the connections, i.e. ``Database.engine.dispose(close=False)``: the parent \
+            process still uses them. The child process creates its own connections.
+        * Creates a new scoped session :attr:`~.database_session`, and resets \
+            ``BaseSQLAlchemy``'s :attr:`~.BaseSQLAlchemy.session` and :attr:`~.BaseSQLAlchemy.query`.
+
+    The engine, the session factory, and models and mappers remain those loaded by the parent 
+    process, workers do not have to load them again.
+
+    The parent process should have no transaction in progress when forking, a connection held 
+    by an ongoing transaction is shared with the children.
 
     For a usage example, see ``./tests/test_01_core_database_postgresql.py`` and 
     ``./tests/test_02_core_database_mysql.py``.
@@ -256,6 +392,18 @@ class Database:
     session_factory = None
     #: Class attribute. When set, is of type `sqlalchemy.orm.scoping.scoped_session <https://docs.sqlalchemy.org/en/20/orm/contextual.html#sqlalchemy.orm.scoping.scoped_session>`_.
     database_session = None
+    #: Class attribute. When set, is of type :py:class:`~bh_database.drivers.DriverAdapter`.
+    #: It encapsulates differences between drivers of the current database connection.
+    adapter: DriverAdapter = None
+    #: Class attribute. The named SQL statements of the application, see :py:mod:`bh_database.statements`
+    #: and :py:meth:`~load_statements`. Statements remain registered across disconnecting and reconnecting.
+    statements: StatementRegistry = StatementRegistry()
+
+    #: ``True`` once the fork handler has been registered, it is registered only once per process.
+    _at_fork_registered = False
+    #: In a forked child process, the session inherited from the parent process. It is kept 
+    #: referenced so that its connection, if any, is never returned to a pool nor closed.
+    _inherited_session = None
 
     @staticmethod
     def database_type(db_url=None) -> DatabaseType:
@@ -290,12 +438,37 @@ class Database:
         return Database.engine.url.drivername
 
     @staticmethod
-    def connect(db_url: str, schema: str) -> None:
+    def connect(db_url: str, schema: str, buffered: bool = None, use_pure: bool = None, 
+                pooler_mode: bool = False, lazy: bool = False, warm_up: int = 0) -> None:
         """Establish a connection to a database server.
 
         :param str db_url: a valid database connection string.
         :param str schema: the database schema in the database to connect to. Presently only 
             required if connecting to a PostgreSQL database.
+        :param bool buffered: optional. MySQL only. ``True`` for buffered cursors, ``False`` for 
+            unbuffered cursors. If not specified, the driver's default is used. See 
+            :py:class:`~bh_database.drivers.DriverAdapter`.
+        :param bool use_pure: optional. ``mysql+mysqlconnector`` only. ``False`` to use the driver's
+            C extension, ``True`` to use the pure Python implementation. If not specified, the 
+            driver's default is used. See :py:class:`~bh_database.drivers.MySQLConnectorAdapter`.
+        :param bool pooler_mode: optional. PostgreSQL only. ``True`` when connecting through a 
+            transaction pooler such as PgBouncer: no session level state is set on connections. 
+            See :py:class:`~bh_database.drivers.PostgreSQLAdapter`.
+        :param bool lazy: optional. ``True`` to skip validating the connection URL: no connection
+            is opened until the first database work. For fast cold starts of command line tools
+            and tests. An invalid connection URL then only raises an exception on first use.
+        :param int warm_up: optional. The number of pooled connections to open on connecting, 
+            see :py:meth:`~warm_up`. Default is ``0``, i.e. no warm-up. Ignored if ``lazy`` 
+            is ``True``.
+
+        E.g., to use `mysqlclient <https://pypi.org/project/mysqlclient/>`_ with unbuffered cursors::
+
+            Database.connect("mysql+mysqldb://root:<password>@localhost/employees", None, buffered=False)
+
+        To connect to PostgreSQL through PgBouncer in transaction pooling mode::
+
+            Database.connect("postgresql+psycopg2://postgres:<password>@localhost:6432/employees", 
+                             "employees", pooler_mode=True)
 
         Create the following class attributes :attr:`~.engine`, :attr:`~.session_factory` 
         and scoped session :attr:`~.database_session`.
@@ -323,20 +496,25 @@ class Database:
         logger.debug(f"Before -- engine: {id(Database.engine)}, session_factory: {id(Database.session_factory)}, database_session: {id(Database.database_session)}")
 
         if (Database.engine == None):
-            args = {}
-            if (Database.database_type(db_url) == DatabaseType.PostgreSQL):
-                args={"options": f"-csearch_path={schema}"}
+            Database.adapter = make_adapter(make_url(db_url).drivername, buffered, use_pure, pooler_mode)
+            args = Database.adapter.connect_args(schema)
             Database.engine = create_engine(db_url, echo=False, echo_pool=False, future=True, connect_args=args)
+            Database.adapter.register_events(Database.engine, schema)
+            Database.statements.register_events(Database.engine, 
+                prepare_enabled=(Database.database_type() == DatabaseType.PostgreSQL) and \
+                    (not Database.adapter.pooler_mode))
             #
             # <class 'sqlalchemy.future.engine.Engine'>
             #
 
-            """
-            Assert database connection is valid: caller needs to handle exception.
-            """
-            Database.engine.connect()
+            if (not lazy):
+                """
+                Assert database connection is valid: caller needs to handle exception.
+                The connection is returned to the pool for reuse.
+                """
+                with Database.engine.connect(): pass
 
-            logger.debug(f"Database connected successfully. Driver: {Database.engine.url.drivername}")
+                logger.debug(f"Database connected successfully. Driver: {Database.engine.url.drivername}")
 
         if (Database.session_factory == None): 
             Database.session_factory = sessionmaker(autocommit=False, autoflush=False, \
@@ -361,8 +539,148 @@ class Database:
         BaseSQLAlchemy.query = Database.database_session.query_property(BaseQuery)
         logger.debug("BaseSQLAlchemy.query successfully set to Database.database_session.query_property(BaseQuery).")
 
+        if (not lazy) and (warm_up > 0): Database.warm_up(warm_up)
+
+        if (not Database._at_fork_registered) and hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=Database._after_fork_in_child)
+            Database._at_fork_registered = True
+
         logger.debug(f"After -- engine: {id(Database.engine)}, session_factory: {id(Database.session_factory)}, database_session: {id(Database.database_session)}")
         
+    @staticmethod
+    def warm_up(connections: int) -> None:
+        """Prepare the connected database for serving, so that first requests perform 
+        as steady state ones.
+
+        * Open ``connections`` pooled connections at once, then return them all to the \
+            pool: first requests do not pay for the TCP, TLS and authentication handshakes. \
+            ``connections`` is capped at the pool size, connections beyond the pool size \
+            are closed on return to the pool.
+        * Configure all mappers, `sqlalchemy.orm.configure_mappers() \
+            <https://docs.sqlalchemy.org/en/20/orm/mapping_api.html#sqlalchemy.orm.configure_mappers>`_, \
+            which otherwise happens on first use of any model.
+
+        :param int connections: the number of pooled connections to open.
+
+        :raises AttributeError: if not connected to a database.
+
+        :Note on Exception: 
+
+        Potential unhandled exception: caller must handle the exception.
+        """
+        pool_size = Database.engine.pool.size() if hasattr(Database.engine.pool, 'size') else connections
+        connections = min(connections, pool_size)
+
+        opened = []
+        try:
+            for _ in range(connections):
+                opened.append(Database.engine.connect())
+        finally:
+            for connection in opened: connection.close()
+
+        configure_mappers()
+
+        logger.debug(f"Database warmed up: {len(opened)} pooled connections opened.")
+
+    @staticmethod
+    def load_statements(path, prepare: bool = False) -> list:
+        """Register all named statements in the ``.sql`` files of a directory into
+        :attr:`~.statements`.
+
+        Statements specific to the connected database are then loaded from the sub-directory
+        ``mysql`` or ``postgres``, if it exists. They replace same name statements loaded
+        from the directory itself. E.g.::
+
+            statements/
+                employees.sql
+                mysql/
+                    employees.sql
+                postgres/
+                    employees.sql
+
+        Should be called after :py:meth:`~connect`, so that the connected database is known,
+        and before the first database work, so that statements marked for preparing are
+        prepared on all pooled connections.
+
+        :param path: the directory path.
+
+        :param bool prepare: ``True`` to prepare the statements on every pooled connection.
+            PostgreSQL only, ignored for other databases, and in pooler mode, see
+            :py:class:`~bh_database.drivers.PostgreSQLAdapter`.
+
+        :return: the names of the registered statements.
+        :rtype: list.
+
+        :raises ValueError: if a declared parameter type is not a SQLAlchemy type.
+        """
+        names = Database.statements.load_directory(path, prepare)
+
+        if (Database.engine != None):
+            sub_directories = {DatabaseType.MySQL: 'mysql', DatabaseType.PostgreSQL: 'postgres'}
+            sub_directory = sub_directories.get(Database.database_type())
+
+            if (sub_directory != None) and os.path.isdir(os.path.join(path, sub_directory)):
+                names.extend(Database.statements.load_directory(os.path.join(path, sub_directory), prepare))
+
+        logger.debug(f"{len(names)} named statements loaded from {path}.")
+
+        return list(dict.fromkeys(names))
+
+    @staticmethod
+    def _after_fork_in_child() -> None:
+        """Fork handler, run in the child process. See *Pre-forking servers* in :py:class:`Database`.
+        """
+        if (Database.engine == None): return
+
+        Database.engine.dispose(close=False)
+
+        if (Database.database_session != None):
+            Database._inherited_session = BaseSQLAlchemy.session
+
+            Database.database_session = scoped_session(Database.session_factory)
+            BaseSQLAlchemy.session = Database.database_session(future=True)
+            BaseSQLAlchemy.query = Database.database_session.query_property(BaseQuery)
+
+        logger.debug(f"Forked process {os.getpid()}: connection pool and scoped session recreated.")
+
+    @staticmethod
+    @contextmanager
+    def tenant(schema: str):
+        """Context manager. Run database works within its scope against a tenant schema.
+
+        PostgreSQL only. Multi-tenant applications keep each tenant's tables in a separate 
+        schema. With this context manager, a single engine and a single connection pool 
+        can serve all tenants: every transaction which begins within its scope sets 
+        ``search_path`` to the tenant schema, via ``SET LOCAL``, so pooled connections 
+        carry no tenant state. See :py:class:`~bh_database.drivers.PostgreSQLAdapter`.
+
+        The tenant is held in a context variable, so concurrent threads and asyncio 
+        tasks can each work with a different tenant. E.g.::
+
+            with Database.tenant('tenant_0042'):
+                status = Employees().run_select_sql(SELECT_EMPLOYEES, True)
+
+        :param str schema: the tenant schema, or a comma separated list of schemas, 
+            e.g. ``"tenant_0042, public"``.
+
+        :Note: 
+
+        ``search_path`` is set when a transaction begins, a transaction already in progress
+        on entering keeps its ``search_path``. The :attr:`~.BaseSQLAlchemy.session` should
+        have no transaction in progress on entering, and its transaction should be committed 
+        or rolled back before exiting.
+        """
+        session = BaseSQLAlchemy.session
+        if (session != None) and (session.in_transaction()):
+            logger.warning(f"Tenant {schema!r} set while a transaction is in progress, "
+                           "it applies from the next transaction.")
+
+        token = tenant_schema.set(schema)
+        try:
+            yield
+        finally:
+            tenant_schema.reset(token)
+
     @staticmethod
     def disconnect() -> None:
         """Disconnect from database.
@@ -416,6 +734,7 @@ class Database:
         Database.database_session = None
         Database.session_factory = None
         Database.engine = None
+        Database.adapter = None
 
         BaseSQLAlchemy.session = None
         BaseSQLAlchemy.query = None
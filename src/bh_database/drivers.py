@@ -0,0 +1,323 @@
+"""Database driver adapters.
+
+There are some differences between drivers on connection arguments and on stored
+methods execution. Classes in this module encapsulate these differences, so that
+:py:class:`~bh_database.core.Database` and :py:doc:`base_table` classes do not have
+to know which driver is in use.
+
+Supported drivers:
+
+    * ``mysql+mysqlconnector``: `https://pypi.org/project/mysql-connector-python/ \
+        <https://pypi.org/project/mysql-connector-python/>`_. Both the pure Python \
+        implementation and the C extension (``use_pure=False``).
+    * ``mysql+mysqldb``: `https://pypi.org/project/mysqlclient/ <https://pypi.org/project/mysqlclient/>`_.
+    * ``postgresql+psycopg2``: `https://pypi.org/project/psycopg2/ <https://pypi.org/project/psycopg2/>`_.
+    * ``postgresql+psycopg``: `https://pypi.org/project/psycopg/ <https://pypi.org/project/psycopg/>`_.
+
+Applications should not need to instantiate these classes. The adapter is selected
+by :py:meth:`~bh_database.core.Database.connect` based on the connection URL, and is
+available via :attr:`~bh_database.core.Database.adapter`.
+
+Adapters also decide how reads which are not part of a write transaction begin: in 
+driver autocommit mode, see :py:meth:`~DriverAdapter.begin_read`, or as read only 
+transactions, see :py:meth:`~DriverAdapter.begin_read_only`. For usage examples, see 
+``./tests/test_56_read_paths.py``.
+
+For a comparative benchmark of the MySQL drivers, see ``./benchmarks/bench_mysql_drivers.py``.
+"""
+
+from contextvars import ContextVar
+
+from sqlalchemy import event, text
+
+#: The schema of the current tenant, PostgreSQL only. ``None`` when not set. It is set and 
+#: reset by :py:meth:`~bh_database.core.Database.tenant`. See :py:class:`PostgreSQLAdapter`.
+tenant_schema: ContextVar[str] = ContextVar('bh_database_tenant_schema', default=None)
+
+class DriverAdapter:
+    """Generic driver adapter.
+
+    :param bool buffered: ``True`` for buffered cursors, i.e. the entire result set
+        is fetched into client memory when a statement is executed. ``False`` for
+        unbuffered cursors, rows are fetched from the server as they are read.
+        ``None`` to use the driver's default.
+    """
+
+    def __init__(self, buffered: bool = None):
+        self._buffered = buffered
+
+    @property
+    def buffered(self) -> bool:
+        """Read only property. The requested cursor buffering mode.
+        """
+        return self._buffered
+
+    @property
+    def pooler_mode(self) -> bool:
+        """Read only property. ``True`` if connecting through a transaction pooler, 
+        see :py:class:`PostgreSQLAdapter`. Always ``False`` for other adapters.
+        """
+        return False
+
+    def connect_args(self, schema: str) -> dict:
+        """Driver specific arguments to be passed to the DBAPI ``connect()`` method.
+
+        :param str schema: the database schema in the database to connect to.
+
+        :return: a dictionary, which is passed to ``create_engine(...)`` as ``connect_args``.
+        :rtype: dict.
+        """
+        return {}
+
+    def stored_proc_result(self, cursor) -> tuple:
+        """Fetch the first result set returned by a stored procedure.
+
+        ``cursor.callproc(...)`` must have already been called.
+
+        :param cursor: the DBAPI cursor which has just executed ``callproc(...)``.
+
+        :return: a tuple ``(columns, rows)``, where ``columns`` is a list of column
+            names and ``rows`` is a list of tuples. ``None`` if the stored procedure
+            returns no result set.
+        :rtype: tuple.
+        """
+        if (cursor.description == None): return None
+
+        return [column[0] for column in cursor.description], cursor.fetchall()
+
+    def register_events(self, engine, schema: str) -> None:
+        """Register driver specific event listeners on a newly created engine.
+
+        :param engine: the newly created `sqlalchemy.engine.Engine \
+            <https://docs.sqlalchemy.org/en/20/core/connections.html#sqlalchemy.engine.Engine>`_.
+
+        :param str schema: the database schema in the database to connect to.
+        """
+        pass
+
+    def autocommit_reads(self) -> bool:
+        """Whether stand-alone reads run in driver autocommit mode, see :py:meth:`~begin_read`.
+
+        :return: ``True`` for this generic adapter.
+        :rtype: bool.
+        """
+        return True
+
+    def begin_read(self, session) -> None:
+        """Begin a stand-alone read, i.e. a single read which is not part of a transaction.
+
+        If :py:meth:`~autocommit_reads`, the session's connection is switched to driver
+        autocommit mode for this transaction only: neither ``BEGIN`` nor ``COMMIT`` is sent
+        to the server. The connection is switched back when it returns to the pool.
+
+        :param session: a `sqlalchemy.orm.Session <https://docs.sqlalchemy.org/en/20/orm/session_api.html#sqlalchemy.orm.Session>`_
+            without a transaction in progress.
+        """
+        if (self.autocommit_reads()): session.connection(execution_options={'isolation_level': 'AUTOCOMMIT'})
+
+    def begin_read_only(self, session) -> None:
+        """Begin a read only transaction, in which several reads see the same data.
+
+        :param session: a `sqlalchemy.orm.Session <https://docs.sqlalchemy.org/en/20/orm/session_api.html#sqlalchemy.orm.Session>`_
+            without a transaction in progress.
+        """
+        session.connection()
+
+class MySQLAdapter(DriverAdapter):
+    """Common to MySQL adapters.
+
+    MySQL starts transactions implicitly, at no cost, but switching a connection to 
+    autocommit mode and back is a server round trip each way: stand-alone reads do not 
+    run in autocommit mode.
+
+    Read only transactions are started with ``START TRANSACTION WITH CONSISTENT SNAPSHOT, 
+    READ ONLY``: InnoDB skips allocating a transaction Id, and all reads see the snapshot 
+    taken at the start.
+
+    :param bool buffered: see :py:class:`DriverAdapter`.
+    """
+
+    def autocommit_reads(self) -> bool:
+        return False
+
+    def begin_read_only(self, session) -> None:
+        session.execute(text("START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY"))
+
+class MySQLConnectorAdapter(MySQLAdapter):
+    """Adapter for `mysql-connector-python <https://pypi.org/project/mysql-connector-python/>`_.
+
+    :param bool buffered: see :py:class:`DriverAdapter`.
+
+    :param bool use_pure: ``False`` to use the C extension, which decodes rows in C.
+        ``True`` to use the pure Python implementation. ``None`` to use the driver's
+        default.
+    """
+
+    def __init__(self, buffered: bool = None, use_pure: bool = None):
+        super().__init__(buffered)
+        self._use_pure = use_pure
+
+    def connect_args(self, schema: str) -> dict:
+        args = {}
+        if (self._use_pure != None): args['use_pure'] = self._use_pure
+        if (self._buffered != None): args['buffered'] = self._buffered
+        return args
+
+    def stored_proc_result(self, cursor) -> tuple:
+        try:
+            result = next(cursor.stored_results())
+        except StopIteration:
+            return None
+
+        try:
+            return [column[0] for column in result.description], result.fetchall()
+        finally:
+            result.close()
+
+class MySQLClientAdapter(MySQLAdapter):
+    """Adapter for `mysqlclient (MySQLdb) <https://pypi.org/project/mysqlclient/>`_.
+
+    :param bool buffered: see :py:class:`DriverAdapter`. ``False`` selects
+        ``MySQLdb.cursors.SSCursor``, a server-side, unbuffered cursor.
+    """
+
+    def connect_args(self, schema: str) -> dict:
+        if (self._buffered != False): return {}
+
+        from MySQLdb.cursors import SSCursor
+        return {'cursorclass': SSCursor}
+
+    def stored_proc_result(self, cursor) -> tuple:
+        result = super().stored_proc_result(cursor)
+
+        """
+        MySQLdb returns all result sets of a CALL on the same cursor, the last one is the
+        status of the CALL itself. They must all be consumed before the connection can
+        execute another statement.
+        """
+        while cursor.nextset(): pass
+
+        return result
+
+class PostgreSQLAdapter(DriverAdapter):
+    """Adapter for PostgreSQL drivers. `psycopg2 <https://pypi.org/project/psycopg2/>`_
+    and `psycopg (3) <https://pypi.org/project/psycopg/>`_.
+
+    By default, the database schema is set via the ``search_path`` connection option, 
+    which is a startup parameter of the connection.
+
+    In pooler mode, i.e. when connecting through `PgBouncer <https://www.pgbouncer.org/>`_
+    in transaction pooling mode, a server connection is shared by many client connections,
+    and startup parameters and any other session level state can not be relied upon. 
+    In this mode:
+
+        * The ``search_path`` startup parameter is not sent. Instead, ``SET LOCAL search_path`` \
+            is issued at the start of every transaction, it lasts only until the end of the \
+            transaction.
+        * psycopg (3) automatic server-side prepared statements are disabled. psycopg2 \
+            does not use server-side prepared statements.
+
+    Multi-tenant applications, which keep each tenant's tables in a separate schema,
+    can serve all tenants with a single engine and a single connection pool: 
+    when the :py:data:`tenant_schema` context variable is set, ``SET LOCAL search_path`` 
+    to the tenant schema is issued at the start of every transaction, in both 
+    modes. See :py:meth:`~bh_database.core.Database.tenant`. Since statements are not 
+    compiled with schema names, cached compiled statements remain valid for all tenants.
+
+    Stand-alone reads run in driver autocommit mode, the driver sends neither ``BEGIN`` 
+    nor ``COMMIT``, unless ``search_path`` must be set at the start of transactions. Read 
+    only transactions are ``REPEATABLE READ``, ``READ ONLY``: all reads see the snapshot 
+    taken by the first one.
+
+    :param bool buffered: not applicable, ignored.
+
+    :param bool pooler_mode: ``True`` to enable pooler mode.
+
+    :param str drivername: the driver name part of the connection URL.
+    """
+
+    def __init__(self, buffered: bool = None, pooler_mode: bool = False, 
+                 drivername: str = 'postgresql+psycopg2'):
+        super().__init__(buffered)
+        self._pooler_mode = pooler_mode
+        self._drivername = drivername
+
+    @property
+    def pooler_mode(self) -> bool:
+        return self._pooler_mode
+
+    def connect_args(self, schema: str) -> dict:
+        if (not self._pooler_mode): return {"options": f"-csearch_path={schema}"}
+
+        if (self._drivername == 'postgresql+psycopg'): return {"prepare_threshold": None}
+
+        return {}
+
+    def transaction_schema(self, schema: str) -> str:
+        """The schema to set as ``search_path`` at the start of a transaction.
+
+        :param str schema: the database schema the engine connects to.
+
+        :return: the schema of the current tenant, see :py:data:`tenant_schema`, if 
+            there is one. Otherwise, ``schema`` in pooler mode, since the startup 
+            parameter is not sent. ``None`` if ``search_path`` needs not be set.
+        :rtype: str.
+        """
+        tenant = tenant_schema.get()
+        if (tenant): return tenant
+
+        return schema if self._pooler_mode else None
+
+    def register_events(self, engine, schema: str) -> None:
+        @event.listens_for(engine, 'begin')
+        def set_local_search_path(conn):
+            transaction_schema = self.transaction_schema(schema)
+            if (transaction_schema):
+                conn.exec_driver_sql(search_path_sql(conn.dialect, transaction_schema, local=True))
+
+    def autocommit_reads(self) -> bool:
+        # SET LOCAL search_path has no effect outside of a transaction.
+        return (not self._pooler_mode) and (not tenant_schema.get())
+
+    def begin_read_only(self, session) -> None:
+        session.connection(execution_options={'isolation_level': 'REPEATABLE READ', 
+                                              'postgresql_readonly': True})
+
+def search_path_sql(dialect, schema: str, local: bool = False) -> str:
+    """Make a PostgreSQL ``SET search_path`` statement, with schema names properly quoted.
+
+    :param dialect: the SQLAlchemy dialect of the connection.
+
+    :param str schema: a schema name, or a comma separated list of schema names.
+
+    :param bool local: ``True`` to make a ``SET LOCAL`` statement, which lasts only until
+        the end of the current transaction.
+
+    :return: the statement.
+    :rtype: str.
+    """
+    quote = dialect.identifier_preparer.quote_schema
+    schemas = ', '.join(quote(name.strip()) for name in schema.split(','))
+
+    return f"SET {'LOCAL ' if local else ''}search_path TO {schemas}"
+
+def make_adapter(drivername: str, buffered: bool = None, use_pure: bool = None, 
+                 pooler_mode: bool = False) -> DriverAdapter:
+    """Create the adapter for a SQLAlchemy driver name.
+
+    :param str drivername: the driver name part of a connection URL, e.g. ``mysql+mysqldb``.
+
+    :param bool buffered: see :py:class:`DriverAdapter`.
+
+    :param bool use_pure: see :py:class:`MySQLConnectorAdapter`. Ignored by other adapters.
+
+    :param bool pooler_mode: see :py:class:`PostgreSQLAdapter`. Ignored by other adapters.
+
+    :return: an instance of a :py:class:`DriverAdapter` subclass. :py:class:`DriverAdapter`
+        itself if the driver is not known.
+    """
+    if ('mysqlconnector' in drivername): return MySQLConnectorAdapter(buffered, use_pure)
+    # mysqlclient is SQLAlchemy's default MySQL driver.
+    elif (drivername == 'mysql') or ('mysqldb' in drivername): return MySQLClientAdapter(buffered)
+    elif ('postgresql' in drivername): return PostgreSQLAdapter(buffered, pooler_mode, drivername)
+    else: return DriverAdapter(buffered)
@@ -0,0 +1,418 @@
+"""Id generators: alternative strategies to get primary key values of new records.
+
+By default, :py:meth:`~bh_database.base_table.WriteCapableTable.write_to_database` gets
+new Ids from table ``unique_id``, with stored method ``get_unique_id``, one call per new
+record. Each call updates the table's row of ``unique_id``, which stays locked until the
+writing transaction ends: concurrent writers of a table serialise on that row.
+
+Assign an Id generator to the :attr:`~bh_database.base_table.WriteCapableTable.id_generator`
+class attribute of a table class to get new Ids otherwise:
+
+    * :py:class:`UniqueIdGenerator`: table ``unique_id``, a block of Ids per write.
+    * :py:class:`SequenceIdGenerator`: database sequences. Sequences are not transactional, \
+        allocating Ids does not lock anything until the transaction ends.
+    * :py:class:`IdentityIdGenerator`: ``IDENTITY`` / ``AUTO_INCREMENT`` columns, Ids \
+        are assigned by the database on ``INSERT``.
+    * :py:class:`SnowflakeIdGenerator`: time-ordered 64-bit Ids, generated in process, \
+        without any database round trip.
+
+E.g.::
+
+    class Employees(WriteCapableTable):
+        __tablename__ = 'employees'
+
+        id_generator = SequenceIdGenerator()
+
+Scripts to create sequences, and to switch primary key columns to ``IDENTITY`` /
+``AUTO_INCREMENT``, seeded from the current values in ``unique_id``:
+
+    * MySQL: ``./sql_scripts/mysql/07_id_sequences.sql``.
+    * PostgreSQL: ``./sql_scripts/postgres/07_id_sequences.sql``.
+
+For usage examples, see ``./tests/test_52_id_generators.py``.
+"""
+
+import os
+import time
+import weakref
+import threading
+
+from sqlalchemy import (
+    create_engine,
+    text,
+    insert,
+)
+
+from bh_database.core import (
+    Database,
+    DatabaseType,
+)
+
+from bh_database.constant import (
+    BH_ID_SEQUENCE_NOT_FOUND_MSG,
+    BH_AUTOINC_LOCK_MODE_MSG,
+    BH_WORKER_ID_RANGE_MSG,
+    BH_WORKER_ID_REQUIRED_MSG,
+    BH_CLOCK_BACKWARDS_MSG,
+)
+
+#: Environment variable of the worker Id of :py:class:`SnowflakeIdGenerator`.
+BH_WORKER_ID_ENV = 'BH_WORKER_ID'
+
+class IdGenerator:
+    """Common to Id generators.
+    """
+
+    #: ``True`` if Ids are assigned by the database on ``INSERT``, see :py:meth:`~insert`.
+    #: ``False`` if they are allocated before inserting, see :py:meth:`~allocate`.
+    on_insert = False
+
+    def allocate(self, table, count: int) -> list:
+        """Allocate new Ids.
+
+        :param table: the :py:class:`~bh_database.base_table.WriteCapableTable` instance
+            which writes the new records.
+
+        :param int count: the number of Ids to allocate.
+
+        :return: list of ``count`` new Ids.
+        :rtype: list.
+
+        :Note on Exception:
+
+        Potential unhandled exception: caller must handle the exception.
+        """
+        raise NotImplementedError
+
+    def insert(self, table, records: list) -> None:
+        """Insert new records without Ids, and set the Ids assigned by the database in
+        the records. Only for generators with :attr:`~on_insert` ``True``.
+
+        :param table: the :py:class:`~bh_database.base_table.WriteCapableTable` instance
+            which writes the new records.
+
+        :param list records: the new records.
+
+        :Note on Exception:
+
+        Potential unhandled exception: caller must handle the exception.
+        """
+        raise NotImplementedError
+
+class UniqueIdGenerator(IdGenerator):
+    """Allocate Ids from table ``unique_id``, a block of Ids with a single call of stored
+    method ``get_unique_id_block``, see
+    ``./sql_scripts/<database>/06_get_unique_id_block_stored_method.sql``.
+    """
+
+    def allocate(self, table, count: int) -> list:
+        return table._allocate_unique_ids(count)
+
+def _register_at_fork(generator: IdGenerator) -> None:
+    # Handlers can not be unregistered: do not keep the generator alive.
+    ref = weakref.ref(generator)
+
+    def after_in_child():
+        generator = ref()
+        if (generator != None): generator._after_fork_in_child()
+
+    os.register_at_fork(after_in_child=after_in_child)
+
+class SequenceIdGenerator(IdGenerator):
+    """Allocate Ids from a database sequence.
+
+        * PostgreSQL: a native sequence, ``count`` Ids with a single \
+            ``SELECT nextval(...) FROM generate_series(1, count)``.
+        * MySQL: MySQL has no sequences. A row of table ``bh_sequence``, updated with \
+            ``LAST_INSERT_ID(expr)``. The update runs in autocommit mode, on its own \
+            connection: the row is locked only for the duration of the statement.
+
+    On MySQL, that connection is not taken from the pool of
+    :attr:`~bh_database.core.Database.engine`: a transaction writing new records already
+    holds one of its connections, and under load, writers would wait on each other for
+    a second one. The generator has its own engine, of a single pooled connection, i.e.
+    one more database connection per process. It is created on first use, recreated
+    after reconnecting, and not shared with forked child processes.
+
+    Ids are unique, but not necessarily consecutive: concurrent writers draw from the
+    same sequence.
+
+    :param str sequence: optional. The sequence name. Default is
+        ``{__tablename__}_{column name}_seq``, PostgreSQL's naming of ``serial`` column
+        sequences.
+    """
+
+    def __init__(self, sequence: str = None):
+        self._sequence = sequence
+
+        #: MySQL only. The dedicated engine, and the ``Database.engine`` it was created for.
+        self._engine = None
+        self._engine_of = None
+        self._lock = threading.Lock()
+
+        if hasattr(os, 'register_at_fork'): _register_at_fork(self)
+
+    def _after_fork_in_child(self) -> None:
+        # The lock may have been held by another thread of the parent process.
+        self._lock = threading.Lock()
+        # The pooled connection belongs to the parent process.
+        if (self._engine != None): self._engine.dispose(close=False)
+
+    def sequence_name(self, table) -> str:
+        """The sequence name of a table.
+
+        :param table: the :py:class:`~bh_database.base_table.WriteCapableTable` instance.
+        """
+        if (self._sequence != None): return self._sequence
+
+        return f"{table.__tablename__}_{table._id_column()}_seq"
+
+    def allocate(self, table, count: int) -> list:
+        if (count <= 0): return []
+
+        sequence = self.sequence_name(table)
+
+        if (Database.database_type() == DatabaseType.MySQL):
+            return self.__allocate_mysql(sequence, count)
+
+        result = table.session.execute(text("select nextval(:sequence) from generate_series(1, :count)"),
+                                       {'sequence': sequence, 'count': count})
+        return [row[0] for row in result]
+
+    def __sequence_engine(self):
+        with self._lock:
+            if (self._engine_of is not Database.engine):
+                if (self._engine != None): self._engine.dispose()
+
+                self._engine = create_engine(Database.engine.url, pool_size=1, max_overflow=0,
+                                             isolation_level='AUTOCOMMIT',
+                                             connect_args=Database.adapter.connect_args(None))
+                self._engine_of = Database.engine
+
+            return self._engine
+
+    def __allocate_mysql(self, sequence: str, count: int) -> list:
+        with self.__sequence_engine().connect() as connection:
+            result = connection.execute(
+                text("update bh_sequence set last_id = last_insert_id(last_id + :count) "
+                     "where name = :sequence"), {'sequence': sequence, 'count': count})
+
+            if (result.rowcount == 0): raise Exception(BH_ID_SEQUENCE_NOT_FOUND_MSG.format(sequence))
+
+            last_id = connection.execute(text("select last_insert_id()")).scalar()
+
+        return list(range(last_id - count + 1, last_id + 1))
+
+class IdentityIdGenerator(IdGenerator):
+    """Ids are assigned by the database on ``INSERT``: the primary key column is an
+    ``IDENTITY`` or ``serial`` column on PostgreSQL, an ``AUTO_INCREMENT`` column on MySQL.
+    The column must accept explicit values too, e.g. ``GENERATED BY DEFAULT AS IDENTITY``,
+    for new records which come with Ids.
+
+    New records without Ids are inserted with:
+
+        * Databases which support ``INSERT ... RETURNING``, e.g. PostgreSQL, MariaDB: \
+            batched ``INSERT``, returning the assigned Ids in the order of the records.
+        * MySQL: a multi-row ``INSERT`` per :attr:`~bh_database.base_table.BaseTable.pk_chunk_size` \
+            records, then the Ids are ``LAST_INSERT_ID()`` onwards: a multi-row ``INSERT`` \
+            gets consecutive values. This requires ``innodb_autoinc_lock_mode`` ``0`` or ``1``, \
+            which is checked on first use.
+
+    :py:class:`~bh_database.unit_of_work.UnitOfWork` inserts such tables before resolving
+    :py:class:`~bh_database.unit_of_work.TempId` placeholders of their detail tables.
+    """
+
+    on_insert = True
+
+    def __init__(self):
+        self._lock_mode_checked = False
+
+    def insert(self, table, records: list) -> None:
+        if (len(records) == 0): return
+
+        from bh_database.base_table import (
+            _chunks,
+            _group_by_columns,
+        )
+
+        id_column = table._id_column()
+        connection = table.session.connection()
+
+        # Records may carry the Id column without a value, e.g. None: not inserted as is.
+        rows = [{name: value for name, value in record.items() if name != id_column} 
+                for record in records]
+        sources = {id(row): record for row, record in zip(rows, records)}
+
+        if (connection.dialect.insert_returning):
+            stmt = insert(table.__table__).returning(table.__table__.columns[id_column],
+                                                     sort_by_parameter_order=True)
+            for group in _group_by_columns(rows):
+                ids = connection.execute(stmt, group).scalars().all()
+
+                for row, new_id in zip(group, ids): sources[id(row)][id_column] = new_id
+            return
+
+        self.__check_lock_mode(connection)
+
+        for group in _group_by_columns(rows):
+            for chunk in _chunks(group, table.pk_chunk_size):
+                connection.execute(insert(table.__table__).values(chunk))
+                first_id = connection.execute(text("select last_insert_id()")).scalar()
+
+                for idx, row in enumerate(chunk): sources[id(row)][id_column] = first_id + idx
+
+    def __check_lock_mode(self, connection) -> None:
+        if (self._lock_mode_checked): return
+
+        lock_mode = connection.execute(text("select @@innodb_autoinc_lock_mode")).scalar()
+        if (int(lock_mode) not in (0, 1)): raise Exception(BH_AUTOINC_LOCK_MODE_MSG.format(lock_mode))
+
+        self._lock_mode_checked = True
+
+class SnowflakeIdGenerator(IdGenerator):
+    """Generate time-ordered 64-bit Ids in process, without any database round trip, 
+    `Snowflake <https://en.wikipedia.org/wiki/Snowflake_ID>`_ style. An Id is, from the 
+    most significant bit:
+
+        * 41 bits: milliseconds since ``epoch``, about 69 years.
+        * ``worker_bits`` bits: the worker Id, default ``10`` bits, 1024 workers.
+        * ``sequence_bits`` bits: a sequence within the millisecond, default ``12`` bits, \
+            4096 Ids per millisecond per worker. When exhausted, generation waits for \
+            the next millisecond.
+
+    Ids are unique as long as no two processes generating Ids for the same table share 
+    a worker Id. Ids increase with time, new rows land at the end of primary key 
+    indexes, as with sequences. Primary key columns must be 64-bit integers, 
+    e.g. ``BIGINT``.
+
+    The worker Id, in order of precedence:
+
+        1. ``worker_id``: an integer, or a callable returning an integer.
+        2. Environment variable ``BH_WORKER_ID``.
+
+    A worker Id is required: generating an Id without one raises an exception. It is 
+    not derived from e.g. the host name and the process Id: with 10 bits, 32 workers 
+    already have a 38% chance that two of them share a worker Id, and then generate 
+    duplicate primary keys. Assign each worker a distinct Id, e.g. from its index in 
+    the deployment.
+
+    The generator is thread-safe. It is fork-aware: in a forked child process, its lock 
+    and state are reset, via `os.register_at_fork(...) <https://docs.python.org/3/library/os.html#os.register_at_fork>`_, 
+    and the worker Id is read again on first use, e.g. after a pre-forking server's 
+    post-fork hook has set ``BH_WORKER_ID``. A fixed integer ``worker_id`` stays the 
+    same in child processes: use a callable for pre-forking servers.
+
+    If the clock moves backwards, generation waits for up to ``max_clock_drift`` 
+    milliseconds for it to catch up, then raises an exception.
+
+    :param worker_id: optional. See above.
+
+    :param int epoch: the epoch, in milliseconds since the Unix epoch. Default is 
+        2020-01-01T00:00:00Z. It must never change once Ids have been generated.
+
+    :param int worker_bits: the number of bits of the worker Id.
+
+    :param int sequence_bits: the number of bits of the sequence.
+
+    :param int max_clock_drift: milliseconds to wait for a clock which moves backwards.
+    """
+
+    def __init__(self, worker_id=None, epoch: int = 1577836800000, worker_bits: int = 10, 
+                 sequence_bits: int = 12, max_clock_drift: int = 100):
+        self._worker_id_config = worker_id
+        self._epoch = epoch
+        self._worker_bits = worker_bits
+        self._sequence_bits = sequence_bits
+        self._sequence_mask = (1 << sequence_bits) - 1
+        self._max_clock_drift = max_clock_drift
+
+        self._lock = threading.Lock()
+        self._pid = None
+
+        if hasattr(os, 'register_at_fork'): _register_at_fork(self)
+
+    def _after_fork_in_child(self) -> None:
+        # The lock may have been held by another thread of the parent process.
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def __reset(self) -> None:
+        self._pid = os.getpid()
+        self._worker_id = self.__derive_worker_id()
+        self._last_ms = -1
+        self._sequence = 0
+
+    def __derive_worker_id(self) -> int:
+        worker_id = self._worker_id_config
+        if callable(worker_id): worker_id = worker_id()
+
+        if (worker_id == None) and (os.environ.get(BH_WORKER_ID_ENV) != None):
+            worker_id = int(os.environ[BH_WORKER_ID_ENV])
+
+        if (worker_id == None): raise Exception(BH_WORKER_ID_REQUIRED_MSG.format(BH_WORKER_ID_ENV))
+
+        if not (0 <= worker_id < (1 << self._worker_bits)):
+            raise Exception(BH_WORKER_ID_RANGE_MSG.format(worker_id, self._worker_bits))
+
+        return worker_id
+
+    @property
+    def worker_id(self) -> int:
+        """Read only property. The worker Id of the current process.
+        """
+        with self._lock:
+            if (self._pid != os.getpid()): self.__reset()
+            return self._worker_id
+
+    def __now(self) -> int:
+        return time.time_ns() // 1000000 - self._epoch
+
+    def __next(self) -> int:
+        now = self.__now()
+
+        if (now < self._last_ms):
+            if (self._last_ms - now > self._max_clock_drift):
+                raise Exception(BH_CLOCK_BACKWARDS_MSG.format(self._last_ms - now))
+
+            while (now < self._last_ms): now = self.__now()
+
+        if (now == self._last_ms):
+            self._sequence = (self._sequence + 1) & self._sequence_mask
+
+            # Exhausted: wait for the next millisecond.
+            if (self._sequence == 0):
+                while (now <= self._last_ms): now = self.__now()
+        else:
+            self._sequence = 0
+
+        self._last_ms = now
+
+        return (now << (self._worker_bits + self._sequence_bits)) | \
+            (self._worker_id << self._sequence_bits) | self._sequence
+
+    def next_id(self) -> int:
+        """Generate a new Id.
+
+        :return: the new Id.
+        :rtype: int.
+        """
+        with self._lock:
+            if (self._pid != os.getpid()): self.__reset()
+            return self.__next()
+
+    def allocate(self, table, count: int) -> list:
+        with self._lock:
+            if (self._pid != os.getpid()): self.__reset()
+            return [self.__next() for _ in range(count)]
+
+    def parse(self, new_id: int) -> tuple:
+        """Split an Id into its parts.
+
+        :param int new_id: an Id generated by this generator.
+
+        :return: (milliseconds since the Unix epoch, worker Id, sequence).
+        :rtype: tuple.
+        """
+        return ((new_id >> (self._worker_bits + self._sequence_bits)) + self._epoch,
+                (new_id >> self._sequence_bits) & ((1 << self._worker_bits) - 1),
+                new_id & self._sequence_mask)
@@ -0,0 +1,287 @@
+"""Table change notifications, for cache invalidation.
+
+Time-based expiry of cached data, see :py:mod:`bh_database.cache`, is a trade-off: a
+short time-to-live wastes the cache, a long one serves stale data. With change
+notifications, cache entries of a table are invalidated as soon as the table changes,
+by any process, and caches can safely use long time-to-live.
+
+    * :py:class:`PostgreSQLChangeListener`: a background thread which ``LISTEN`` \
+        for notifications sent by triggers, see ``./sql_scripts/postgres/05_table_change_notify.sql``.
+    * :py:class:`TableVersionPoller`: MySQL has no notifications. A background thread \
+        which polls versions of tables, bumped after each committed write, see \
+        :attr:`~bh_database.base_table.BaseTable.version_table` and ``./sql_scripts/mysql/05_table_version.sql``.
+
+On a change notification of a table, the default action is to invalidate the table in all
+:attr:`~bh_database.base_table.BaseTable.l2_cache` caches, see :py:func:`invalidate_table`.
+
+Threads do not survive forking: in pre-forking servers, each worker process should start
+its own listener, e.g. in gunicorn's ``post_fork`` server hook::
+
+    def post_fork(server, worker):
+        PostgreSQLChangeListener().start()
+
+For usage examples, see ``./tests/test_44_notifications.py``.
+"""
+
+import select
+import threading
+
+from sqlalchemy import (
+    create_engine,
+    text,
+)
+from sqlalchemy.pool import NullPool
+
+from bh_database.core import Database
+from bh_database.base_table import BaseTable
+
+from bh_database import logger
+
+#: Default channel of table change notifications.
+BH_CHANGE_CHANNEL = 'bh_table_changes'
+
+def _l2_caches() -> list:
+    caches, classes = [], [BaseTable]
+
+    while classes:
+        cls = classes.pop()
+        classes.extend(cls.__subclasses__())
+
+        cache = cls.__dict__.get('l2_cache')
+        if (cache != None) and all(cache is not other for other in caches): caches.append(cache)
+
+    return caches
+
+def invalidate_table(tablename: str) -> None:
+    """Invalidate a table in all :attr:`~bh_database.base_table.BaseTable.l2_cache`
+    caches, of all table classes.
+
+    :param str tablename: the table name.
+    """
+    for cache in _l2_caches(): cache.invalidate(tablename)
+
+def invalidate_all() -> None:
+    """Clear all :attr:`~bh_database.base_table.BaseTable.l2_cache` caches, of all
+    table classes.
+    """
+    for cache in _l2_caches(): cache.clear()
+
+class ChangeListener:
+    """Common to change listeners. A background daemon thread which calls ``on_change``
+    for each changed table.
+
+    :param on_change: optional. A callable taking a table name, called on every change
+        of a table. Default is :py:func:`invalidate_table`.
+
+    :param float interval: seconds between polls, or to wait for notifications.
+
+    :param float retry_interval: seconds to wait before reconnecting after a connection
+        failure.
+    """
+
+    def __init__(self, on_change=None, interval: float = 1.0, retry_interval: float = 5.0):
+        self._on_change = on_change if (on_change != None) else invalidate_table
+        self._interval = interval
+        self._retry_interval = retry_interval
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        """Read only property. ``True`` if the listener thread is running.
+        """
+        return (self._thread != None) and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the listener thread. Does nothing if it is already running.
+        """
+        if (self.running): return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None) -> None:
+        """Stop the listener thread, and wait for it to finish.
+
+        :param float timeout: optional. Seconds to wait for the thread to finish.
+        """
+        self._stop_event.set()
+        if (self._thread != None): self._thread.join(timeout)
+        self._thread = None
+
+    def _changed(self, tablename: str) -> None:
+        try:
+            self._on_change(tablename)
+        except Exception as e:
+            logger.error(str(e))
+
+    def _run(self) -> None:
+        while (not self._stop_event.is_set()):
+            try:
+                self._listen()
+            except Exception as e:
+                logger.error(f"{type(self).__name__}: {str(e)}")
+
+                """
+                Changes made whilst disconnected are not notified: cached data can
+                no longer be trusted.
+                """
+                self._changed_all()
+
+                self._stop_event.wait(self._retry_interval)
+
+    def _changed_all(self) -> None:
+        try:
+            invalidate_all()
+        except Exception as e:
+            logger.error(str(e))
+
+    def _listen(self) -> None:
+        """Connect, then wait for changes until stopped. Raise an exception on connection
+        failure.
+        """
+        raise NotImplementedError
+
+class PostgreSQLChangeListener(ChangeListener):
+    """Listen for table change notifications sent by PostgreSQL triggers.
+
+    Enable notifications on tables with ``./sql_scripts/postgres/05_table_change_notify.sql``.
+    The payload of notifications is the table name.
+
+    The listener holds a dedicated connection, detached from the pool of
+    :attr:`~bh_database.core.Database.engine`, for as long as it runs. ``LISTEN`` is
+    session state: it does not work through PgBouncer in transaction pooling mode. When
+    connected in pooler mode, pass a direct connection URL to the database server.
+
+    :param str db_url: optional. A connection URL for the dedicated connection. Default
+        is a connection of :attr:`~bh_database.core.Database.engine`, ``Database`` must be
+        connected before starting.
+
+    :param str channel: the notification channel.
+
+    :param on_change: see :py:class:`ChangeListener`.
+
+    :param float interval: see :py:class:`ChangeListener`.
+
+    :param float retry_interval: see :py:class:`ChangeListener`.
+    """
+
+    def __init__(self, db_url: str = None, channel: str = BH_CHANGE_CHANNEL, on_change=None,
+                 interval: float = 1.0, retry_interval: float = 5.0):
+        super().__init__(on_change, interval, retry_interval)
+        self._channel = channel
+        #: Of ``db_url``, created once and used by every reconnect.
+        self._engine = None if (db_url == None) else create_engine(db_url, poolclass=NullPool)
+
+    def stop(self, timeout: float = None) -> None:
+        """Stop the listener thread, wait for it to finish, and dispose of the engine of
+        ``db_url``. The listener can be started again.
+
+        :param float timeout: optional. Seconds to wait for the thread to finish.
+        """
+        super().stop(timeout)
+        if (self._engine != None): self._engine.dispose()
+
+    def _connect(self):
+        engine = Database.engine if (self._engine == None) else self._engine
+
+        connection = engine.raw_connection()
+        # The connection is never returned to the pool.
+        connection.detach()
+        return connection.dbapi_connection
+
+    def _listen(self) -> None:
+        dbapi_connection = self._connect()
+        try:
+            dbapi_connection.autocommit = True
+
+            cursor = dbapi_connection.cursor()
+            cursor.execute(f'LISTEN "{self._channel}"')
+            cursor.close()
+
+            logger.debug(f"Listening on channel {self._channel!r}.")
+
+            while (not self._stop_event.is_set()):
+                # A transaction changing a table many times notifies many times.
+                for tablename in dict.fromkeys(self._wait(dbapi_connection)):
+                    self._changed(tablename)
+        finally:
+            dbapi_connection.close()
+
+    def _wait(self, dbapi_connection) -> list:
+        """Wait up to the interval for notifications, and return their payloads.
+        """
+        # psycopg2.
+        if hasattr(dbapi_connection, 'poll'):
+            if (select.select([dbapi_connection], [], [], self._interval) != ([], [], [])):
+                dbapi_connection.poll()
+
+            payloads = [notify.payload for notify in dbapi_connection.notifies]
+            dbapi_connection.notifies.clear()
+            return payloads
+
+        # psycopg (3).
+        return [notify.payload for notify in dbapi_connection.notifies(timeout=self._interval)]
+
+class TableVersionPoller(ChangeListener):
+    """Poll table versions, for databases without change notifications.
+
+    Create the ``table_version`` table with ``./sql_scripts/mysql/05_table_version.sql``, and 
+    set :attr:`~bh_database.base_table.BaseTable.version_table` on versioned tables: versions
+    are bumped after each committed write, outside of the writing transaction.
+    The first poll records current versions, subsequent polls report tables whose version
+    has changed since the previous poll. Each poll is a short query on a pooled connection
+    of :attr:`~bh_database.core.Database.engine`.
+
+    Changes are seen up to ``interval`` seconds late.
+
+    :param str version_table: the name of the table versions table.
+
+    :param on_change: see :py:class:`ChangeListener`.
+
+    :param float interval: see :py:class:`ChangeListener`. Default is ``5`` seconds.
+
+    :param float retry_interval: see :py:class:`ChangeListener`.
+    """
+
+    def __init__(self, version_table: str = 'table_version', on_change=None,
+                 interval: float = 5.0, retry_interval: float = 5.0):
+        super().__init__(on_change, interval, retry_interval)
+        self._sql = text(f"select tablename, version from {version_table}")
+        self._versions = None
+
+    def poll(self) -> list:
+        """Read table versions, call ``on_change`` for each table whose version has
+        changed since the previous poll.
+
+        :return: the names of the changed tables.
+        :rtype: list.
+
+        :Note on Exception:
+
+        Potential unhandled exception: caller must handle the exception.
+        """
+        # A new transaction for each poll: a repeatable read snapshot would never see changes.
+        with Database.engine.connect() as connection:
+            versions = dict(connection.execute(self._sql).all())
+
+        changed = [] if (self._versions == None) else \
+            [tablename for tablename, version in versions.items()
+             if self._versions.get(tablename) != version]
+
+        self._versions = versions
+
+        for tablename in changed: self._changed(tablename)
+
+        return changed
+
+    def _listen(self) -> None:
+        while (not self._stop_event.is_set()):
+            self.poll()
+            self._stop_event.wait(self._interval)
+
+    def _changed_all(self) -> None:
+        # The next successful poll is a first poll again.
+        self._versions = None
+        super()._changed_all()
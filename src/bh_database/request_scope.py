@@ -0,0 +1,177 @@
+"""Request-scoped memoisation of identical reads within one unit of work.
+
+A single HTTP request often runs the same read several times, through different business
+objects which do not share state. Within a request scope, results of
+:py:meth:`~bh_database.base_table.ReadOnlyTable.run_select_sql` and
+:py:meth:`~bh_database.base_table.ReadOnlyTable.run_named_select` are memoised by statement
+plus parameters: identical reads after the first are served from the scope, without a
+database call.
+
+Memoised results live only as long as the scope, there is no staleness across requests.
+Within the scope, memoised results are dropped when a write touches their table:
+
+    * A write via :py:meth:`~bh_database.base_table.WriteCapableTable.write_to_database`, \
+        :py:meth:`~bh_database.base_table.WriteCapableTable.run_execute_sql` or \
+        :py:meth:`~bh_database.base_table.WriteCapableTable.run_named_execute` drops results \
+        read via the same table class, and results whose statement mentions the table name.
+    * :py:meth:`~bh_database.base_table.WriteCapableTable.run_stored_proc` is never memoised, \
+        and since a stored procedure may write anything, it drops all results.
+    * A rollback, :py:meth:`~bh_database.core.BaseSQLAlchemy.rollback_transaction`, drops \
+        all results: they may have read rolled back data.
+
+Only successful results are memoised. Each read gets its own copy of a memoised result.
+
+The scope is held in a context variable. Open it with the :py:func:`request_scope`
+context manager::
+
+    with request_scope():
+        ...
+
+Or, per HTTP request, with :py:func:`init_flask` for Flask applications, or the
+:py:class:`RequestScopeMiddleware` ASGI middleware for FastAPI and Starlette applications.
+
+For usage examples, see ``./tests/test_45_request_scope.py``.
+"""
+
+import re
+import copy
+import threading
+from contextvars import ContextVar
+from contextlib import contextmanager
+
+_current_scope: ContextVar['RequestScope'] = ContextVar('bh_database_request_scope', default=None)
+
+class RequestScope:
+    """Memoised read results of a unit of work.
+    """
+
+    def __init__(self):
+        # key: (tablename, sql, status)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+        #: The number of reads served from the scope.
+        self.hits = 0
+        #: The number of reads which went to the database.
+        self.misses = 0
+
+    def get(self, key: str):
+        """Get a memoised result.
+
+        :param str key: the read key, see :py:func:`~bh_database.coalesce.make_flight_key`.
+
+        :return: a copy of the memoised result, ``None`` if not memoised.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if (entry == None):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+        return copy.deepcopy(entry[2])
+
+    def set(self, key: str, status, tablename: str, sql: str) -> None:
+        """Memoise a result.
+
+        :param str key: the read key, see :py:func:`~bh_database.coalesce.make_flight_key`.
+
+        :param status: the result, it is copied.
+
+        :param str tablename: the name of the table of the class which ran the read.
+
+        :param str sql: the SQL statement of the read.
+        """
+        entry = (tablename, sql, copy.deepcopy(status))
+        with self._lock:
+            self._entries[key] = entry
+
+    def invalidate(self, tablename: str) -> None:
+        """Drop results read via a table class of a table, or whose statement mentions it.
+
+        :param str tablename: the table name.
+        """
+        mentioned = re.compile(rf"\b{re.escape(tablename)}\b", re.IGNORECASE)
+
+        with self._lock:
+            for key in [key for key, entry in self._entries.items()
+                        if (entry[0] == tablename) or mentioned.search(entry[1])]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop all results.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+def current_scope() -> RequestScope:
+    """The request scope of the current context.
+
+    :return: the :py:class:`RequestScope`, ``None`` if no scope is open.
+    """
+    return _current_scope.get()
+
+@contextmanager
+def request_scope():
+    """Context manager. Memoise reads within its scope. Scopes do not nest: within an open
+    scope, the current scope carries on.
+
+    :return: the :py:class:`RequestScope`.
+    """
+    scope = _current_scope.get()
+    if (scope != None):
+        yield scope
+        return
+
+    scope = RequestScope()
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+def init_flask(app) -> None:
+    """Open a request scope for every request of a `Flask <https://flask.palletsprojects.com/>`_
+    application.
+
+    :param app: the Flask application.
+    """
+    from flask import g
+
+    @app.before_request
+    def bh_open_request_scope():
+        g.bh_request_scope = request_scope()
+        g.bh_request_scope.__enter__()
+
+    @app.teardown_request
+    def bh_close_request_scope(exc):
+        cm = g.pop('bh_request_scope', None)
+        if (cm != None): cm.__exit__(None, None, None)
+
+class RequestScopeMiddleware:
+    """`ASGI <https://asgi.readthedocs.io/>`_ middleware, which opens a request scope for
+    every HTTP request. E.g., for `FastAPI <https://fastapi.tiangolo.com/>`_::
+
+        app.add_middleware(RequestScopeMiddleware)
+
+    Synchronous endpoints run in a thread pool with a copy of the request context, they
+    share the request scope.
+
+    :param app: the ASGI application.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (scope['type'] != 'http'):
+            await self.app(scope, receive, send)
+            return
+
+        with request_scope():
+            await self.app(scope, receive, send)
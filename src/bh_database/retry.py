@@ -0,0 +1,353 @@
+"""Automatic retry of transactions failed on deadlocks and serialization failures.
+
+Under concurrent load, a transaction can fail only because another transaction got in its
+way: MySQL picks it as a deadlock victim, or gives up waiting for a lock; PostgreSQL
+aborts it on a deadlock, or on a serialization failure under ``REPEATABLE READ`` and
+``SERIALIZABLE`` isolation. Nothing is wrong with the work itself, run again it most
+likely succeeds.
+
+A :py:class:`RetryPolicy` runs a whole transaction, i.e. a function which calls
+:py:meth:`~bh_database.core.BaseSQLAlchemy.begin_transaction` ...
+:py:meth:`~bh_database.core.BaseSQLAlchemy.finalise_transaction` and returns the
+`ResultStatus <https://bh-apistatus.readthedocs.io/en/latest/result-status.html>`_, and runs
+it again when it failed on a retryable error::
+
+    @retry_transaction(max_attempts=5)
+    def save_invoice(data: list) -> ResultStatus:
+        invoice = Invoice()
+        invoice.begin_transaction()
+        status = invoice.write_to_database(data)
+        invoice.finalise_transaction(status)
+        return status
+
+Write methods such as :py:meth:`~bh_database.base_table.WriteCapableTable.write_to_database`
+turn exceptions into a 500 ``ResultStatus``: database errors are recorded on
+:attr:`~bh_database.core.Database.engine` as they are raised, and an attempt is retried if
+it returned a failed status, or raised, on a retryable error:
+
+    * MySQL: deadlock ``1213``, lock wait timeout ``1205``, see :py:data:`BH_MYSQL_RETRYABLE`.
+    * PostgreSQL: serialization failure ``40001``, deadlock ``40P01``, see \
+        :py:data:`BH_POSTGRESQL_RETRYABLE`.
+    * SQLite: ``SQLITE_BUSY``, ``SQLITE_LOCKED``, see :py:data:`BH_SQLITE_RETRYABLE`.
+
+Attempts are spaced with jittered exponential backoff, so that colliding transactions do
+not collide again. A :py:class:`RetryBudget` shared by policies caps retries to a ratio of
+transactions: when the database is overloaded rather than contended, retries would only
+add load. Retries are counted in :py:class:`RetryMetrics`.
+
+The function must be the whole transaction: it is called again from the start, it must
+not depend on state left by a failed attempt. Within an ongoing transaction, a retry would
+only replay part of the transaction: the function is called once, without retry.
+
+For usage examples, see ``./tests/test_55_retry.py``.
+"""
+
+import time
+import random
+import threading
+import functools
+from contextvars import ContextVar
+
+from http import HTTPStatus
+
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+
+from bh_database.core import (
+    Database,
+    BaseSQLAlchemy,
+)
+
+from bh_database import logger
+
+#: MySQL error numbers of retryable errors, and their reasons.
+BH_MYSQL_RETRYABLE = {1213: 'deadlock', 1205: 'lock_wait_timeout'}
+#: PostgreSQL SQLSTATE codes of retryable errors, and their reasons.
+BH_POSTGRESQL_RETRYABLE = {'40001': 'serialization_failure', '40P01': 'deadlock'}
+#: SQLite result codes of retryable errors, and their reasons.
+BH_SQLITE_RETRYABLE = {5: 'busy', 6: 'locked'}
+
+# Database errors raised during the current attempt. None outside of attempts.
+_attempt_errors: ContextVar[list] = ContextVar('bh_database_attempt_errors', default=None)
+
+def retry_reason(error: Exception) -> str:
+    """The reason a database error is retryable.
+
+    :param Exception error: a SQLAlchemy ``DBAPIError``, or a driver exception.
+
+    :return: the reason, e.g. ``'deadlock'``, ``None`` if the error is not retryable.
+    :rtype: str.
+    """
+    orig = error.orig if isinstance(error, DBAPIError) else error
+    if (orig == None): return None
+
+    # sqlite3.
+    code = getattr(orig, 'sqlite_errorcode', None)
+    if (code != None): return BH_SQLITE_RETRYABLE.get(code & 0xFF)
+
+    # mysql-connector-python; mysqlclient and PyMySQL: (errno, message).
+    errno = getattr(orig, 'errno', None)
+    if (errno == None) and (len(orig.args) > 0) and isinstance(orig.args[0], int): errno = orig.args[0]
+    if (errno in BH_MYSQL_RETRYABLE): return BH_MYSQL_RETRYABLE[errno]
+
+    # psycopg2; psycopg (3).
+    sqlstate = getattr(orig, 'pgcode', None) or getattr(orig, 'sqlstate', None)
+    return BH_POSTGRESQL_RETRYABLE.get(sqlstate)
+
+def _record_error(context) -> None:
+    errors = _attempt_errors.get()
+    if (errors != None): errors.append(context.original_exception)
+
+def _listen(engine) -> None:
+    if (engine != None) and (not event.contains(engine, 'handle_error', _record_error)):
+        event.listen(engine, 'handle_error', _record_error)
+
+def _rollback() -> None:
+    # A failed attempt may leave its transaction open: the next attempt must start afresh.
+    session = BaseSQLAlchemy.session
+    if (session != None) and session.in_transaction():
+        # Uses only the class attribute session.
+        BaseSQLAlchemy.rollback_transaction(BaseSQLAlchemy)
+
+class RetryMetrics:
+    """Counters of transactions run by :py:class:`RetryPolicy` instances. Policies share
+    :py:data:`retry_metrics` unless given their own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Zero all counters.
+        """
+        with self._lock:
+            #: The number of transactions run.
+            self.calls = 0
+            #: The number of attempts, first attempts included.
+            self.attempts = 0
+            #: The number of retries.
+            self.retries = 0
+            #: The number of transactions which succeeded after one or more retries.
+            self.recovered = 0
+            #: The number of transactions which failed on a retryable error, and were not
+            #: retried any further: out of attempts, of time or of budget.
+            self.exhausted = 0
+            #: Seconds slept between attempts.
+            self.backoff_seconds = 0.0
+            #: Retries by reason, e.g. ``{'deadlock': 3}``.
+            self.reasons = {}
+
+    def _record(self, **counts) -> None:
+        with self._lock:
+            reason = counts.pop('reason', None)
+            if (reason != None): self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+            for name, count in counts.items(): setattr(self, name, getattr(self, name) + count)
+
+    def snapshot(self) -> dict:
+        """Current counters.
+
+        :return: counters by name, e.g. for a metrics endpoint.
+        :rtype: dict.
+        """
+        with self._lock:
+            return {'calls': self.calls, 'attempts': self.attempts, 'retries': self.retries,
+                    'recovered': self.recovered, 'exhausted': self.exhausted,
+                    'backoff_seconds': self.backoff_seconds, 'reasons': dict(self.reasons)}
+
+#: Default metrics of all policies.
+retry_metrics = RetryMetrics()
+
+class RetryBudget:
+    """Cap retries to a ratio of transactions, across the policies sharing the budget.
+
+    The budget holds up to ``capacity`` retries, and starts full. Each transaction adds
+    ``ratio`` of a retry, each retry takes one. When the database is overloaded, most
+    transactions fail: the budget runs out, and transactions fail fast instead of
+    multiplying the load.
+
+    :param float ratio: retries earned per transaction, e.g. ``0.2`` for one retry per five
+        transactions in the long run.
+
+    :param int capacity: the maximum number of retries held.
+    """
+
+    def __init__(self, ratio: float = 0.2, capacity: int = 10):
+        self._lock = threading.Lock()
+        self._ratio = ratio
+        self._capacity = capacity
+        self._tokens = float(capacity)
+
+    @property
+    def available(self) -> float:
+        """Read only property. The number of retries currently held.
+        """
+        return self._tokens
+
+    def deposit(self) -> None:
+        """Add a transaction's share of a retry.
+        """
+        with self._lock:
+            self._tokens = min(self._capacity, self._tokens + self._ratio)
+
+    def withdraw(self) -> bool:
+        """Take a retry.
+
+        :return: ``True`` if a retry was taken, ``False`` if the budget has run out.
+        :rtype: bool.
+        """
+        with self._lock:
+            if (self._tokens < 1): return False
+
+            self._tokens -= 1
+            return True
+
+class RetryPolicy:
+    """Run a transaction, and run it again when it fails on a retryable error. Use as a
+    decorator, or call :py:meth:`run`.
+
+    The delay before the ``n``-th retry is random, between ``0`` and
+    ``min(max_delay, base_delay * 2 ** (n - 1))``.
+
+    :param int max_attempts: the maximum number of attempts, first attempt included.
+
+    :param float base_delay: seconds. The upper bound of the delay before the first retry.
+
+    :param float max_delay: seconds. The upper bound of any delay.
+
+    :param float max_elapsed: optional. Seconds. No retry starts past this time since the
+        first attempt.
+
+    :param RetryBudget budget: optional. A budget to take retries from, typically shared
+        by all policies. Default is no budget.
+
+    :param RetryMetrics metrics: optional. Default is :py:data:`retry_metrics`.
+
+    :param is_retryable: optional. A callable taking a database error, returning a reason
+        if the error is retryable, ``None`` otherwise. Default is :py:func:`retry_reason`.
+
+    :param sleep: optional. A callable taking seconds. Default is ``time.sleep``.
+    """
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.05, max_delay: float = 2.0,
+                 max_elapsed: float = None, budget: RetryBudget = None,
+                 metrics: RetryMetrics = None, is_retryable=None, sleep=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_elapsed = max_elapsed
+        self.budget = budget
+        self.metrics = metrics if (metrics != None) else retry_metrics
+        self._is_retryable = is_retryable if (is_retryable != None) else retry_reason
+        self._sleep = sleep if (sleep != None) else time.sleep
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return self.run(fn, *args, **kwargs)
+
+        return wrapper
+
+    def backoff(self, retry: int) -> float:
+        """The delay before a retry.
+
+        :param int retry: the retry number, ``1`` for the first retry.
+
+        :return: seconds.
+        :rtype: float.
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (retry - 1)))
+
+    def __reason(self, errors: list) -> str:
+        for error in errors:
+            reason = self._is_retryable(error)
+            if (reason != None): return reason
+
+        return None
+
+    def run(self, fn, *args, **kwargs):
+        """Call ``fn(*args, **kwargs)``, again while it fails on a retryable error.
+
+        :param fn: the transaction. A function which returns a `ResultStatus
+            <https://bh-apistatus.readthedocs.io/en/latest/result-status.html>`_.
+
+        :return: the result of the last attempt.
+
+        :Note on Exception:
+
+        An exception raised by the last attempt is raised. Caller must handle the exception.
+        """
+
+        logger.debug('Entered')
+
+        session = BaseSQLAlchemy.session
+        if (session != None) and session.in_transaction():
+            logger.debug('Exited.')
+            return fn(*args, **kwargs)
+
+        _listen(Database.engine)
+
+        self.metrics._record(calls=1)
+        if (self.budget != None): self.budget.deposit()
+
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            self.metrics._record(attempts=1)
+
+            errors = []
+            token = _attempt_errors.set(errors)
+            try:
+                result = fn(*args, **kwargs)
+                error = None
+            except Exception as e:
+                result = None
+                error = e
+                errors.append(e)
+            finally:
+                _attempt_errors.reset(token)
+
+            failed = (error != None) or (getattr(result, 'code', HTTPStatus.OK.value) != HTTPStatus.OK.value)
+            reason = self.__reason(errors) if failed else None
+
+            if (reason == None):
+                if (not failed) and (attempt > 1): self.metrics._record(recovered=1)
+                break
+
+            delay = self.backoff(attempt)
+
+            if (attempt >= self.max_attempts) or \
+               ((self.max_elapsed != None) and (time.monotonic() - started + delay > self.max_elapsed)) or \
+               ((self.budget != None) and (not self.budget.withdraw())):
+                logger.error(f"Giving up after {attempt} attempt(s): {reason}.")
+                self.metrics._record(exhausted=1)
+                break
+
+            logger.debug(f"Attempt {attempt} failed: {reason}. Retrying in {delay:.3f} seconds.")
+
+            _rollback()
+            self.metrics._record(retries=1, reason=reason, backoff_seconds=delay)
+            self._sleep(delay)
+
+        logger.debug('Exited.')
+
+        if (error != None): raise error
+        return result
+
+def retry_transaction(fn=None, **kwargs):
+    """Decorator. Run a transaction with a new :py:class:`RetryPolicy`. E.g.::
+
+        @retry_transaction
+        def save(data): ...
+
+        @retry_transaction(max_attempts=10, budget=budget)
+        def save(data): ...
+
+    :param fn: the transaction, when used without arguments.
+
+    :param kwargs: :py:class:`RetryPolicy` arguments.
+    """
+    policy = RetryPolicy(**kwargs)
+    return policy if (fn == None) else policy(fn)
@@ -0,0 +1,374 @@
+"""Named SQL statement registry.
+
+Rather than passing ad-hoc full text SQL strings to
+:py:meth:`~bh_database.base_table.ReadOnlyTable.run_select_sql` and
+:py:meth:`~bh_database.base_table.WriteCapableTable.run_execute_sql`, which are parsed
+and compiled on every call, applications can keep their SQL in ``.sql`` files, load
+them once at start up, and run them by name:
+
+    * :py:meth:`~bh_database.base_table.ReadOnlyTable.run_named_select`.
+    * :py:meth:`~bh_database.base_table.WriteCapableTable.run_named_execute`.
+
+Each statement is compiled once into a cached `text() <https://docs.sqlalchemy.org/en/20/core/sqlelement.html#sqlalchemy.sql.expression.text>`_
+construct with typed bind parameters. On PostgreSQL, statements can also be prepared
+on every pooled connection (``PREPARE``), then run with ``EXECUTE``, so the server
+does not parse and plan them on every call either. Call statistics are kept for
+every statement, see :py:meth:`StatementRegistry.stats`.
+
+The registry of the application is :attr:`~bh_database.core.Database.statements`.
+
+:SQL files:
+
+A ``.sql`` file contains one or more named statements. Each statement starts with a
+``-- name:`` line, optionally followed by ``-- param:`` lines which declare the types
+of bind parameters, as names of `SQLAlchemy types <https://docs.sqlalchemy.org/en/20/core/type_basics.html>`_.
+Bind parameters are written as ``:name``. E.g.::
+
+    -- name: select_employees_by_name
+    -- param: last_name String
+    -- param: first_name String
+    select * from employees where (upper(last_name) like :last_name)
+        and (upper(first_name) like :first_name) order by emp_no;
+
+A file without a ``-- name:`` line holds a single statement, named after the file.
+
+Similar to the ``./sql_scripts`` directory layout, statements specific to a database
+can be placed in sub-directories ``mysql`` and ``postgres``, see
+:py:meth:`~bh_database.core.Database.load_statements`.
+
+For usage examples, see ``./tests/test_42_statements.py``.
+"""
+
+import re
+import threading
+from pathlib import Path
+
+from sqlalchemy import (
+    bindparam,
+    event,
+    text,
+    types,
+)
+
+#: Prefix of the names of statements prepared on the server.
+BH_PREPARED_PREFIX = 'bh_'
+#: Key in the pooled connection ``info`` dictionary for the names of statements prepared on it.
+BH_PREPARED_KEY = 'bh_prepared'
+
+# SQLAlchemy text() bind parameter pattern.
+_BIND_PARAM_RE = re.compile(r"(?<![:\w\\]):(\w+)(?![:\w])")
+_NAME_RE = re.compile(r"^--\s*name\s*:\s*(\w+)\s*$", re.IGNORECASE)
+_PARAM_RE = re.compile(r"^--\s*param\s*:\s*(\w+)\s+(\w+)\s*$", re.IGNORECASE)
+
+def _make_type(type_name: str) -> types.TypeEngine:
+    type_ = getattr(types, type_name, None)
+
+    if (not isinstance(type_, type)) or (not issubclass(type_, types.TypeEngine)):
+        raise ValueError(f"{type_name!r} is not a SQLAlchemy type.")
+
+    return type_()
+
+class NamedStatement:
+    """A named, parameterised SQL statement.
+
+    :param str name: the statement name.
+
+    :param str sql: the SQL statement, with bind parameters written as ``:name``.
+
+    :param dict param_types: optional. Bind parameter name, SQLAlchemy type pairs.
+
+    :param bool prepare: ``True`` to prepare this statement on pooled connections,
+        PostgreSQL only.
+    """
+
+    def __init__(self, name: str, sql: str, param_types: dict = None, prepare: bool = False):
+        self._name = name
+        self._sql = sql.strip().rstrip(';').strip()
+        self._param_types = dict(param_types or {})
+        self._prepare = prepare
+
+        self._params = list(dict.fromkeys(_BIND_PARAM_RE.findall(self._sql)))
+
+        self._clause = text(self._sql).bindparams(
+            *[bindparam(param, type_=type_) for param, type_ in self._param_types.items()])
+
+        self._execute_clause = text(f"EXECUTE {self.prepared_name}" +
+            (f"({', '.join(':' + param for param in self._params)})" if self._params else '')
+            ).bindparams(*[bindparam(param, type_=type_) for param, type_ in self._param_types.items()])
+
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+
+    @property
+    def name(self) -> str:
+        """Read only property. The statement name.
+        """
+        return self._name
+
+    @property
+    def sql(self) -> str:
+        """Read only property. The SQL statement, trailing ``;`` removed.
+        """
+        return self._sql
+
+    @property
+    def params(self) -> list:
+        """Read only property. Bind parameter names, in order of first appearance.
+        """
+        return self._params
+
+    @property
+    def prepare(self) -> bool:
+        """Read only property. ``True`` if the statement is to be prepared on pooled connections.
+        """
+        return self._prepare
+
+    @property
+    def clause(self):
+        """Read only property. The cached `text() <https://docs.sqlalchemy.org/en/20/core/sqlelement.html#sqlalchemy.sql.expression.text>`_
+        construct of the statement.
+        """
+        return self._clause
+
+    @property
+    def prepared_name(self) -> str:
+        """Read only property. The name of the statement when prepared on the server.
+        """
+        return f"{BH_PREPARED_PREFIX}{self._name}"
+
+    def compile(self, dialect):
+        """Compile the statement for a dialect, e.g. to inspect the SQL sent to the server.
+
+        The compiled form is not used for executions: SQLAlchemy compiles the statement 
+        on its first execution, and caches it.
+
+        :param dialect: the SQLAlchemy dialect of the connected database.
+
+        :return: the compiled statement.
+        """
+        return self._clause.compile(dialect=dialect)
+
+    def prepare_sql(self, dialect) -> str:
+        """The PostgreSQL ``PREPARE`` statement for this statement.
+
+        Bind parameters are numbered ``$1``, ``$2``, ..., in order of first appearance.
+        When all bind parameters have declared types, the types are included.
+
+        :param dialect: the SQLAlchemy dialect of the connected database.
+
+        :return: the ``PREPARE`` statement.
+        :rtype: str.
+        """
+        positions = {param: idx + 1 for idx, param in enumerate(self._params)}
+        sql = _BIND_PARAM_RE.sub(lambda match: f"${positions[match.group(1)]}", self._sql)
+
+        name = self.prepared_name
+        if (len(self._params) > 0) and all(param in self._param_types for param in self._params):
+            name += '(' + ', '.join(self._param_types[param].compile(dialect=dialect)
+                                    for param in self._params) + ')'
+
+        return f"PREPARE {name} AS {sql}"
+
+    def stats(self) -> dict:
+        """Call statistics.
+
+        :return: a dictionary with keys ``calls``, ``errors``, ``total_time`` and ``mean_time``,
+            times are in seconds.
+        :rtype: dict.
+        """
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'total_time': self.total_time,
+            'mean_time': (self.total_time / self.calls) if (self.calls > 0) else 0.0,
+        }
+
+class StatementRegistry:
+    """A registry of :py:class:`NamedStatement`.
+    """
+
+    def __init__(self):
+        self._statements = {}
+        self._prepare_enabled = False
+        self._lock = threading.Lock()
+
+    def add(self, name: str, sql: str, param_types: dict = None, prepare: bool = False) -> NamedStatement:
+        """Register a statement. A statement of the same name is replaced.
+
+        :param str name: the statement name.
+
+        :param str sql: the SQL statement, with bind parameters written as ``:name``.
+
+        :param dict param_types: optional. Bind parameter name, SQLAlchemy type pairs, e.g.
+            ``{'emp_no': Integer()}``.
+
+        :param bool prepare: ``True`` to prepare the statement on pooled connections, PostgreSQL
+            only.
+
+        :return: the registered statement.
+        :rtype: :py:class:`NamedStatement`.
+        """
+        statement = NamedStatement(name, sql, param_types, prepare)
+        self._statements[name] = statement
+        return statement
+
+    def load_file(self, path, prepare: bool = False) -> list:
+        """Register all statements in a ``.sql`` file. See *SQL files* above.
+
+        :param path: the file path.
+
+        :param bool prepare: ``True`` to prepare the statements on pooled connections,
+            PostgreSQL only.
+
+        :return: the names of the registered statements.
+        :rtype: list.
+
+        :raises ValueError: if a declared parameter type is not a SQLAlchemy type.
+        """
+        path = Path(path)
+
+        entries = []
+        name, param_types, lines = path.stem, {}, []
+
+        for line in path.read_text(encoding='utf-8').splitlines():
+            name_match = _NAME_RE.match(line.strip())
+            if (name_match):
+                if (''.join(lines).strip()): entries.append((name, param_types, lines))
+                name, param_types, lines = name_match.group(1), {}, []
+                continue
+
+            param_match = _PARAM_RE.match(line.strip())
+            if (param_match):
+                param_types[param_match.group(1)] = _make_type(param_match.group(2))
+                continue
+
+            lines.append(line)
+
+        if (''.join(lines).strip()): entries.append((name, param_types, lines))
+
+        return [self.add(name, '\n'.join(lines), param_types, prepare).name
+                for name, param_types, lines in entries]
+
+    def load_directory(self, path, prepare: bool = False) -> list:
+        """Register all statements in all ``.sql`` files in a directory, sub-directories
+        are not included. Files are loaded in name order.
+
+        :param path: the directory path.
+
+        :param bool prepare: see :py:meth:`~load_file`.
+
+        :return: the names of the registered statements.
+        :rtype: list.
+        """
+        names = []
+        for file in sorted(Path(path).glob('*.sql')):
+            names.extend(self.load_file(file, prepare))
+        return names
+
+    def get(self, name: str) -> NamedStatement:
+        """Get a registered statement.
+
+        :param str name: the statement name.
+
+        :return: the statement.
+        :rtype: :py:class:`NamedStatement`.
+
+        :raises KeyError: if there is no statement of this name.
+        """
+        return self._statements[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._statements
+
+    def __iter__(self):
+        return iter(self._statements.values())
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    def clear(self) -> None:
+        """Remove all statements.
+        """
+        self._statements.clear()
+
+    def register_events(self, engine, prepare_enabled: bool) -> None:
+        """Prepare statements marked for preparing on every new pooled connection of an engine.
+
+        Called by :py:meth:`~bh_database.core.Database.connect`.
+
+        :param engine: the newly created engine.
+
+        :param bool prepare_enabled: ``False`` if the connected database does not support
+            preparing, or connections can not hold session state, e.g. through PgBouncer in
+            transaction pooling mode. In which case statements are never prepared.
+        """
+        self._prepare_enabled = prepare_enabled
+
+        if (not prepare_enabled): return
+
+        @event.listens_for(engine, 'connect')
+        def prepare_statements(dbapi_connection, connection_record):
+            prepared = connection_record.info.setdefault(BH_PREPARED_KEY, set())
+
+            cursor = dbapi_connection.cursor()
+            try:
+                for statement in list(self._statements.values()):
+                    if (not statement.prepare): continue
+
+                    cursor.execute(statement.prepare_sql(engine.dialect))
+                    prepared.add(statement.name)
+            finally:
+                cursor.close()
+
+            dbapi_connection.commit()
+
+    def clause_for(self, name: str, connection):
+        """The construct to execute a statement on a connection.
+
+        If the statement is marked for preparing and preparing is enabled, it is the
+        ``EXECUTE`` of the prepared statement, the statement is prepared on the connection
+        first if it has not been. Otherwise, it is :attr:`NamedStatement.clause`.
+
+        :param str name: the statement name.
+
+        :param connection: a `sqlalchemy.engine.Connection <https://docs.sqlalchemy.org/en/20/core/connections.html#sqlalchemy.engine.Connection>`_,
+            e.g. ``session.connection()``.
+
+        :raises KeyError: if there is no statement of this name.
+        """
+        statement = self.get(name)
+
+        if (not statement.prepare) or (not self._prepare_enabled): return statement.clause
+
+        prepared = connection.connection.info.setdefault(BH_PREPARED_KEY, set())
+        if (name not in prepared):
+            connection.exec_driver_sql(statement.prepare_sql(connection.dialect))
+            prepared.add(name)
+
+        return statement._execute_clause
+
+    def record(self, name: str, elapsed: float, error: bool = False) -> None:
+        """Record a call of a statement.
+
+        :param str name: the statement name.
+
+        :param float elapsed: the call duration in seconds.
+
+        :param bool error: ``True`` if the call failed.
+        """
+        statement = self._statements.get(name)
+        if (statement == None): return
+
+        with self._lock:
+            statement.calls += 1
+            statement.total_time += elapsed
+            if (error): statement.errors += 1
+
+    def stats(self) -> dict:
+        """Call statistics of all statements.
+
+        :return: a dictionary of statement name, :py:meth:`NamedStatement.stats` pairs.
+        :rtype: dict.
+        """
+        return {name: statement.stats() for name, statement in self._statements.items()}
@@ -0,0 +1,208 @@
+"""Multi-table unit-of-work writer.
+
+:py:meth:`~bh_database.base_table.WriteCapableTable.write_to_database` writes one table
+per call, and new master records must be flushed to get their keys before detail records
+can reference them: saving an invoice with its lines takes a round trip per Id, per
+inserted record and per level.
+
+A :py:class:`UnitOfWork` takes new, modified and deleted records of several
+:py:class:`~bh_database.base_table.WriteCapableTable` classes, then writes them all at
+once, within the current transaction:
+
+    1. Tables are ordered by foreign key dependency, parents first.
+    2. New Ids are allocated in blocks, one call per table, see \
+        ``./sql_scripts/<database>/06_get_unique_id_block_stored_method.sql``, or with \
+        the table's :py:mod:`~bh_database.id_generators` Id generator. Ids assigned by \
+        the database on ``INSERT`` are known once the table's records are inserted.
+    3. Foreign keys are wired client-side: a new record's primary key can be a \
+        :py:class:`TempId` placeholder, which detail records use as foreign key value. \
+        Placeholders are replaced with the allocated Ids.
+    4. Deleted records are deleted first, children first, see \
+        :py:meth:`~bh_database.base_table.WriteCapableTable._bulk_delete`.
+    5. Each table's new records are inserted with one batched INSERT, and its modified \
+        records updated with one batched UPDATE.
+
+E.g.::
+
+    invoice_id = TempId()
+
+    uow = UnitOfWork()
+    uow.add(Invoice, [{'invoice_id': invoice_id, 'customer_id': 42, 'recStatus': 'new'}])
+    uow.add(InvoiceLine, [
+        {'line_id': TempId(), 'invoice_id': invoice_id, 'qty': 1, 'recStatus': 'new'},
+        {'line_id': TempId(), 'invoice_id': invoice_id, 'qty': 2, 'recStatus': 'new'},
+    ])
+
+    invoice = Invoice()
+    invoice.begin_transaction()
+    status = uow.write()
+    invoice.finalise_transaction(status)
+
+For usage examples, see ``./tests/test_46_unit_of_work.py``.
+"""
+
+from sqlalchemy.schema import sort_tables
+
+from bh_apistatus.result_status import (
+    ResultStatus,
+    make_status,
+    make_500_status,
+)
+
+from bh_database.constant import (
+    BH_SAVED_SUCCESSFUL_MSG,
+    BH_UNRESOLVED_TEMP_ID_MSG,
+)
+
+from bh_database import logger
+
+class TempId:
+    """A placeholder for the primary key value of a new record, which is not known until
+    the record is written by a :py:class:`UnitOfWork`. Use the same instance as the primary
+    key value of the new record, and as the foreign key value of records referencing it.
+    """
+
+    __slots__ = ('value',)
+
+    def __init__(self):
+        #: The allocated Id, ``None`` until allocated.
+        self.value = None
+
+    def __repr__(self):
+        return f"TempId({self.value!r})"
+
+class UnitOfWork:
+    """Collect new, modified and deleted records of several tables, and write them all at once.
+
+    A unit of work is for a single write: create a new one for each.
+    """
+
+    def __init__(self):
+        # table class: list of records.
+        self._data = {}
+
+    def add(self, table_class, data: list) -> None:
+        """Add records to write to a table.
+
+        :param table_class: a :py:class:`~bh_database.base_table.WriteCapableTable` subclass.
+
+        :param list data: new, modified and deleted records, with ``recStatus``, as for
+            :py:meth:`~bh_database.base_table.WriteCapableTable.write_to_database`. Column
+            values can be :py:class:`TempId` placeholders.
+        """
+        self._data.setdefault(table_class, []).extend(data)
+
+    def __sorted(self) -> list:
+        """Table classes in foreign key dependency order, parents first.
+        """
+        by_table = {table_class.__table__: table_class for table_class in self._data}
+        return [by_table[table] for table in sort_tables(by_table.keys())]
+
+    def __resolve(self, tablename: str, record: dict) -> None:
+        for column, value in record.items():
+            if (not isinstance(value, TempId)): continue
+
+            if (value.value == None): raise Exception(BH_UNRESOLVED_TEMP_ID_MSG.format(tablename, column))
+            record[column] = value.value
+
+    def write(self) -> ResultStatus:
+        """Write all records, within the current transaction.
+
+        :Transaction: callers must either call
+            :py:meth:`~bh_database.core.BaseSQLAlchemy.commit_transaction`
+            or :py:meth:`~bh_database.core.BaseSQLAlchemy.rollback_transaction` to
+            commit or rollback the write respectively, as for
+            :py:meth:`~bh_database.base_table.WriteCapableTable.write_to_database`.
+
+        :return: `ResultStatus <https://bh-apistatus.readthedocs.io/en/latest/result-status.html>`_.
+
+        On successful, for each table, ``{__tablename__}_new_list``,
+        ``{__tablename__}_updated_list`` and ``{__tablename__}_deleted_list``, as for
+        :py:meth:`~bh_database.base_table.WriteCapableTable.write_to_database`, with
+        :py:class:`TempId` placeholders replaced with allocated Ids.
+
+        On failure::
+
+            {
+                "status": {
+                    "code": 500,
+                    "text": "...error text..."
+                }
+            }
+        """
+
+        logger.debug('Entered')
+        try:
+            plan = []
+            for table_class in self.__sorted():
+                table = table_class()
+
+                new_list = []
+                updated_list = []
+                deleted_list = []
+                table._split_data(self._data[table_class], new_list, updated_list, deleted_list)
+
+                plan.append((table, new_list, updated_list, deleted_list))
+
+            # Allocating new Ids in blocks, one call per table.
+            for table, new_list, _, _ in plan:
+                # Assigned on INSERT, see below.
+                if (table._ids_on_insert()): continue
+
+                pending = table._without_id(new_list)
+                if (len(pending) == 0): continue
+
+                id_column = table._id_column()
+                for record, new_id in zip(pending, table._allocate_ids(len(pending))):
+                    temp_id = record.get(id_column)
+                    if (isinstance(temp_id, TempId)): temp_id.value = new_id
+
+                    record[id_column] = new_id
+
+            # Children first.
+            for table, _, _, deleted_list in reversed(plan):
+                if (len(deleted_list) == 0): continue
+
+                for record in deleted_list: self.__resolve(table.__tablename__, record)
+                table._bulk_delete([table._record_identity(record) for record in deleted_list])
+
+            # Parents first: Ids assigned on INSERT resolve placeholders of detail tables.
+            for table, new_list, updated_list, _ in plan:
+                assigned = []
+                if (table._ids_on_insert()):
+                    id_column = table._id_column()
+                    assigned = [(record, record.pop(id_column, None)) for record in table._without_id(new_list)]
+
+                # Wiring foreign keys.
+                for record in new_list + updated_list: self.__resolve(table.__tablename__, record)
+
+                if (len(new_list) > 0): table._insert_new(new_list)
+                if (len(updated_list) > 0): table._bulk_update(updated_list)
+
+                for record, temp_id in assigned:
+                    if (isinstance(temp_id, TempId)): temp_id.value = record[id_column]
+
+            #
+            # This is to cause any potential database violation to raise exception, so
+            # that it will be handled by the exception block below.
+            #
+            if (len(plan) > 0): plan[0][0].session.flush()
+
+            status = make_status(text=BH_SAVED_SUCCESSFUL_MSG)
+
+            for table, new_list, updated_list, deleted_list in plan:
+                table._invalidate_cached([table._record_identity(record) 
+                                          for record in updated_list + deleted_list])
+
+                status.add_data(new_list, '{}_new_list'.format(table.__tablename__.lower()))
+                status.add_data(updated_list, '{}_updated_list'.format(table.__tablename__.lower()))
+                status.add_data(deleted_list, '{}_deleted_list'.format(table.__tablename__.lower()))
+
+        except Exception as e:
+            logger.error(str(e))
+
+            status = make_500_status(str(e))
+
+        finally:
+            logger.debug('Exited.')
+            return status
@@ -15,12 +15,18 @@ Valid @pytest.marks are defined in pytest.ini.
 
 import pytest
 
+from sqlalchemy import event
+
 from bh_database.core import Database
 
 from tests import (
     create_mysql_database_entities,
     create_postgresql_database_entities,
 )
+from tests.employees import (
+    Employees,
+    employee,
+)
 
 @pytest.fixture(scope='module')
 def mysql():
@@ -31,3 +37,36 @@ def mysql():
 def postgresql():
     Database.disconnect()
     create_postgresql_database_entities()
+
+@pytest.fixture
+def employees_count():
+    """The number of employees sqlite_employees() inserts. Test modules override it.
+    """
+    return 0
+
+@pytest.fixture
+def sqlite_employees(tmp_path, employees_count):
+    """A SQLite database file ``employees.db`` in tmp_path stands in for the database server, 
+    with table employees and employees 1 to employees_count, see tests.employees.employee().
+
+    Yields the list of statements executed after setting up, lower case, whitespace collapsed.
+    """
+    Database.disconnect()
+    Database.connect(f"sqlite:///{tmp_path / 'employees.db'}", None)
+
+    Employees.__table__.create(Database.engine)
+
+    session = Database.database_session()
+    for emp_no in range(1, employees_count + 1): session.add(Employees(**employee(emp_no)))
+    session.commit()
+    session.close()
+
+    statements = []
+
+    @event.listens_for(Database.engine, 'before_cursor_execute')
+    def record_statements(conn, cursor, statement, parameters, context, executemany):
+        statements.append(' '.join(statement.split()).lower())
+
+    yield statements
+
+    Database.disconnect()
@@ -1,6 +1,8 @@
 """
 Employees test model and associated test constants and methods.
 """
+import datetime
+
 from sqlalchemy import (
     Column,
     Integer,
@@ -9,6 +11,7 @@ from sqlalchemy import (
 )
 
 from bh_database.base_table import WriteCapableTable
+from bh_database.constant import BH_REC_STATUS_FIELDNAME
 
 class Employees(WriteCapableTable):
     __tablename__ = 'employees'
@@ -20,6 +23,15 @@ class Employees(WriteCapableTable):
     gender = Column(String(1), nullable=False)
     hire_date = Column(Date, nullable=False)
 
+class DeptEmp(WriteCapableTable):
+    """Composite primary key."""
+    __tablename__ = 'dept_emp'
+
+    emp_no = Column(Integer, primary_key=True, autoincrement=False)
+    dept_no = Column(String(4), primary_key=True)
+    from_date = Column(Date, nullable=False)
+    to_date = Column(Date, nullable=False)
+
 SELECT_EMPLOYEES = ("select * from employees where (upper(last_name) like '%NAS%')" 
     " and (upper(first_name) like '%AN') order by emp_no;")
 
@@ -36,3 +48,11 @@ def assert_employees_list_of_dicts(rows: list) -> None:
 
     assert rows[len(rows)-1]['first_name'] == 'Gopalakrishnan'
     assert rows[len(rows)-1]['last_name'] == 'Gornas'
+
+def employee(emp_no: int, **changes) -> dict:
+    return dict({'emp_no': emp_no, 'birth_date': datetime.date(1953, 9, 2), 
+                 'first_name': f'First {emp_no}', 'last_name': f'Last {emp_no}', 
+                 'gender': 'M', 'hire_date': datetime.date(1986, 6, 26)}, **changes)
+
+def tagged(record: dict, rec_status: str) -> dict:
+    return dict(record, **{BH_REC_STATUS_FIELDNAME: rec_status})
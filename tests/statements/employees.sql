@@ -0,0 +1,10 @@
+-- name: select_employees_by_name
+-- param: last_name String
+-- param: first_name String
+select * from employees where (upper(last_name) like :last_name)
+    and (upper(first_name) like :first_name) order by emp_no;
+
+-- name: update_employee_last_name
+-- param: emp_no Integer
+-- param: last_name String
+update employees set last_name = :last_name where emp_no = :emp_no;
@@ -203,4 +203,49 @@ def test_postgresql_use_session_after_disconnect():
     # result is CursorResult.
     assert result.rowcount == 38
 
-    assert_employees_list_of_tuples(result.fetchall())
\ No newline at end of file
+    assert_employees_list_of_tuples(result.fetchall())
+
+@pytest.mark.database_postgresql
+def test_postgresql_pooler_mode():
+    """Connect in pooler mode: search_path is set per transaction via SET LOCAL
+    rather than via the connection startup parameter.
+    """
+    Database.disconnect()
+
+    Database.connect(POSTGRESQL_DB_URL, POSTGRESQL_DB_SCHEMA, pooler_mode=True)
+
+    session = Database.database_session()
+
+    assert session.execute(text("select current_schema()")).scalar() == POSTGRESQL_DB_SCHEMA
+
+    result = session.execute(text(SELECT_EMPLOYEES))
+    assert result.rowcount == 38
+
+    session.commit()
+
+    """
+    SET LOCAL does not outlive the transaction: the raw connection has the default search_path.
+    """
+    with Database.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        assert conn.execute(text("select current_schema()")).scalar() != POSTGRESQL_DB_SCHEMA
+
+    Database.disconnect()
+
+@pytest.mark.database_postgresql
+def test_postgresql_tenant():
+    """Switch schema per transaction on a single connection pool.
+    """
+    Database.disconnect()
+
+    Database.connect(POSTGRESQL_DB_URL, POSTGRESQL_DB_SCHEMA)
+
+    session = Database.database_session()
+
+    with Database.tenant('public'):
+        assert session.execute(text("select current_schema()")).scalar() == 'public'
+        session.commit()
+
+    assert session.execute(text("select current_schema()")).scalar() == POSTGRESQL_DB_SCHEMA
+    session.commit()
+
+    Database.disconnect()
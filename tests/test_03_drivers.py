@@ -0,0 +1,111 @@
+"""Test driver adapters.
+
+These tests are database neutral and don't require a database connection.
+
+To run only tests in this module: pytest -m drivers
+"""
+
+import pytest
+
+from sqlalchemy.dialects import postgresql
+
+from bh_database.core import Database
+from bh_database.drivers import (
+    DriverAdapter,
+    MySQLConnectorAdapter,
+    MySQLClientAdapter,
+    PostgreSQLAdapter,
+    make_adapter,
+    search_path_sql,
+    tenant_schema,
+)
+
+class FakeCursor:
+    def __init__(self, description, rows, extra_sets=0):
+        self.description = description
+        self._rows = rows
+        self._extra_sets = extra_sets
+
+    def fetchall(self):
+        return self._rows
+
+    def nextset(self):
+        if self._extra_sets == 0: return None
+        self._extra_sets -= 1
+        return True
+
+@pytest.mark.drivers
+def test_make_adapter():
+    assert isinstance(make_adapter('mysql+mysqlconnector'), MySQLConnectorAdapter)
+    assert isinstance(make_adapter('mysql+mysqldb'), MySQLClientAdapter)
+    assert isinstance(make_adapter('mysql'), MySQLClientAdapter)
+    assert isinstance(make_adapter('postgresql+psycopg2'), PostgreSQLAdapter)
+    assert type(make_adapter('sqlite')) == DriverAdapter
+
+@pytest.mark.drivers
+def test_connect_args():
+    assert make_adapter('postgresql+psycopg2').connect_args('employees') == \
+        {"options": "-csearch_path=employees"}
+
+    assert make_adapter('mysql+mysqlconnector').connect_args(None) == {}
+    assert make_adapter('mysql+mysqlconnector', buffered=True, use_pure=False).connect_args(None) == \
+        {'use_pure': False, 'buffered': True}
+
+    assert make_adapter('mysql+mysqldb', buffered=True).connect_args(None) == {}
+
+@pytest.mark.drivers
+def test_mysqlclient_stored_proc_result():
+    cursor = FakeCursor([('emp_no',), ('last_name',)], [(1, 'Gornas')], extra_sets=1)
+
+    columns, rows = MySQLClientAdapter().stored_proc_result(cursor)
+
+    assert columns == ['emp_no', 'last_name']
+    assert rows == [(1, 'Gornas')]
+    # All result sets have been consumed.
+    assert cursor.nextset() == None
+
+    assert MySQLClientAdapter().stored_proc_result(FakeCursor(None, [])) == None
+
+@pytest.mark.drivers
+def test_postgresql_pooler_mode():
+    adapter = make_adapter('postgresql+psycopg2', pooler_mode=True)
+
+    assert adapter.pooler_mode == True
+    # No startup parameter is sent.
+    assert adapter.connect_args('employees') == {}
+
+    assert make_adapter('postgresql+psycopg', pooler_mode=True).connect_args('employees') == \
+        {"prepare_threshold": None}
+
+    assert make_adapter('mysql+mysqlconnector', pooler_mode=True).pooler_mode == False
+
+@pytest.mark.drivers
+def test_search_path_sql():
+    dialect = postgresql.dialect()
+
+    assert search_path_sql(dialect, 'employees') == 'SET search_path TO employees'
+    assert search_path_sql(dialect, 'employees, public', local=True) == \
+        'SET LOCAL search_path TO employees, public'
+    assert search_path_sql(dialect, 'Tenant 1') == 'SET search_path TO "Tenant 1"'
+
+@pytest.mark.drivers
+def test_postgresql_transaction_schema():
+    adapter = make_adapter('postgresql+psycopg2')
+    pooler_adapter = make_adapter('postgresql+psycopg2', pooler_mode=True)
+
+    # The startup parameter is in effect.
+    assert adapter.transaction_schema('employees') == None
+    assert pooler_adapter.transaction_schema('employees') == 'employees'
+
+    with Database.tenant('tenant_01'):
+        assert tenant_schema.get() == 'tenant_01'
+        assert adapter.transaction_schema('employees') == 'tenant_01'
+        assert pooler_adapter.transaction_schema('employees') == 'tenant_01'
+
+        with Database.tenant('tenant_02'):
+            assert adapter.transaction_schema('employees') == 'tenant_02'
+
+        assert adapter.transaction_schema('employees') == 'tenant_01'
+
+    assert tenant_schema.get() == None
+    assert adapter.transaction_schema('employees') == None
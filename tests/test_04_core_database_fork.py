@@ -0,0 +1,57 @@
+"""Test Database "static" class fork handling.
+
+These tests are database neutral: an in-memory SQLite database stands in for
+the database server.
+
+To run only tests in this module: pytest -m database_fork
+"""
+
+import os
+import pytest
+
+from sqlalchemy import text
+
+from bh_database.core import (
+    Database,
+    BaseSQLAlchemy,
+)
+
+SQLITE_DB_URL = "sqlite://"
+
+@pytest.mark.database_fork
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="requires os.fork()")
+def test_after_fork_in_child():
+    """A forked child gets its own connection pool and scoped session, the parent's
+    pool and session are untouched.
+    """
+    Database.disconnect()
+    Database.connect(SQLITE_DB_URL, None)
+
+    parent_pool = Database.engine.pool
+    parent_session = BaseSQLAlchemy.session
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+
+    if (pid == 0):
+        # Child process.
+        os.close(read_fd)
+        ok = (Database.engine.pool is not parent_pool) and \
+            (BaseSQLAlchemy.session is not parent_session) and \
+            (Database.database_session() is BaseSQLAlchemy.session) and \
+            (BaseSQLAlchemy.session.execute(text("select 1")).scalar() == 1)
+        os.write(write_fd, b'1' if ok else b'0')
+        os._exit(0)
+
+    os.close(write_fd)
+    child_result = os.read(read_fd, 1)
+    os.close(read_fd)
+    os.waitpid(pid, 0)
+
+    assert child_result == b'1'
+
+    assert Database.engine.pool is parent_pool
+    assert BaseSQLAlchemy.session is parent_session
+    assert BaseSQLAlchemy.session.execute(text("select 1")).scalar() == 1
+
+    Database.disconnect()
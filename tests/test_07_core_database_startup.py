@@ -0,0 +1,53 @@
+"""Test Database "static" class start-up options: lazy connect and warm-up.
+
+These tests are database neutral: a SQLite database file stands in for the 
+database server.
+
+To run only tests in this module: pytest -m database_startup
+"""
+
+import pytest
+
+from bh_database.core import Database
+
+@pytest.fixture
+def sqlite_db_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'employees.db'}"
+
+@pytest.mark.database_startup
+def test_connect_returns_validation_connection(sqlite_db_url):
+    """The connection opened to validate the URL goes back to the pool.
+    """
+    Database.disconnect()
+    Database.connect(sqlite_db_url, None)
+
+    assert Database.engine.pool.checkedout() == 0
+    assert Database.engine.pool.checkedin() == 1
+
+    Database.disconnect()
+
+@pytest.mark.database_startup
+def test_connect_lazy(sqlite_db_url):
+    Database.disconnect()
+    Database.connect(sqlite_db_url, None, lazy=True, warm_up=3)
+
+    assert Database.engine != None
+    assert Database.engine.pool.checkedin() == 0
+
+    Database.disconnect()
+
+@pytest.mark.database_startup
+def test_connect_warm_up(sqlite_db_url):
+    Database.disconnect()
+    Database.connect(sqlite_db_url, None, warm_up=3)
+
+    assert Database.engine.pool.checkedout() == 0
+    assert Database.engine.pool.checkedin() == 3
+
+    """
+    Capped at the pool size.
+    """
+    Database.warm_up(Database.engine.pool.size() + 5)
+    assert Database.engine.pool.checkedin() == Database.engine.pool.size()
+
+    Database.disconnect()
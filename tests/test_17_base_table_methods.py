@@ -43,3 +43,12 @@ def test_postgresql_mysql_as_dict():
     assert employees_dict['last_name'] == 'Nguyen'
     assert employees_dict['gender'] == 'F'
     assert employees_dict['hire_date'] == '2021-11-02' 
+
+@pytest.mark.base_table_methods
+def test_postgresql_mysql_as_dict_columns():
+    employees = Employees(emp_no=456000, birth_date='1954-04-30', first_name='Be Hai', \
+                          last_name='Nguyen', gender='F', hire_date='2021-11-02')
+    
+    employees_dict = employees.as_dict(['emp_no', 'last_name'])
+
+    assert employees_dict == {'emp_no': 456000, 'last_name': 'Nguyen'}
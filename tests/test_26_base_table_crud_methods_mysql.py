@@ -18,10 +18,12 @@ Database. This call is similar to applications establish database connection on
 """
 
 from http import HTTPStatus
+from pathlib import Path
 import datetime
 import pytest
 
 from bh_database import core
+from bh_database.cache import TTLCache
 from bh_database.constant import (
     BH_REC_STATUS_FIELDNAME,
     BH_RECORD_STATUS_NEW,
@@ -576,3 +578,111 @@ def test_mysql_run_stored_proc():
     assert len(status.data) == 38
 
     assert_employees_list_of_dicts(status.data)
+
+@pytest.mark.base_table_crud_mysql
+def test_mysql_get_by_pk():
+    """Test keyed lookups, with and without a process-level (L2) cache.
+    """
+
+    employees = Employees()
+
+    status = employees.get_by_pk(10001, auto_session=True)
+
+    assert status.code == HTTPStatus.OK.value
+    assert len(status.data) == 1
+    assert status.data[0]['emp_no'] == 10001
+    assert status.data[0]['first_name'] == 'Georgi'
+    assert status.data[0]['last_name'] == 'Facello'
+
+    """
+    Records are in the order of the requested keys, non-existent keys are skipped.
+    """
+    status = employees.get_many_by_pk([10003, -1, 10001, 10002], auto_session=True)
+
+    assert status.code == HTTPStatus.OK.value
+    assert [record['emp_no'] for record in status.data] == [10003, 10001, 10002]
+
+    status = employees.get_by_pk(-1, auto_session=True)
+    assert status.code == HTTPStatus.OK.value
+    assert status.has_data == False
+
+    """
+    L2 cache: populated on read, invalidated on write.
+    """
+    Employees.l2_cache = TTLCache(ttl=60)
+    try:
+        status = employees.get_by_pk(10001, auto_session=True)
+        assert status.data[0]['first_name'] == 'Georgi'
+        assert len(Employees.l2_cache) == 1
+
+        """
+        Served from the cache: no transaction is started.
+        """
+        status = employees.get_by_pk(10001)
+        assert status.data[0]['first_name'] == 'Georgi'
+        assert employees.session.in_transaction() == False
+
+        employees.begin_transaction()
+        status = employees.write_to_database([{'emp_no': 10001, 'first_name': 'Georgi', 
+            BH_REC_STATUS_FIELDNAME: BH_RECORD_STATUS_MODIFIED}])
+        employees.finalise_transaction(status)
+
+        assert status.code == HTTPStatus.OK.value
+        assert len(Employees.l2_cache) == 0
+    finally:
+        Employees.l2_cache = None
+
+@pytest.mark.base_table_crud_mysql
+def test_mysql_column_projection():
+    """Test selecting only some columns, via the table helper and via the query.
+    """
+
+    status = Employees().select_columns('emp_no', 'first_name', 'last_name', 
+        where="(upper(last_name) like '%NAS%') and (upper(first_name) like '%AN')",
+        order_by=Employees.emp_no, auto_session=True)
+
+    assert status.code == HTTPStatus.OK.value
+    assert len(status.data) == 38
+    assert set(status.data[0].keys()) == {'emp_no', 'first_name', 'last_name'}
+
+    assert_employees_list_of_dicts(status.data)
+
+    query = Employees.query.columns('emp_no', 'last_name').filter(Employees.emp_no == 10001)
+    employee = query.first()
+
+    assert employee.as_dict() == {'emp_no': 10001, 'last_name': 'Facello'}
+    """
+    Deferred columns are still loaded on access.
+    """
+    assert employee.first_name == 'Georgi'
+
+    Employees.commit_transaction(Employees)
+
+@pytest.mark.base_table_crud_mysql
+def test_mysql_run_named_select():
+    """Test a named SELECT statement loaded from ./tests/statements.
+    """
+
+    core.Database.statements.clear()
+    core.Database.load_statements(Path(__file__).parent / 'statements')
+
+    status = Employees().run_named_select('select_employees_by_name', True, 
+                                          last_name='%NAS%', first_name='%AN')
+
+    assert status.code == HTTPStatus.OK.value
+    assert len(status.data) == 38
+    assert_employees_list_of_dicts(status.data)
+
+    # Run again: the statement is compiled once.
+    status = Employees().run_named_select('select_employees_by_name', True, 
+                                          last_name='%NAS%', first_name='%AN')
+    assert len(status.data) == 38
+
+    stats = core.Database.statements.stats()['select_employees_by_name']
+    assert stats['calls'] == 2
+    assert stats['errors'] == 0
+
+    status = Employees().run_named_select('no_such_statement', True)
+    assert status.code == HTTPStatus.INTERNAL_SERVER_ERROR.value
+
+    core.Database.statements.clear()
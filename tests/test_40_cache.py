@@ -0,0 +1,212 @@
+"""Test result cache backends.
+
+These tests are database neutral and don't require a database connection.
+
+To run only tests in this module: pytest -m cache
+"""
+
+import os
+import time
+import sqlite3
+import threading
+import pytest
+
+from bh_database.cache import (
+    TTLCache,
+    SQLiteCache,
+    make_key,
+)
+
+@pytest.mark.cache
+def test_make_key():
+    assert make_key('employees', (10001,)) == 'employees:(10001,)'
+    assert make_key('dept_emp', (10001, 'd005')) == "dept_emp:(10001, 'd005')"
+
+@pytest.mark.cache
+def test_ttl_cache_get_set():
+    cache = TTLCache(ttl=60)
+
+    assert cache.get(make_key('employees', (1,))) == None
+
+    cache.set(make_key('employees', (1,)), {'emp_no': 1}, 'employees')
+    assert cache.get(make_key('employees', (1,))) == {'emp_no': 1}
+
+    cache.delete(make_key('employees', (1,)))
+    assert cache.get(make_key('employees', (1,))) == None
+
+@pytest.mark.cache
+def test_ttl_cache_expiry():
+    cache = TTLCache(ttl=0.05)
+
+    cache.set('k', 1, 'employees')
+    assert cache.get('k') == 1
+
+    time.sleep(0.1)
+    assert cache.get('k') == None
+    assert len(cache) == 0
+
+@pytest.mark.cache
+def test_ttl_cache_lru_eviction():
+    cache = TTLCache(max_entries=2)
+
+    cache.set('a', 1, 'employees')
+    cache.set('b', 2, 'employees')
+    # 'a' becomes the most recently used.
+    assert cache.get('a') == 1
+
+    cache.set('c', 3, 'employees')
+
+    assert cache.get('b') == None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+@pytest.mark.cache
+def test_ttl_cache_invalidate():
+    cache = TTLCache()
+
+    cache.set(make_key('employees', (1,)), 1, 'employees')
+    cache.set(make_key('employees', (2,)), 2, 'employees')
+    cache.set(make_key('departments', ('d001',)), 3, 'departments')
+
+    cache.invalidate('employees')
+
+    assert len(cache) == 1
+    assert cache.get(make_key('departments', ('d001',))) == 3
+
+    cache.clear()
+    assert len(cache) == 0
+
+@pytest.mark.cache
+def test_sqlite_cache_get_set(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'cache.db'), ttl=60)
+
+    assert cache.get(make_key('employees', (1,))) == None
+
+    record = {'emp_no': 1, 'first_name': 'Georgi', 'birth_date': '02/09/1953'}
+    cache.set(make_key('employees', (1,)), record, 'employees')
+    assert cache.get(make_key('employees', (1,))) == record
+    assert len(cache) == 1
+
+    cache.delete(make_key('employees', (1,)))
+    assert cache.get(make_key('employees', (1,))) == None
+
+@pytest.mark.cache
+def test_sqlite_cache_expiry(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'cache.db'), ttl=0.05)
+
+    cache.set('k', 1, 'employees')
+    assert cache.get('k') == 1
+
+    time.sleep(0.1)
+    assert cache.get('k') == None
+    assert len(cache) == 0
+
+@pytest.mark.cache
+def test_sqlite_cache_lru_eviction(tmp_path):
+    # Every read records the access.
+    cache = SQLiteCache(str(tmp_path / 'cache.db'), max_entries=2, touch_interval=0)
+
+    cache.set('a', 1, 'employees')
+    cache.set('b', 2, 'employees')
+    # 'a' becomes the most recently used.
+    assert cache.get('a') == 1
+
+    cache.set('c', 3, 'employees')
+
+    assert cache.get('b') == None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+@pytest.mark.cache
+def test_sqlite_cache_eviction_threads(tmp_path, monkeypatch):
+    """Eviction runs once every ``max_entries // 100`` writes, across threads."""
+    cache = SQLiteCache(str(tmp_path / 'cache.db'), max_entries=1000)
+
+    evictions = []
+    monkeypatch.setattr(cache, '_evict', lambda connection, now: evictions.append(now))
+
+    def write(thread_no: int):
+        for i in range(50): cache.set(f'{thread_no}:{i}', i, 'employees')
+
+    threads = [threading.Thread(target=write, args=(thread_no,)) for thread_no in range(8)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+
+    assert len(evictions) == 8 * 50 // 10
+
+@pytest.mark.cache
+def test_sqlite_cache_reads_do_not_write(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = SQLiteCache(path)
+    cache.set('a', 1, 'employees')
+
+    # Another process holds the write lock.
+    blocker = sqlite3.connect(path, timeout=0, isolation_level=None)
+    blocker.execute('begin immediate')
+    try:
+        assert cache.get('a') == 1
+    finally:
+        blocker.execute('rollback')
+        blocker.close()
+
+@pytest.mark.cache
+def test_sqlite_cache_errors(tmp_path):
+    """Errors are a miss, or do nothing."""
+    path = str(tmp_path / 'cache.db')
+    cache = SQLiteCache(path, timeout=0, touch_interval=0)
+    cache.set('a', 1, 'employees')
+
+    blocker = sqlite3.connect(path, timeout=0, isolation_level=None)
+    blocker.execute('begin exclusive')
+    try:
+        assert cache.get('a') == None
+        cache.set('b', 2, 'employees')
+        cache.delete('a')
+        cache.invalidate('employees')
+        cache.clear()
+    finally:
+        blocker.execute('rollback')
+        blocker.close()
+
+    assert cache.get('a') == 1
+    assert cache.get('b') == None
+
+@pytest.mark.cache
+def test_sqlite_cache_invalidate(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'cache.db'))
+
+    cache.set(make_key('employees', (1,)), 1, 'employees')
+    cache.set(make_key('employees', (2,)), 2, 'employees')
+    cache.set(make_key('departments', ('d001',)), 3, 'departments')
+
+    cache.invalidate('employees')
+
+    assert len(cache) == 1
+    assert cache.get(make_key('departments', ('d001',))) == 3
+
+    cache.clear()
+    assert len(cache) == 0
+
+@pytest.mark.cache
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='Requires os.fork().')
+def test_sqlite_cache_cross_process(tmp_path):
+    """Entries and invalidations are shared between processes, the cache is created 
+    before forking, as in pre-forking servers.
+    """
+    cache = SQLiteCache(str(tmp_path / 'cache.db'))
+
+    cache.set(make_key('employees', (1,)), {'emp_no': 1}, 'employees')
+
+    pid = os.fork()
+    if (pid == 0):
+        # Child process: sees the parent's entry, invalidates, and adds its own.
+        exit_code = 0 if (cache.get(make_key('employees', (1,))) == {'emp_no': 1}) else 1
+        cache.invalidate('employees')
+        cache.set(make_key('departments', ('d001',)), {'dept_no': 'd001'}, 'departments')
+        os._exit(exit_code)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+
+    assert cache.get(make_key('employees', (1,))) == None
+    assert cache.get(make_key('departments', ('d001',))) == {'dept_no': 'd001'}
@@ -0,0 +1,135 @@
+"""Test BatchLoader class.
+
+These tests are database neutral and most don't require a database connection: a
+fake table stands in for a BaseTable subclass, it records the batches requested. A 
+SQLite database file stands in for the database server otherwise.
+
+To run only tests in this module: pytest -m batch_loader
+"""
+
+from http import HTTPStatus
+import datetime
+import pytest
+
+from bh_database.core import Database
+from bh_database.constant import BH_RECORD_STATUS_MODIFIED
+from bh_database.cache import TTLCache
+from bh_database.batch_loader import BatchLoader
+
+from tests.employees import (
+    Employees,
+    tagged,
+)
+
+class FakeTable:
+    def __init__(self, existing: list):
+        self.existing = existing
+        self.batches = []
+
+    def _identity(self, key) -> tuple:
+        return key if isinstance(key, tuple) else (key,)
+
+    def _load_by_pk(self, idents: list, use_temp_table: bool = False) -> dict:
+        self.batches.append((idents, use_temp_table))
+        return {ident: {'emp_no': ident[0]} for ident in idents if ident[0] in self.existing}
+
+@pytest.mark.batch_loader
+def test_load_coalesces_keys():
+    table = FakeTable([1, 2, 3])
+    loader = BatchLoader(table)
+
+    items = [loader.load(key) for key in [3, 1, 99, 3]]
+
+    assert table.batches == []
+
+    assert [item.value for item in items] == [{'emp_no': 3}, {'emp_no': 1}, None, {'emp_no': 3}]
+
+    # One batch, duplicated keys requested once.
+    assert table.batches == [([(3,), (1,), (99,)], False)]
+
+@pytest.mark.batch_loader
+def test_load_many_request_order():
+    table = FakeTable([1, 2, 3])
+    loader = BatchLoader(table)
+
+    assert loader.load_many([2, 42, 1]) == [{'emp_no': 2}, None, {'emp_no': 1}]
+
+    """
+    Already loaded keys are not queried again, including non-existent ones.
+    """
+    assert loader.load_many([1, 3, 42]) == [{'emp_no': 1}, {'emp_no': 3}, None]
+    assert table.batches == [([(2,), (42,), (1,)], False), ([(3,)], False)]
+
+@pytest.mark.batch_loader
+def test_prime_and_clear():
+    table = FakeTable([1, 2])
+    loader = BatchLoader(table)
+
+    loader.prime(1, {'emp_no': 1, 'first_name': 'Georgi'})
+    assert loader.load_many([1]) == [{'emp_no': 1, 'first_name': 'Georgi'}]
+    assert table.batches == []
+
+    loader.clear()
+    assert loader.load_many([1]) == [{'emp_no': 1}]
+    assert len(table.batches) == 1
+
+@pytest.mark.batch_loader
+def test_temp_table_threshold():
+    table = FakeTable([1, 2, 3])
+    loader = BatchLoader(table, temp_table_threshold=2)
+
+    loader.load_many([1, 2])
+    loader.load_many([3, 4, 5])
+
+    assert table.batches == [([(1,), (2,)], False), ([(3,), (4,), (5,)], True)]
+
+@pytest.mark.batch_loader
+@pytest.mark.parametrize('temp_table_threshold', [None, 1])
+def test_load_fills_l2_cache(tmp_path, monkeypatch, temp_table_threshold):
+    Database.disconnect()
+    Database.connect(f"sqlite:///{tmp_path / 'employees.db'}", None)
+
+    Employees.__table__.create(Database.engine)
+
+    session = Database.database_session()
+    for emp_no in range(1, 4):
+        session.add(Employees(emp_no=emp_no, birth_date=datetime.date(1953, 9, 2), first_name='Georgi',
+                              last_name='Facello', gender='M', hire_date=datetime.date(1986, 6, 26)))
+    session.commit()
+    session.close()
+
+    cache = TTLCache()
+    monkeypatch.setattr(Employees, 'l2_cache', cache)
+
+    try:
+        employees = Employees()
+        loader = employees.batch_loader(temp_table_threshold)
+        assert [record['emp_no'] for record in loader.load_many([1, 2, 3])] == [1, 2, 3]
+        employees.rollback_transaction()
+
+        # Loaded via IN or via the temporary table alike.
+        assert len(cache) == 3
+    finally:
+        Database.disconnect()
+
+@pytest.mark.batch_loader
+@pytest.mark.parametrize('employees_count', [3])
+def test_l2_cache_rollback(sqlite_employees, monkeypatch):
+    """Records read within a transaction which has written are not cached: they would 
+    be served after the rollback.
+    """
+    cache = TTLCache()
+    monkeypatch.setattr(Employees, 'l2_cache', cache)
+
+    employees = Employees()
+    employees.begin_transaction()
+    status = employees.write_to_database([tagged({'emp_no': 1, 'last_name': 'ROLLEDBACK'}, 
+                                                 BH_RECORD_STATUS_MODIFIED)])
+    assert status.code == HTTPStatus.OK.value
+
+    assert employees.get_by_pk(1).data[0]['last_name'] == 'ROLLEDBACK'
+    employees.rollback_transaction()
+
+    assert len(cache) == 0
+    assert employees.get_by_pk(1, auto_session=True).data[0]['last_name'] == 'Last 1'
+    assert len(cache) == 1
@@ -0,0 +1,119 @@
+"""Test the named SQL statement registry.
+
+These tests are database neutral and don't require a database connection.
+
+To run only tests in this module: pytest -m statements
+"""
+
+from pathlib import Path
+import pytest
+
+from sqlalchemy import (
+    Integer,
+    String,
+)
+from sqlalchemy.dialects import postgresql
+
+from bh_database.statements import (
+    NamedStatement,
+    StatementRegistry,
+)
+
+STATEMENTS_DIR = Path(__file__).parent / 'statements'
+
+@pytest.mark.statements
+def test_named_statement_params():
+    statement = NamedStatement('select_by_name', 
+        "select * from employees where last_name like :last_name and first_name like :first_name "
+        "and last_name <> :last_name;", {'last_name': String()})
+
+    assert statement.sql.endswith(':last_name')
+    assert statement.params == ['last_name', 'first_name']
+    assert statement.clause._bindparams['last_name'].type._type_affinity == String
+    assert statement.prepared_name == 'bh_select_by_name'
+
+@pytest.mark.statements
+def test_named_statement_prepare_sql():
+    dialect = postgresql.dialect()
+
+    statement = NamedStatement('update_last_name', 
+        "update employees set last_name = :last_name where emp_no = :emp_no",
+        {'last_name': String(), 'emp_no': Integer()})
+    assert statement.prepare_sql(dialect) == ("PREPARE bh_update_last_name(VARCHAR, INTEGER) AS "
+        "update employees set last_name = $1 where emp_no = $2")
+
+    # Not all parameter types declared: the server infers them.
+    statement = NamedStatement('update_last_name', 
+        "update employees set last_name = :last_name where emp_no = :emp_no",
+        {'last_name': String()})
+    assert statement.prepare_sql(dialect) == ("PREPARE bh_update_last_name AS "
+        "update employees set last_name = $1 where emp_no = $2")
+
+@pytest.mark.statements
+def test_registry_load_directory():
+    registry = StatementRegistry()
+
+    names = registry.load_directory(STATEMENTS_DIR)
+    assert names == ['select_employees_by_name', 'update_employee_last_name']
+    assert len(registry) == 2
+    assert 'select_employees_by_name' in registry
+
+    statement = registry.get('select_employees_by_name')
+    assert statement.params == ['last_name', 'first_name']
+    assert statement.sql.startswith('select * from employees')
+    assert not statement.sql.endswith(';')
+    assert statement.prepare == False
+
+    statement = registry.get('update_employee_last_name')
+    assert statement.params == ['last_name', 'emp_no']
+    assert statement.clause._bindparams['emp_no'].type._type_affinity == Integer
+
+    assert str(statement.compile(postgresql.dialect())).startswith("update employees set last_name = %(last_name)s")
+
+    registry.clear()
+    assert len(registry) == 0
+
+@pytest.mark.statements
+def test_registry_load_file_unnamed(tmp_path):
+    registry = StatementRegistry()
+
+    file = tmp_path / 'count_employees.sql'
+    file.write_text("select count(*) from employees;\n")
+
+    assert registry.load_file(file, prepare=True) == ['count_employees']
+    assert registry.get('count_employees').prepare == True
+
+@pytest.mark.statements
+def test_registry_invalid_param_type(tmp_path):
+    registry = StatementRegistry()
+
+    file = tmp_path / 'invalid.sql'
+    file.write_text("-- name: invalid\n-- param: emp_no Integr\nselect :emp_no;\n")
+
+    with pytest.raises(ValueError):
+        registry.load_file(file)
+
+@pytest.mark.statements
+def test_registry_clause_not_prepared():
+    registry = StatementRegistry()
+    statement = registry.add('count_employees', "select count(*) from employees", prepare=True)
+
+    # Preparing is not enabled until registered on a PostgreSQL engine: the connection 
+    # is never used.
+    assert registry.clause_for('count_employees', None) is statement.clause
+
+    with pytest.raises(KeyError):
+        registry.clause_for('no_such_statement', None)
+
+@pytest.mark.statements
+def test_registry_stats():
+    registry = StatementRegistry()
+    registry.add('count_employees', "select count(*) from employees")
+
+    registry.record('count_employees', 0.5)
+    registry.record('count_employees', 1.5, error=True)
+    # Unregistered names are ignored.
+    registry.record('no_such_statement', 1.0)
+
+    assert registry.stats() == {'count_employees': {
+        'calls': 2, 'errors': 1, 'total_time': 2.0, 'mean_time': 1.0}}
@@ -0,0 +1,185 @@
+"""Test single-flight request coalescing.
+
+These tests are database neutral and don't require a database connection.
+
+To run only tests in this module: pytest -m coalesce
+"""
+
+import time
+import asyncio
+import threading
+import pytest
+
+from bh_database.coalesce import (
+    SingleFlight,
+    AsyncSingleFlight,
+    make_flight_key,
+)
+from bh_database.drivers import tenant_schema
+
+THREADS = 8
+
+def run_threads(target):
+    threads = [threading.Thread(target=target) for _ in range(THREADS)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+
+@pytest.mark.coalesce
+def test_make_flight_key():
+    key = make_flight_key('run_select_sql', 'select 1')
+    assert key == make_flight_key('run_select_sql', 'select 1')
+    assert key != make_flight_key('run_select_sql', 'select 2')
+
+    token = tenant_schema.set('tenant_0042')
+    try:
+        assert key != make_flight_key('run_select_sql', 'select 1')
+    finally:
+        tenant_schema.reset(token)
+
+@pytest.mark.coalesce
+def test_single_flight_shares_call():
+    flight = SingleFlight()
+    executed = []
+    results = []
+    # All threads call before the leader's call completes.
+    barrier = threading.Barrier(THREADS)
+
+    def fetch():
+        executed.append(1)
+        time.sleep(0.2)
+        return [{'emp_no': 10001}]
+
+    def worker():
+        barrier.wait()
+        results.append(flight.do('k', fetch))
+
+    run_threads(worker)
+
+    assert len(executed) == 1
+    assert flight.calls == 1
+    assert flight.shared == THREADS - 1
+    assert flight.in_flight() == 0
+
+    assert all(result == [{'emp_no': 10001}] for result in results)
+    # Each caller has its own copy.
+    assert len(set(id(result) for result in results)) == THREADS
+
+    # The call is not cached.
+    flight.do('k', fetch)
+    assert len(executed) == 2
+
+@pytest.mark.coalesce
+def test_single_flight_no_copy():
+    flight = SingleFlight(copy_results=False)
+    results = []
+    barrier = threading.Barrier(THREADS)
+
+    def fetch():
+        time.sleep(0.2)
+        return [{'emp_no': 10001}]
+
+    def worker():
+        barrier.wait()
+        results.append(flight.do('k', fetch))
+
+    run_threads(worker)
+
+    assert len(set(id(result) for result in results)) == 1
+
+@pytest.mark.coalesce
+def test_single_flight_different_keys():
+    flight = SingleFlight()
+    barrier = threading.Barrier(THREADS)
+    counter = iter(range(THREADS))
+
+    def worker():
+        barrier.wait()
+        key = next(counter)
+        assert flight.do(key, lambda: time.sleep(0.05) or key) == key
+
+    run_threads(worker)
+
+    assert flight.calls == THREADS
+    assert flight.shared == 0
+
+@pytest.mark.coalesce
+def test_single_flight_exception():
+    flight = SingleFlight()
+    errors = []
+    barrier = threading.Barrier(THREADS)
+
+    def fetch():
+        time.sleep(0.2)
+        raise RuntimeError('Test exception')
+
+    def worker():
+        barrier.wait()
+        try:
+            flight.do('k', fetch)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    run_threads(worker)
+
+    assert errors == ['Test exception'] * THREADS
+    assert flight.in_flight() == 0
+
+@pytest.mark.coalesce
+def test_async_single_flight_shares_call():
+    flight = AsyncSingleFlight()
+    executed = []
+
+    async def fetch(emp_no):
+        executed.append(emp_no)
+        await asyncio.sleep(0.05)
+        return {'emp_no': emp_no}
+
+    async def main():
+        return await asyncio.gather(*[flight.do('k', fetch, 10001) for _ in range(THREADS)])
+
+    results = asyncio.run(main())
+
+    assert executed == [10001]
+    assert results == [{'emp_no': 10001}] * THREADS
+    assert flight.calls == 1
+    assert flight.shared == THREADS - 1
+    assert flight.in_flight() == 0
+
+@pytest.mark.coalesce
+def test_async_single_flight_exception():
+    flight = AsyncSingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        raise RuntimeError('Test exception')
+
+    async def main():
+        return await asyncio.gather(*[flight.do('k', fetch) for _ in range(THREADS)], 
+                                    return_exceptions=True)
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.in_flight() == 0
+
+@pytest.mark.coalesce
+def test_async_single_flight_follower_cancelled():
+    flight = AsyncSingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.1)
+        return 1
+
+    async def main():
+        leader = asyncio.create_task(flight.do('k', fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do('k', fetch))
+        await asyncio.sleep(0)
+        follower.cancel()
+
+        return await leader, follower
+
+    result, follower = asyncio.run(main())
+
+    assert result == 1
+    assert follower.cancelled()
@@ -0,0 +1,165 @@
+"""Test table change notifications.
+
+These tests are database neutral: a SQLite database file stands in for the database 
+server, table versions are bumped by hand in place of triggers.
+
+To run only tests in this module: pytest -m notifications
+"""
+
+import time
+import pytest
+
+from http import HTTPStatus
+
+from sqlalchemy import text
+
+from bh_database.core import Database
+from bh_database.cache import (
+    TTLCache,
+    make_key,
+)
+from bh_database.notifications import (
+    PostgreSQLChangeListener,
+    TableVersionPoller,
+    invalidate_table,
+    invalidate_all,
+)
+
+from bh_database.constant import BH_RECORD_STATUS_MODIFIED
+
+from tests.employees import (
+    Employees,
+    tagged,
+)
+
+@pytest.fixture
+def sqlite_versions(tmp_path):
+    Database.disconnect()
+    Database.connect(f"sqlite:///{tmp_path / 'versions.db'}", None)
+
+    with Database.engine.begin() as connection:
+        connection.execute(text("create table table_version (tablename varchar(64) primary key, "
+                                "version bigint not null default 0)"))
+        connection.execute(text("insert into table_version values ('employees', 1), ('departments', 1)"))
+
+    yield
+
+    Database.disconnect()
+
+def bump_version(tablename: str) -> None:
+    with Database.engine.begin() as connection:
+        connection.execute(text("update table_version set version = version + 1 "
+                                "where tablename = :tablename"), {'tablename': tablename})
+
+@pytest.mark.notifications
+def test_invalidate_table():
+    try:
+        Employees.l2_cache = TTLCache()
+
+        Employees.l2_cache.set(make_key('employees', (1,)), 1, 'employees')
+        Employees.l2_cache.set(make_key('departments', ('d001',)), 2, 'departments')
+
+        invalidate_table('employees')
+
+        assert Employees.l2_cache.get(make_key('employees', (1,))) == None
+        assert Employees.l2_cache.get(make_key('departments', ('d001',))) == 2
+
+        invalidate_all()
+        assert len(Employees.l2_cache) == 0
+    finally:
+        Employees.l2_cache = None
+
+@pytest.mark.notifications
+def test_table_version_poller_poll(sqlite_versions):
+    changed = []
+    poller = TableVersionPoller(on_change=changed.append)
+
+    # The first poll records the current versions.
+    assert poller.poll() == []
+
+    bump_version('employees')
+    assert poller.poll() == ['employees']
+    assert changed == ['employees']
+
+    assert poller.poll() == []
+
+@pytest.mark.notifications
+def test_table_version_poller_thread(sqlite_versions):
+    changed = []
+    poller = TableVersionPoller(on_change=changed.append, interval=0.05)
+
+    poller.start()
+    try:
+        assert poller.running
+        time.sleep(0.2)
+
+        bump_version('departments')
+        time.sleep(0.2)
+    finally:
+        poller.stop()
+
+    assert not poller.running
+    assert changed == ['departments']
+
+def versions() -> dict:
+    with Database.engine.connect() as connection:
+        return dict(connection.execute(text("select tablename, version from table_version")).all())
+
+@pytest.mark.notifications
+@pytest.mark.parametrize('employees_count', [2])
+def test_version_table_bump(sqlite_employees, monkeypatch):
+    """Versions are bumped after commit, once per write, and not on rollback."""
+    monkeypatch.setattr(Employees, 'version_table', 'table_version')
+
+    with Database.engine.begin() as connection:
+        connection.execute(text("create table table_version (tablename varchar(64) primary key, "
+                                "version bigint not null default 0)"))
+
+    poller = TableVersionPoller(on_change=lambda tablename: None)
+    assert poller.poll() == []
+
+    employees = Employees()
+    employees.begin_transaction()
+    status = employees.write_to_database([tagged({'emp_no': 1, 'last_name': 'ROLLEDBACK'}, 
+                                                 BH_RECORD_STATUS_MODIFIED)])
+    assert status.code == HTTPStatus.OK.value
+    employees.rollback_transaction()
+
+    assert versions() == {}
+
+    employees.begin_transaction()
+    status = employees.write_to_database([tagged({'emp_no': 1, 'last_name': 'Bumped'}, 
+                                                 BH_RECORD_STATUS_MODIFIED)])
+    assert status.code == HTTPStatus.OK.value
+    # Not bumped within the writing transaction.
+    assert versions() == {}
+    employees.commit_transaction()
+
+    assert versions() == {'employees': 1}
+    assert poller.poll() == ['employees']
+
+    employees.begin_transaction()
+    employees.write_to_database([tagged({'emp_no': 2, 'last_name': 'Bumped'}, 
+                                        BH_RECORD_STATUS_MODIFIED)])
+    employees.commit_transaction()
+
+    assert versions() == {'employees': 2}
+
+@pytest.mark.notifications
+def test_postgresql_change_listener_engine(tmp_path, monkeypatch):
+    """The engine of db_url is created once, shared by reconnects, and disposed on stop."""
+    listener = PostgreSQLChangeListener(db_url=f"sqlite:///{tmp_path / 'listener.db'}")
+    engine = listener._engine
+
+    for _ in range(2):
+        listener._connect().close()
+        assert listener._engine is engine
+
+    disposed = []
+    monkeypatch.setattr(engine, 'dispose', lambda: disposed.append(engine))
+
+    listener.stop()
+    assert disposed == [engine]
+
+    # Without db_url: connections of Database.engine, nothing to dispose.
+    assert PostgreSQLChangeListener()._engine == None
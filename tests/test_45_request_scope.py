@@ -0,0 +1,124 @@
+"""Test request-scoped memoisation of reads.
+
+These tests are database neutral: a SQLite database file stands in for the database 
+server.
+
+To run only tests in this module: pytest -m request_scope
+"""
+
+import asyncio
+import pytest
+
+from http import HTTPStatus
+
+from bh_database.request_scope import (
+    RequestScope,
+    RequestScopeMiddleware,
+    current_scope,
+    request_scope,
+)
+
+from tests.employees import Employees
+
+SELECT_EMPLOYEE = "select * from employees where emp_no = 1"
+
+@pytest.fixture
+def employees_count():
+    return 1
+
+@pytest.mark.request_scope
+def test_request_scope_invalidate():
+    scope = RequestScope()
+
+    scope.set('a', [1], 'employees', 'select * from employees')
+    scope.set('b', [2], 'departments', 'select * from departments d join employees e on ...')
+    scope.set('c', [3], 'departments', 'select * from departments')
+
+    value = scope.get('a')
+    assert value == [1]
+    # Each read gets its own copy.
+    value.append(0)
+    assert scope.get('a') == [1]
+
+    scope.invalidate('employees')
+
+    assert scope.get('a') == None
+    assert scope.get('b') == None
+    assert scope.get('c') == [3]
+
+    scope.clear()
+    assert len(scope) == 0
+
+@pytest.mark.request_scope
+def test_request_scope_context():
+    assert current_scope() == None
+
+    with request_scope() as scope:
+        assert current_scope() is scope
+
+        # Scopes do not nest.
+        with request_scope() as inner:
+            assert inner is scope
+
+        assert current_scope() is scope
+
+    assert current_scope() == None
+
+@pytest.mark.request_scope
+def test_request_scope_memoise(sqlite_employees):
+    with request_scope() as scope:
+        status = Employees().run_select_sql(SELECT_EMPLOYEE, True)
+        assert status.code == HTTPStatus.OK.value
+        assert status.data[0]['last_name'] == 'Last 1'
+
+        status = Employees().run_select_sql(SELECT_EMPLOYEE, True)
+        assert status.data[0]['last_name'] == 'Last 1'
+
+        assert scope.misses == 1
+        assert scope.hits == 1
+
+        # A write to the table drops its memoised results.
+        status = Employees().run_execute_sql("update employees set last_name = 'Facelli' "
+                                             "where emp_no = 1", True)
+        assert status.code == HTTPStatus.OK.value
+        assert len(scope) == 0
+
+        status = Employees().run_select_sql(SELECT_EMPLOYEE, True)
+        assert status.data[0]['last_name'] == 'Facelli'
+        assert scope.misses == 2
+
+    # Outside a scope, nothing is memoised.
+    Employees().run_select_sql(SELECT_EMPLOYEE, True)
+    assert scope.misses == 2
+
+@pytest.mark.request_scope
+def test_request_scope_failure_not_memoised(sqlite_employees):
+    with request_scope() as scope:
+        status = Employees().run_select_sql("select * from no_such_table", True)
+        assert status.code == HTTPStatus.INTERNAL_SERVER_ERROR.value
+        assert len(scope) == 0
+
+@pytest.mark.request_scope
+def test_request_scope_rollback(sqlite_employees):
+    with request_scope() as scope:
+        Employees().run_select_sql(SELECT_EMPLOYEE, True)
+        assert len(scope) == 1
+
+        Employees.rollback_transaction(Employees)
+        assert len(scope) == 0
+
+@pytest.mark.request_scope
+def test_request_scope_middleware():
+    scopes = []
+
+    async def app(scope, receive, send):
+        scopes.append(current_scope())
+
+    middleware = RequestScopeMiddleware(app)
+
+    asyncio.run(middleware({'type': 'http'}, None, None))
+    asyncio.run(middleware({'type': 'lifespan'}, None, None))
+
+    assert isinstance(scopes[0], RequestScope)
+    assert scopes[1] == None
+    assert current_scope() == None
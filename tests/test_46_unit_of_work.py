@@ -0,0 +1,193 @@
+"""Test the multi-table unit-of-work writer.
+
+These tests are database neutral: a SQLite database file stands in for the database 
+server. SQLite has no stored methods: test tables allocate Ids from a counter in place 
+of ``get_unique_id_block``.
+
+To run only tests in this module: pytest -m unit_of_work
+"""
+
+from http import HTTPStatus
+import pytest
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    ForeignKey,
+    event,
+    text,
+)
+
+from bh_database.core import Database
+from bh_database.base_table import WriteCapableTable
+from bh_database.constant import (
+    BH_REC_STATUS_FIELDNAME,
+    BH_RECORD_STATUS_NEW,
+    BH_RECORD_STATUS_MODIFIED,
+    BH_RECORD_STATUS_DELETED,
+)
+from bh_database.unit_of_work import (
+    TempId,
+    UnitOfWork,
+)
+
+class CounterIds:
+    next_id = 1
+
+    def _allocate_ids(self, count: int) -> list:
+        ids = list(range(CounterIds.next_id, CounterIds.next_id + count))
+        CounterIds.next_id += count
+        return ids
+
+class UowInvoice(CounterIds, WriteCapableTable):
+    __tablename__ = 'uow_invoice'
+
+    invoice_id = Column(Integer, primary_key=True, autoincrement=False)
+    customer = Column(String(32), nullable=False)
+
+class UowInvoiceLine(CounterIds, WriteCapableTable):
+    __tablename__ = 'uow_invoice_line'
+
+    line_id = Column(Integer, primary_key=True, autoincrement=False)
+    invoice_id = Column(Integer, ForeignKey('uow_invoice.invoice_id'), nullable=False)
+    qty = Column(Integer, nullable=False)
+
+@pytest.fixture
+def sqlite_invoices(tmp_path):
+    Database.disconnect()
+    Database.connect(f"sqlite:///{tmp_path / 'invoices.db'}", None)
+
+    @event.listens_for(Database.engine, 'connect')
+    def foreign_keys_on(dbapi_connection, connection_record):
+        dbapi_connection.execute('pragma foreign_keys=on')
+
+    # The connection opened on connecting has no foreign keys enforcement.
+    Database.engine.dispose()
+
+    UowInvoice.__table__.create(Database.engine)
+    UowInvoiceLine.__table__.create(Database.engine)
+
+    statements = []
+
+    @event.listens_for(Database.engine, 'before_cursor_execute')
+    def count_statements(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    yield statements
+
+    Database.disconnect()
+
+def new(**record) -> dict:
+    return dict(record, **{BH_REC_STATUS_FIELDNAME: BH_RECORD_STATUS_NEW})
+
+@pytest.mark.unit_of_work
+def test_unit_of_work_write(sqlite_invoices):
+    invoice_id = TempId()
+
+    uow = UnitOfWork()
+    # Detail records added first: tables are written in dependency order.
+    uow.add(UowInvoiceLine, [new(line_id=TempId(), invoice_id=invoice_id, qty=qty) for qty in range(1, 21)])
+    uow.add(UowInvoice, [new(invoice_id=invoice_id, customer='Georgi')])
+
+    UowInvoice().begin_transaction()
+    status = uow.write()
+    UowInvoice().finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+
+    assert invoice_id.value != None
+    assert status.data.uow_invoice_new_list == [{'invoice_id': invoice_id.value, 'customer': 'Georgi'}]
+    assert len(status.data.uow_invoice_line_new_list) == 20
+    assert all(line['invoice_id'] == invoice_id.value for line in status.data.uow_invoice_line_new_list)
+    assert all(BH_REC_STATUS_FIELDNAME not in line for line in status.data.uow_invoice_line_new_list)
+
+    """
+    One batched INSERT per table, 20 lines notwithstanding.
+    """
+    inserts = [statement for statement in sqlite_invoices if statement.lower().startswith('insert')]
+    assert len(inserts) == 2
+
+    status = UowInvoiceLine().run_select_sql(f"select count(*) lines from uow_invoice_line "
+                                             f"where invoice_id = {invoice_id.value}", True)
+    assert status.data[0]['lines'] == 20
+
+@pytest.mark.unit_of_work
+def test_unit_of_work_update(sqlite_invoices):
+    uow = UnitOfWork()
+    uow.add(UowInvoice, [new(invoice_id=100, customer='Georgi')])
+    uow.add(UowInvoiceLine, [new(line_id=200, invoice_id=100, qty=1),
+                             new(line_id=201, invoice_id=100, qty=2)])
+    status = uow.write()
+    UowInvoice().finalise_transaction(status)
+    assert status.code == HTTPStatus.OK.value
+
+    modified = {BH_REC_STATUS_FIELDNAME: BH_RECORD_STATUS_MODIFIED}
+
+    invoice_id = TempId()
+    uow = UnitOfWork()
+    uow.add(UowInvoice, [new(invoice_id=invoice_id, customer='Bezalel')])
+    # Existing lines are moved to the new invoice.
+    uow.add(UowInvoiceLine, [dict(line_id=200, invoice_id=invoice_id, qty=10, **modified),
+                             dict(line_id=201, invoice_id=invoice_id, qty=20, **modified)])
+    status = uow.write()
+    UowInvoice().finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+    assert status.data.uow_invoice_line_updated_list == [
+        {'line_id': 200, 'invoice_id': invoice_id.value, 'qty': 10},
+        {'line_id': 201, 'invoice_id': invoice_id.value, 'qty': 20}]
+
+    status = UowInvoiceLine().run_select_sql("select * from uow_invoice_line order by line_id", True)
+    assert list(status.data) == [{'line_id': 200, 'invoice_id': invoice_id.value, 'qty': 10},
+                           {'line_id': 201, 'invoice_id': invoice_id.value, 'qty': 20}]
+
+@pytest.mark.unit_of_work
+def test_unit_of_work_delete(sqlite_invoices):
+    uow = UnitOfWork()
+    uow.add(UowInvoice, [new(invoice_id=100, customer='Georgi')])
+    uow.add(UowInvoiceLine, [new(line_id=200, invoice_id=100, qty=1)])
+    status = uow.write()
+    UowInvoice().finalise_transaction(status)
+    assert status.code == HTTPStatus.OK.value
+
+    deleted = {BH_REC_STATUS_FIELDNAME: BH_RECORD_STATUS_DELETED}
+
+    uow = UnitOfWork()
+    # Parent added first: lines are deleted first, the foreign key holds.
+    uow.add(UowInvoice, [dict(invoice_id=100, **deleted)])
+    uow.add(UowInvoiceLine, [dict(line_id=200, **deleted)])
+    status = uow.write()
+    UowInvoice().finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+    assert status.data.uow_invoice_deleted_list == [{'invoice_id': 100}]
+    assert status.data.uow_invoice_line_deleted_list == [{'line_id': 200}]
+
+    status = UowInvoice().run_select_sql("select * from uow_invoice", True)
+    assert not status.has_data
+
+@pytest.mark.unit_of_work
+def test_unit_of_work_unresolved_temp_id(sqlite_invoices):
+    uow = UnitOfWork()
+    uow.add(UowInvoiceLine, [new(line_id=TempId(), invoice_id=TempId(), qty=1)])
+
+    status = uow.write()
+    UowInvoice().finalise_transaction(status)
+
+    assert status.code == HTTPStatus.INTERNAL_SERVER_ERROR.value
+    assert 'uow_invoice_line.invoice_id' in status.text
+
+@pytest.mark.unit_of_work
+def test_unit_of_work_violation(sqlite_invoices):
+    uow = UnitOfWork()
+    # Foreign key violation: invoice 999 does not exist.
+    uow.add(UowInvoiceLine, [new(line_id=TempId(), invoice_id=999, qty=1)])
+
+    status = uow.write()
+    UowInvoice().finalise_transaction(status)
+
+    assert status.code == HTTPStatus.INTERNAL_SERVER_ERROR.value
+
+    status = UowInvoiceLine().run_select_sql("select * from uow_invoice_line", True)
+    assert not status.has_data
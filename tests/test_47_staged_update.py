@@ -0,0 +1,96 @@
+"""Test temporary table staged bulk UPDATE of modified records.
+
+These tests are database neutral: a SQLite database file stands in for the database 
+server, SQLite supports ``UPDATE ... FROM`` as PostgreSQL does.
+
+To run only tests in this module: pytest -m staged_update
+"""
+
+from http import HTTPStatus
+import pytest
+
+from bh_database.constant import BH_RECORD_STATUS_MODIFIED
+
+from tests.employees import (
+    Employees,
+    tagged,
+)
+
+EMPLOYEES = 50
+
+@pytest.fixture
+def employees_count():
+    return EMPLOYEES
+
+@pytest.fixture(autouse=True)
+def staged_update_threshold(monkeypatch):
+    monkeypatch.setattr(Employees, 'staged_update_threshold', 10)
+
+def modified(**record) -> dict:
+    return tagged(record, BH_RECORD_STATUS_MODIFIED)
+
+@pytest.mark.staged_update
+def test_staged_update(sqlite_employees):
+    employees = Employees()
+
+    instance = employees.session.get(Employees, 1)
+    assert instance.last_name == 'Last 1'
+
+    data = [modified(emp_no=emp_no, last_name=f'New {emp_no}') for emp_no in range(1, 41)]
+    # A different set of columns: a separate group.
+    data.append(modified(emp_no=45, first_name='New 45', last_name='New 45'))
+
+    status = employees.write_to_database(data)
+
+    # Identity map instance was expired, and is reloaded.
+    assert instance.last_name == 'New 1'
+
+    employees.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+    assert len(status.data.employees_updated_list) == 41
+    assert status.data.employees_updated_list[0] == {'emp_no': 1, 'last_name': 'New 1'}
+
+    """
+    One set-based UPDATE per group of columns, not one per record.
+    """
+    updates = [statement for statement in sqlite_employees if statement.startswith('update employees')]
+    assert len(updates) == 2
+    assert all(' from bh_stage_' in statement for statement in updates)
+    assert sum(1 for statement in sqlite_employees if statement.startswith('drop table bh_stage_')) == 2
+
+    status = Employees().run_select_sql("select emp_no, first_name, last_name from employees "
+                                        "where emp_no in (40, 41, 45) order by emp_no", True)
+    assert list(status.data) == [
+        {'emp_no': 40, 'first_name': 'First 40', 'last_name': 'New 40'},
+        {'emp_no': 41, 'first_name': 'First 41', 'last_name': 'Last 41'},
+        {'emp_no': 45, 'first_name': 'New 45', 'last_name': 'New 45'}]
+
+@pytest.mark.staged_update
+def test_staged_update_below_threshold(sqlite_employees):
+    employees = Employees()
+
+    status = employees.write_to_database([modified(emp_no=emp_no, last_name=f'New {emp_no}') 
+                                          for emp_no in range(1, 6)])
+    employees.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+    assert not any('bh_stage_' in statement for statement in sqlite_employees)
+
+@pytest.mark.staged_update
+def test_temp_table_failure(sqlite_employees, monkeypatch):
+    """A failed DROP, e.g. in an aborted PostgreSQL transaction, does not hide the 
+    original exception.
+    """
+    employees = Employees()
+
+    def drop_temp_table(connection, temp_table):
+        raise RuntimeError('current transaction is aborted')
+
+    monkeypatch.setattr(employees, '_drop_temp_table', drop_temp_table)
+
+    with pytest.raises(ValueError, match='original'):
+        with employees._temp_table(['emp_no'], [{'emp_no': 1}]):
+            raise ValueError('original')
+
+    employees.rollback_transaction()
@@ -0,0 +1,145 @@
+"""Test synchronising a dataset with a table, writing only the differences.
+
+These tests are database neutral: a SQLite database file stands in for the database 
+server.
+
+To run only tests in this module: pytest -m sync_to_database
+"""
+
+from http import HTTPStatus
+import datetime
+import pytest
+
+from bh_database.id_generators import IdGenerator
+
+from tests.employees import (
+    Employees,
+    employee,
+)
+
+EMPLOYEES = 30
+
+class CounterIdGenerator(IdGenerator):
+    def __init__(self, next_id: int = 1000):
+        self.next_id = next_id
+
+    def allocate(self, table, count: int) -> list:
+        ids = list(range(self.next_id, self.next_id + count))
+        self.next_id += count
+        return ids
+
+@pytest.fixture
+def employees_count():
+    return EMPLOYEES
+
+@pytest.fixture(autouse=True)
+def pk_chunk_size(monkeypatch):
+    # Several chunks.
+    monkeypatch.setattr(Employees, 'pk_chunk_size', 7)
+
+def writes(statements: list) -> list:
+    return [statement for statement in statements 
+            if statement.startswith(('insert', 'update', 'delete'))]
+
+@pytest.mark.sync_to_database
+def test_sync_to_database_full_dataset(sqlite_employees):
+    feed = [employee(emp_no) for emp_no in range(1, EMPLOYEES + 1) if emp_no != 11]
+    feed[2]['last_name'] = 'Changed'
+    feed[5]['birth_date'] = datetime.date(1970, 1, 1)
+    feed.append(employee(100))
+
+    employees = Employees()
+    status = employees.sync_to_database(feed, delete=True)
+    employees.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+    assert list(status.data.employees_new_list) == [employee(100)]
+    # Only changed columns.
+    assert list(status.data.employees_updated_list) == [
+        {'emp_no': 3, 'last_name': 'Changed'}, 
+        {'emp_no': 6, 'birth_date': datetime.date(1970, 1, 1)}]
+    assert list(status.data.employees_deleted_list) == [{'emp_no': 11}]
+
+    # One INSERT, one UPDATE per set of changed columns, one DELETE.
+    assert len(writes(sqlite_employees)) == 4
+
+    status = Employees().run_select_sql("select emp_no, last_name from employees "
+                                        "where emp_no in (3, 11, 100) order by emp_no", True)
+    assert list(status.data) == [{'emp_no': 3, 'last_name': 'Changed'}, 
+                                 {'emp_no': 100, 'last_name': 'Last 100'}]
+
+    # Nothing has changed: nothing is written.
+    sqlite_employees.clear()
+
+    status = employees.sync_to_database(feed, delete=True)
+    employees.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+    assert writes(sqlite_employees) == []
+
+@pytest.mark.sync_to_database
+def test_sync_to_database_partial_dataset(sqlite_employees):
+    employees = Employees()
+    # A partial record, by a non primary key column: only rows with incoming keys are
+    # compared, other rows are not deleted.
+    status = employees.sync_to_database([{'emp_no': 5, 'first_name': 'First 5', 'gender': 'F'}], 
+                                        key='first_name')
+    employees.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+    assert list(status.data.employees_new_list) == []
+    assert list(status.data.employees_updated_list) == [{'emp_no': 5, 'gender': 'F'}]
+    assert list(status.data.employees_deleted_list) == []
+
+    status = Employees().run_select_sql("select count(*) total from employees", True)
+    assert status.data[0]['total'] == EMPLOYEES
+
+@pytest.mark.sync_to_database
+def test_sync_to_database_iso_dates(sqlite_employees):
+    # As posted by a web form, or decoded from JSON.
+    feed = [employee(emp_no, birth_date='1953-09-02', hire_date='1986-06-26') 
+            for emp_no in range(1, EMPLOYEES + 1)]
+
+    employees = Employees()
+    status = employees.sync_to_database(feed, delete=True)
+    employees.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+    assert list(status.data.employees_updated_list) == []
+    assert writes(sqlite_employees) == []
+
+    feed[3]['hire_date'] = '1990-01-31'
+
+    status = employees.sync_to_database(feed)
+    employees.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+    assert list(status.data.employees_updated_list) == [
+        {'emp_no': 4, 'hire_date': datetime.date(1990, 1, 31)}]
+
+@pytest.mark.sync_to_database
+def test_sync_to_database_new_without_pk(sqlite_employees, monkeypatch):
+    monkeypatch.setattr(Employees, 'id_generator', CounterIdGenerator())
+
+    record = employee(0)
+    del record['emp_no']
+
+    employees = Employees()
+    status = employees.sync_to_database([record, employee(2, last_name='Changed')])
+    employees.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+    assert [record['emp_no'] for record in status.data.employees_new_list] == [1000]
+    assert list(status.data.employees_updated_list) == [{'emp_no': 2, 'last_name': 'Changed'}]
+
+    status = Employees().run_select_sql("select count(*) total from employees", True)
+    assert status.data[0]['total'] == EMPLOYEES + 1
+
+@pytest.mark.sync_to_database
+def test_sync_to_database_failure(sqlite_employees):
+    employees = Employees()
+    # Violation: first_name is not nullable.
+    status = employees.sync_to_database([employee(3, first_name=None)])
+    employees.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.INTERNAL_SERVER_ERROR.value
@@ -0,0 +1,124 @@
+"""Test updating only the changed columns of modified records.
+
+These tests are database neutral: a SQLite database file stands in for the database 
+server.
+
+To run only tests in this module: pytest -m changed_only_update
+"""
+
+from http import HTTPStatus
+import pytest
+
+from bh_database.constant import BH_RECORD_STATUS_MODIFIED
+
+from tests.employees import (
+    Employees,
+    employee,
+    tagged,
+)
+
+EMPLOYEES = 20
+
+def modified(record: dict) -> dict:
+    return tagged(record, BH_RECORD_STATUS_MODIFIED)
+
+@pytest.fixture
+def employees_count():
+    return EMPLOYEES
+
+def updates(statements: list) -> list:
+    return [statement for statement in statements if statement.startswith('update')]
+
+@pytest.mark.changed_only_update
+def test_changed_only_fetched_originals(sqlite_employees):
+    data = [modified(employee(1, last_name='Changed 1')), 
+            modified(employee(2, last_name='Changed 2')), 
+            modified(employee(3, gender='F')), 
+            # Unchanged.
+            modified(employee(4)),
+            # No such row.
+            modified(employee(999, gender='F'))]
+
+    employees = Employees()
+    status = employees.write_to_database(data, changed_only=True)
+
+    assert status.code == HTTPStatus.OK.value
+    # As given.
+    assert len(status.data.employees_updated_list) == 5
+
+    employees.finalise_transaction(status)
+
+    # One statement per set of changed columns, with only the changed columns.
+    statements = updates(sqlite_employees)
+    assert len(statements) == 2
+    assert statements[0].startswith('update employees set last_name=?')
+    assert statements[1].startswith('update employees set gender=?')
+
+    status = Employees().run_select_sql("select emp_no, last_name, gender from employees "
+                                        "where emp_no <= 4 order by emp_no", True)
+    assert list(status.data) == [{'emp_no': 1, 'last_name': 'Changed 1', 'gender': 'M'}, 
+                                 {'emp_no': 2, 'last_name': 'Changed 2', 'gender': 'M'}, 
+                                 {'emp_no': 3, 'last_name': 'Last 3', 'gender': 'F'}, 
+                                 {'emp_no': 4, 'last_name': 'Last 4', 'gender': 'M'}]
+
+@pytest.mark.changed_only_update
+def test_changed_only_supplied_originals(sqlite_employees):
+    employees = Employees()
+    # Original of record 2 not supplied: fetched.
+    status = employees.write_to_database(
+        [modified(employee(1, first_name='Changed 1')), modified(employee(2, first_name='Changed 2'))], 
+        originals=[employee(1)])
+    employees.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+
+    selects = [statement for statement in sqlite_employees if statement.startswith('select')]
+    # Only record 2 is fetched.
+    assert len(selects) == 1
+    assert selects[0].endswith('where employees.emp_no in (?)')
+
+    statements = updates(sqlite_employees)
+    assert len(statements) == 1
+    assert statements[0].startswith('update employees set first_name=?')
+
+    status = Employees().run_select_sql("select first_name from employees "
+                                        "where emp_no <= 2 order by emp_no", True)
+    assert list(status.data) == [{'first_name': 'Changed 1'}, {'first_name': 'Changed 2'}]
+
+@pytest.mark.changed_only_update
+def test_changed_only_expires_instances(sqlite_employees):
+    employees = Employees()
+
+    instance = employees.session.get(Employees, 1)
+    assert instance.last_name == 'Last 1'
+
+    status = employees.write_to_database([modified(employee(1, last_name='Changed'))], 
+                                         changed_only=True)
+    assert status.code == HTTPStatus.OK.value
+    assert instance.last_name == 'Changed'
+
+    employees.finalise_transaction(status)
+
+@pytest.mark.changed_only_update
+def test_changed_only_iso_dates(sqlite_employees):
+    # As written by ./examples/flaskr, which converts dates to ISO format.
+    data = [modified(employee(1, birth_date='1953-09-02', hire_date='1986-06-26')), 
+            modified(employee(2, birth_date='1953-09-02', hire_date='1990-01-31')),
+            modified(employee(3, birth_date='1953-09-02', hire_date='1986-06-26', gender='F'))]
+
+    employees = Employees()
+    status = employees.write_to_database(data, changed_only=True)
+    employees.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+
+    # Unchanged dates are not written.
+    statements = updates(sqlite_employees)
+    assert len(statements) == 2
+    assert statements[0].startswith('update employees set hire_date=? where')
+    assert statements[1].startswith('update employees set gender=? where')
+
+    status = Employees().run_select_sql("select emp_no, hire_date, gender from employees "
+                                        "where emp_no <= 3 order by emp_no", True)
+    assert [(record['hire_date'], record['gender']) for record in status.data] == [
+        ('1986-06-26', 'M'), ('1990-01-31', 'M'), ('1986-06-26', 'F')]
@@ -0,0 +1,107 @@
+"""Test batched deletes: ``deleted`` records in write_to_database, and delete_by_pk.
+
+These tests are database neutral: a SQLite database file stands in for the database 
+server.
+
+To run only tests in this module: pytest -m delete
+"""
+
+from http import HTTPStatus
+import pytest
+
+from bh_database.constant import (
+    BH_RECORD_STATUS_NEW,
+    BH_RECORD_STATUS_MODIFIED,
+    BH_RECORD_STATUS_DELETED,
+    BH_DELETED_SUCCESSFUL_MSG,
+)
+
+from tests.employees import (
+    Employees,
+    employee,
+    tagged,
+)
+
+EMPLOYEES = 30
+
+@pytest.fixture
+def employees_count():
+    return EMPLOYEES
+
+@pytest.fixture(autouse=True)
+def pk_chunk_size(monkeypatch):
+    monkeypatch.setattr(Employees, 'pk_chunk_size', 7)
+
+def remaining() -> list:
+    status = Employees().run_select_sql("select emp_no from employees order by emp_no", True)
+    return [record['emp_no'] for record in status.data]
+
+def deletes(statements: list) -> list:
+    return [statement for statement in statements if statement.startswith('delete')]
+
+@pytest.mark.delete
+def test_write_to_database_mixed(sqlite_employees):
+    data = [tagged(employee(100), BH_RECORD_STATUS_NEW), 
+            tagged(employee(2, last_name='Changed'), BH_RECORD_STATUS_MODIFIED), 
+            tagged({'emp_no': 3}, BH_RECORD_STATUS_DELETED),
+            tagged({'emp_no': 4}, BH_RECORD_STATUS_DELETED)]
+
+    employees = Employees()
+    status = employees.write_to_database(data)
+    employees.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+    assert len(status.data.employees_new_list) == 1
+    assert len(status.data.employees_updated_list) == 1
+    assert list(status.data.employees_deleted_list) == [{'emp_no': 3}, {'emp_no': 4}]
+
+    assert len(deletes(sqlite_employees)) == 1
+
+    assert remaining() == [1, 2] + list(range(5, EMPLOYEES + 1)) + [100]
+
+@pytest.mark.delete
+def test_delete_by_pk_chunked(sqlite_employees):
+    employees = Employees()
+
+    instance = employees.session.get(Employees, 1)
+    assert instance in employees.session
+
+    status = employees.delete_by_pk(list(range(1, 21)) + [999])
+
+    assert status.code == HTTPStatus.OK.value
+    assert status.text == BH_DELETED_SUCCESSFUL_MSG
+    assert len(status.data.employees_deleted_list) == 21
+    # Deleted instances are removed from the session.
+    assert instance not in employees.session
+
+    employees.finalise_transaction(status)
+
+    # 21 keys in chunks of 7.
+    assert len(deletes(sqlite_employees)) == 3
+    assert remaining() == list(range(21, EMPLOYEES + 1))
+
+@pytest.mark.delete
+def test_delete_by_pk_temp_table(sqlite_employees, monkeypatch):
+    monkeypatch.setattr(Employees, 'delete_temp_table_threshold', 10)
+
+    employees = Employees()
+    status = employees.delete_by_pk(list(range(1, 21)))
+    employees.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+
+    # A single DELETE joined against the keys.
+    statements = deletes(sqlite_employees)
+    assert len(statements) == 1
+    assert 'exists' in statements[0]
+    assert remaining() == list(range(21, EMPLOYEES + 1))
+
+@pytest.mark.delete
+def test_delete_by_pk_rollback(sqlite_employees):
+    employees = Employees()
+    employees.begin_transaction()
+    status = employees.delete_by_pk([1, 2])
+    assert status.code == HTTPStatus.OK.value
+    employees.rollback_transaction()
+
+    assert remaining() == list(range(1, EMPLOYEES + 1))
@@ -0,0 +1,163 @@
+"""Test tables with composite primary keys: writes, deletes, keyed reads and batch loading.
+
+These tests are database neutral: a SQLite database file stands in for the database 
+server. Each test runs with row value predicates, and with ``OR`` of ``AND`` predicates.
+
+To run only tests in this module: pytest -m composite_keys
+"""
+
+from http import HTTPStatus
+import pytest
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    event,
+)
+
+from bh_database.core import Database
+from bh_database.base_table import WriteCapableTable
+from bh_database.constant import (
+    BH_RECORD_STATUS_NEW,
+    BH_RECORD_STATUS_MODIFIED,
+    BH_RECORD_STATUS_DELETED,
+)
+
+from tests.employees import tagged
+
+class DeptEmp(WriteCapableTable):
+    __tablename__ = 'ck_dept_emp'
+
+    emp_no = Column(Integer, primary_key=True, autoincrement=False)
+    dept_no = Column(String(4), primary_key=True)
+    title = Column(String(32), nullable=False)
+
+def dept_emp(emp_no: int, dept_no: str, title: str = None) -> dict:
+    return {'emp_no': emp_no, 'dept_no': dept_no, 'title': title or f'Title {emp_no} {dept_no}'}
+
+@pytest.fixture(params=[True, False], ids=['tuple_in', 'or_and'])
+def sqlite_dept_emp(request, tmp_path):
+    Database.disconnect()
+    Database.connect(f"sqlite:///{tmp_path / 'dept_emp.db'}", None)
+
+    DeptEmp.__table__.create(Database.engine)
+
+    session = Database.database_session()
+    for emp_no in range(1, 6):
+        for dept_no in ('d001', 'd002'): session.add(DeptEmp(**dept_emp(emp_no, dept_no)))
+    session.commit()
+    session.close()
+
+    statements = []
+
+    @event.listens_for(Database.engine, 'before_cursor_execute')
+    def record_statements(conn, cursor, statement, parameters, context, executemany):
+        statements.append(' '.join(statement.split()).lower())
+
+    DeptEmp.tuple_in = request.param
+    DeptEmp.pk_chunk_size = 3
+
+    yield statements
+
+    DeptEmp.tuple_in = True
+    DeptEmp.pk_chunk_size = 1000
+    DeptEmp.delete_temp_table_threshold = None
+    Database.disconnect()
+
+def rows() -> list:
+    status = DeptEmp().run_select_sql("select * from ck_dept_emp order by emp_no, dept_no", True)
+    return list(status.data) if status.has_data else []
+
+@pytest.mark.composite_keys
+def test_write_to_database(sqlite_dept_emp):
+    data = [tagged(dept_emp(9, 'd001'), BH_RECORD_STATUS_NEW), 
+            # Same emp_no, another dept_no: only this row changes.
+            tagged(dept_emp(1, 'd002', 'Changed'), BH_RECORD_STATUS_MODIFIED), 
+            tagged({'emp_no': 2, 'dept_no': 'd001'}, BH_RECORD_STATUS_DELETED)]
+
+    table = DeptEmp()
+    status = table.write_to_database(data)
+    table.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+    # No Id allocated.
+    assert list(status.data.ck_dept_emp_new_list) == [dept_emp(9, 'd001')]
+
+    result = rows()
+    assert dept_emp(1, 'd001') in result
+    assert dept_emp(1, 'd002', 'Changed') in result
+    assert dept_emp(2, 'd002') in result
+    assert dept_emp(9, 'd001') in result
+    assert all((row['emp_no'], row['dept_no']) != (2, 'd001') for row in result)
+    assert len(result) == 10
+
+@pytest.mark.composite_keys
+def test_write_to_database_changed_only(sqlite_dept_emp):
+    data = [tagged(dept_emp(emp_no, 'd001', 'Changed'), BH_RECORD_STATUS_MODIFIED) 
+            for emp_no in range(1, 6)]
+
+    table = DeptEmp()
+    status = table.write_to_database(data, changed_only=True)
+    table.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+
+    # Original values fetched in chunks of 3 keys.
+    selects = [statement for statement in sqlite_dept_emp if statement.startswith('select')]
+    assert len(selects) == 2
+
+    assert [row['title'] for row in rows() if row['dept_no'] == 'd001'] == ['Changed'] * 5
+    assert [row['title'] for row in rows() if row['dept_no'] == 'd002'] != ['Changed'] * 5
+
+@pytest.mark.composite_keys
+def test_get_many_by_pk(sqlite_dept_emp):
+    status = DeptEmp().get_many_by_pk([(3, 'd002'), (1, 'd001'), (9, 'd009'), (5, 'd001')], 
+                                      auto_session=True)
+
+    assert status.code == HTTPStatus.OK.value
+    assert list(status.data) == [dept_emp(3, 'd002'), dept_emp(1, 'd001'), dept_emp(5, 'd001')]
+
+    status = DeptEmp().get_by_pk(4, 'd002', auto_session=True)
+    assert list(status.data) == [dept_emp(4, 'd002')]
+
+@pytest.mark.composite_keys
+def test_batch_loader(sqlite_dept_emp):
+    loader = DeptEmp().batch_loader()
+    items = [loader.load((emp_no, 'd002')) for emp_no in range(1, 6)]
+
+    assert [item.value for item in items] == [dept_emp(emp_no, 'd002') for emp_no in range(1, 6)]
+
+@pytest.mark.composite_keys
+@pytest.mark.parametrize('threshold', [None, 2])
+def test_delete_by_pk(sqlite_dept_emp, threshold):
+    DeptEmp.delete_temp_table_threshold = threshold
+
+    table = DeptEmp()
+    status = table.delete_by_pk([(1, 'd001'), (1, 'd002'), (3, 'd001')])
+    table.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+    assert list(status.data.ck_dept_emp_deleted_list) == [
+        {'emp_no': 1, 'dept_no': 'd001'}, {'emp_no': 1, 'dept_no': 'd002'}, 
+        {'emp_no': 3, 'dept_no': 'd001'}]
+
+    assert len(rows()) == 7
+    assert all((row['emp_no'], row['dept_no']) not in [(1, 'd001'), (1, 'd002'), (3, 'd001')] 
+               for row in rows())
+
+@pytest.mark.composite_keys
+def test_sync_to_database(sqlite_dept_emp):
+    data = [dept_emp(emp_no, dept_no) for emp_no in range(1, 6) for dept_no in ('d001', 'd002') 
+            if (emp_no, dept_no) != (4, 'd001')]
+    data[0]['title'] = 'Changed'
+
+    table = DeptEmp()
+    # Full scan in chunks of 3 rows, after the last key of the previous chunk.
+    status = table.sync_to_database(data, delete=True)
+    table.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+    assert list(status.data.ck_dept_emp_updated_list) == [{'emp_no': 1, 'dept_no': 'd001', 'title': 'Changed'}]
+    assert list(status.data.ck_dept_emp_deleted_list) == [{'emp_no': 4, 'dept_no': 'd001'}]
+    assert len(rows()) == 9
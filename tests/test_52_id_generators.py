@@ -0,0 +1,313 @@
+"""Test Id generators: new Ids without the unique_id table.
+
+These tests are database neutral: a SQLite database file stands in for the database 
+server. SQLite has no sequences: a counter generator stands in for Id generators which 
+allocate Ids before inserting. SQLite supports ``INSERT ... RETURNING``, as PostgreSQL 
+does, for Ids assigned by the database on ``INSERT``.
+
+To run only tests in this module: pytest -m id_generators
+"""
+
+from http import HTTPStatus
+import os
+import time
+import signal
+import threading
+import pytest
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    ForeignKey,
+    event,
+)
+
+from bh_database.core import Database
+from bh_database.base_table import WriteCapableTable
+from bh_database.constant import (
+    BH_REC_STATUS_FIELDNAME,
+    BH_RECORD_STATUS_NEW,
+)
+from bh_database.id_generators import (
+    IdGenerator,
+    SequenceIdGenerator,
+    IdentityIdGenerator,
+    SnowflakeIdGenerator,
+    BH_WORKER_ID_ENV,
+)
+from bh_database.unit_of_work import (
+    TempId,
+    UnitOfWork,
+)
+
+class CounterIdGenerator(IdGenerator):
+    def __init__(self, next_id: int = 1000):
+        self.next_id = next_id
+        self.calls = 0
+
+    def allocate(self, table, count: int) -> list:
+        self.calls += 1
+
+        ids = list(range(self.next_id, self.next_id + count))
+        self.next_id += count
+        return ids
+
+class IdgOrder(WriteCapableTable):
+    __tablename__ = 'idg_order'
+
+    order_id = Column(Integer, primary_key=True)
+    customer = Column(String(32), nullable=False)
+
+    id_generator = IdentityIdGenerator()
+
+class IdgOrderLine(WriteCapableTable):
+    __tablename__ = 'idg_order_line'
+
+    line_id = Column(Integer, primary_key=True, autoincrement=False)
+    order_id = Column(Integer, ForeignKey('idg_order.order_id'), nullable=False)
+    qty = Column(Integer, nullable=False)
+
+    id_generator = CounterIdGenerator()
+
+@pytest.fixture
+def sqlite_orders(tmp_path):
+    Database.disconnect()
+    Database.connect(f"sqlite:///{tmp_path / 'orders.db'}", None)
+
+    @event.listens_for(Database.engine, 'connect')
+    def foreign_keys_on(dbapi_connection, connection_record):
+        dbapi_connection.execute('pragma foreign_keys=on')
+
+    Database.engine.dispose()
+
+    IdgOrder.__table__.create(Database.engine)
+    IdgOrderLine.__table__.create(Database.engine)
+
+    statements = []
+
+    @event.listens_for(Database.engine, 'before_cursor_execute')
+    def record_statements(conn, cursor, statement, parameters, context, executemany):
+        statements.append(' '.join(statement.split()).lower())
+
+    yield statements
+
+    Database.disconnect()
+
+def new(**record) -> dict:
+    return dict(record, **{BH_REC_STATUS_FIELDNAME: BH_RECORD_STATUS_NEW})
+
+@pytest.mark.id_generators
+def test_allocate_before_insert(sqlite_orders):
+    IdgOrderLine.id_generator.calls = 0
+
+    status = IdgOrder().write_to_database([new(order_id=1, customer='Georgi')])
+    IdgOrder().finalise_transaction(status)
+    assert status.code == HTTPStatus.OK.value
+
+    lines = IdgOrderLine()
+    status = lines.write_to_database([new(order_id=1, qty=qty) for qty in range(1, 6)] + 
+                                     [new(line_id=1, order_id=1, qty=6)])
+    lines.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+    # One block for all records without Ids, no get_unique_id calls.
+    assert IdgOrderLine.id_generator.calls == 1
+    assert not any('get_unique_id' in statement for statement in sqlite_orders)
+
+    line_ids = [line['line_id'] for line in status.data.idg_order_line_new_list]
+    assert line_ids[:5] == list(range(line_ids[0], line_ids[0] + 5))
+    assert line_ids[5] == 1
+
+@pytest.mark.id_generators
+def test_assigned_on_insert(sqlite_orders):
+    orders = IdgOrder()
+    status = orders.write_to_database([new(customer='Georgi'), new(customer='Bezalel'), 
+                                       new(order_id=100, customer='Parto')])
+    orders.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+    assert not any('get_unique_id' in statement for statement in sqlite_orders)
+
+    # Assigned Ids are in the result.
+    new_list = list(status.data.idg_order_new_list)
+    assert [order['customer'] for order in new_list] == ['Georgi', 'Bezalel', 'Parto']
+    assert all(isinstance(order['order_id'], int) for order in new_list)
+    assert new_list[2]['order_id'] == 100
+
+    status = IdgOrder().run_select_sql("select * from idg_order order by customer", True)
+    assert sorted((order['order_id'], order['customer']) for order in status.data) == \
+        sorted((order['order_id'], order['customer']) for order in new_list)
+
+@pytest.mark.id_generators
+def test_assigned_on_insert_none_id(sqlite_orders):
+    """A None Id is not inserted as an explicit NULL."""
+    orders = IdgOrder()
+    status = orders.write_to_database([new(order_id=None, customer='Georgi'), new(customer='Bezalel')])
+    orders.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+
+    inserts = [statement for statement in sqlite_orders if statement.startswith('insert into idg_order ')]
+    assert len(inserts) > 0
+    assert all(statement.startswith('insert into idg_order (customer)') for statement in inserts)
+
+    new_list = list(status.data.idg_order_new_list)
+    assert all(isinstance(order['order_id'], int) for order in new_list)
+    assert len(set(order['order_id'] for order in new_list)) == 2
+
+@pytest.mark.id_generators
+def test_unit_of_work_assigned_on_insert(sqlite_orders):
+    order_id = TempId()
+
+    uow = UnitOfWork()
+    uow.add(IdgOrderLine, [new(line_id=TempId(), order_id=order_id, qty=qty) for qty in (1, 2)])
+    uow.add(IdgOrder, [new(order_id=order_id, customer='Georgi')])
+
+    status = uow.write()
+    IdgOrder().finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+    assert order_id.value != None
+    assert status.data.idg_order_new_list == [{'customer': 'Georgi', 'order_id': order_id.value}]
+    assert all(line['order_id'] == order_id.value for line in status.data.idg_order_line_new_list)
+
+@pytest.mark.id_generators
+def test_sequence_name():
+    assert SequenceIdGenerator().sequence_name(IdgOrderLine()) == 'idg_order_line_line_id_seq'
+    assert SequenceIdGenerator('line_seq').sequence_name(IdgOrderLine()) == 'line_seq'
+
+@pytest.mark.id_generators
+def test_sequence_engine(sqlite_orders, tmp_path):
+    """MySQL: the sequence is updated on a dedicated engine, not on a connection of the pool
+    of Database.engine.
+    """
+    generator = SequenceIdGenerator()
+    engine = generator._SequenceIdGenerator__sequence_engine()
+
+    assert engine is not Database.engine
+    assert engine.url == Database.engine.url
+    assert engine.pool.size() == 1
+    assert generator._SequenceIdGenerator__sequence_engine() is engine
+
+    # Recreated after reconnecting.
+    Database.disconnect()
+    Database.connect(f"sqlite:///{tmp_path / 'orders.db'}", None)
+
+    assert generator._SequenceIdGenerator__sequence_engine() is not engine
+
+@pytest.mark.id_generators
+def test_snowflake_ids():
+    generator = SnowflakeIdGenerator(worker_id=7)
+
+    before = time.time_ns() // 1000000
+    ids = generator.allocate(None, 10000)
+    after = time.time_ns() // 1000000
+
+    # Unique, increasing, and more than a millisecond's worth of sequence.
+    assert len(set(ids)) == 10000
+    assert ids == sorted(ids)
+    assert all(0 < new_id < 2 ** 63 for new_id in ids)
+
+    timestamp, worker_id, sequence = generator.parse(ids[0])
+    assert before <= timestamp <= after
+    assert worker_id == 7
+    assert generator.parse(ids[-1])[0] > timestamp
+
+@pytest.mark.id_generators
+def test_snowflake_threads():
+    generator = SnowflakeIdGenerator(worker_id=1)
+    results = []
+
+    def generate():
+        results.extend(generator.next_id() for _ in range(2000))
+
+    threads = [threading.Thread(target=generate) for _ in range(8)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+
+    assert len(set(results)) == 16000
+
+@pytest.mark.id_generators
+def test_snowflake_worker_id(monkeypatch):
+    monkeypatch.setenv(BH_WORKER_ID_ENV, '12')
+    assert SnowflakeIdGenerator().worker_id == 12
+    # Configured beats environment.
+    assert SnowflakeIdGenerator(worker_id=lambda: 3).worker_id == 3
+
+    # Never derived: workers could share it.
+    monkeypatch.delenv(BH_WORKER_ID_ENV)
+    with pytest.raises(Exception) as e:
+        SnowflakeIdGenerator().next_id()
+    assert BH_WORKER_ID_ENV in str(e.value)
+
+    with pytest.raises(Exception) as e:
+        SnowflakeIdGenerator(worker_id=1024).next_id()
+    assert '1024' in str(e.value)
+
+@pytest.mark.id_generators
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='Requires os.fork()')
+def test_snowflake_fork():
+    generator = SnowflakeIdGenerator(worker_id=lambda: os.getpid() % 1024)
+    parent_worker_id = generator.worker_id
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if (pid == 0):
+        # Child: the worker Id is derived again.
+        os.write(write_fd, str(generator.worker_id).encode())
+        os._exit(0)
+
+    os.close(write_fd)
+    os.waitpid(pid, 0)
+    child_worker_id = int(os.read(read_fd, 32))
+    os.close(read_fd)
+
+    assert child_worker_id == pid % 1024
+    assert child_worker_id != parent_worker_id
+
+@pytest.mark.id_generators
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='Requires os.fork()')
+def test_snowflake_fork_lock_held():
+    generator = SnowflakeIdGenerator(worker_id=1)
+    generator.next_id()
+
+    read_fd, write_fd = os.pipe()
+    # As if another thread was generating an Id when forking.
+    with generator._lock:
+        pid = os.fork()
+        if (pid == 0):
+            # Child: the lock is new, not held.
+            signal.alarm(5)
+            os.write(write_fd, str(generator.next_id()).encode())
+            os._exit(0)
+
+    os.close(write_fd)
+    os.waitpid(pid, 0)
+    child_id = os.read(read_fd, 32)
+    os.close(read_fd)
+
+    assert generator.parse(int(child_id))[1] == 1
+
+@pytest.mark.id_generators
+def test_snowflake_write_to_database(sqlite_orders):
+    status = IdgOrder().write_to_database([new(order_id=1, customer='Georgi')])
+    IdgOrder().finalise_transaction(status)
+
+    IdgOrderLine.id_generator = SnowflakeIdGenerator(worker_id=5)
+    try:
+        sqlite_orders.clear()
+
+        lines = IdgOrderLine()
+        status = lines.write_to_database([new(order_id=1, qty=qty) for qty in range(1, 6)])
+        lines.finalise_transaction(status)
+    finally:
+        IdgOrderLine.id_generator = CounterIdGenerator()
+
+    assert status.code == HTTPStatus.OK.value
+    # No round trip for Ids.
+    assert not any(statement.startswith('select') for statement in sqlite_orders)
+
+    line_ids = [line['line_id'] for line in status.data.idg_order_line_new_list]
+    assert line_ids == sorted(line_ids)
+    assert len(set(line_ids)) == 5
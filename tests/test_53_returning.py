@@ -0,0 +1,106 @@
+"""Test reading back columns of written records: RETURNING, or a re-select by key.
+
+These tests are database neutral: a SQLite database file stands in for the database 
+server. SQLite supports ``INSERT ... RETURNING`` and ``UPDATE ... RETURNING``, as 
+PostgreSQL does. Without them, as on MySQL, written records are selected by key.
+
+To run only tests in this module: pytest -m returning
+"""
+
+from http import HTTPStatus
+import pytest
+
+from sqlalchemy import (
+    Column,
+    Computed,
+    Integer,
+    String,
+    event,
+    text,
+)
+
+from bh_database.core import Database
+from bh_database.base_table import WriteCapableTable
+from bh_database.constant import (
+    BH_RECORD_STATUS_NEW,
+    BH_RECORD_STATUS_MODIFIED,
+)
+
+from tests.employees import tagged
+
+class RetProduct(WriteCapableTable):
+    __tablename__ = 'ret_product'
+
+    product_id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(32), nullable=False)
+    # Set by the database.
+    code = Column(String(40), server_default=text("'P-NEW'"))
+    revision = Column(Integer, server_default=text('1'))
+    # Computed by the database.
+    upper_name = Column(String(32), Computed('upper(name)'))
+
+@pytest.fixture(params=[True, False], ids=['returning', 'reselect'])
+def sqlite_products(request, tmp_path):
+    Database.disconnect()
+    Database.connect(f"sqlite:///{tmp_path / 'products.db'}", None)
+
+    RetProduct.__table__.create(Database.engine)
+
+    dialect = Database.engine.dialect
+    supported = (dialect.insert_returning, dialect.update_returning)
+    if (not request.param): dialect.insert_returning = dialect.update_returning = False
+
+    statements = []
+
+    @event.listens_for(Database.engine, 'before_cursor_execute')
+    def record_statements(conn, cursor, statement, parameters, context, executemany):
+        statements.append(' '.join(statement.split()).lower())
+
+    yield request.param, statements
+
+    dialect.insert_returning, dialect.update_returning = supported
+    Database.disconnect()
+
+@pytest.mark.returning
+def test_returning_new(sqlite_products):
+    returning, statements = sqlite_products
+
+    products = RetProduct()
+    status = products.write_to_database(
+        [tagged({'product_id': idx, 'name': f'Product {idx}'}, BH_RECORD_STATUS_NEW) for idx in (1, 2)], 
+        returning=['code', 'revision', 'upper_name'])
+    products.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+    assert list(status.data.ret_product_new_list) == [
+        {'product_id': 1, 'name': 'Product 1', 'code': 'P-NEW', 'revision': 1, 'upper_name': 'PRODUCT 1'},
+        {'product_id': 2, 'name': 'Product 2', 'code': 'P-NEW', 'revision': 1, 'upper_name': 'PRODUCT 2'}]
+
+    selects = [statement for statement in statements if statement.startswith('select')]
+    assert len(selects) == (0 if returning else 1)
+
+@pytest.mark.returning
+@pytest.mark.parametrize('changed_only', [False, True])
+def test_returning_modified(sqlite_products, changed_only):
+    returning, statements = sqlite_products
+
+    products = RetProduct()
+    status = products.write_to_database(
+        [tagged({'product_id': idx, 'name': f'Product {idx}'}, BH_RECORD_STATUS_NEW) for idx in (1, 2)])
+    products.finalise_transaction(status)
+    assert status.code == HTTPStatus.OK.value
+
+    count = len(statements)
+    products = RetProduct()
+    status = products.write_to_database(
+        [tagged({'product_id': 1, 'name': 'Renamed'}, BH_RECORD_STATUS_MODIFIED)], 
+        changed_only=changed_only, returning=['upper_name'])
+    products.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+    assert list(status.data.ret_product_updated_list) == [{'product_id': 1, 'name': 'Renamed', 'upper_name': 'RENAMED'}]
+
+    # Per record UPDATE ... RETURNING, else a re-select after writing.
+    reselected = any(statement.startswith('select ret_product.product_id, ret_product.upper_name from') 
+                     for statement in statements[count:])
+    assert reselected == ((not returning) or changed_only)
@@ -0,0 +1,100 @@
+"""Test writing records in savepoint-isolated batches, with partial failures.
+
+These tests are database neutral: a SQLite database file stands in for the database 
+server. pysqlite's own transaction handling does not support savepoints: the fixture 
+lets SQLAlchemy handle transactions.
+
+To run only tests in this module: pytest -m savepoint_batches
+"""
+
+from http import HTTPStatus
+import pytest
+
+from sqlalchemy import event
+
+from bh_database.core import Database
+from bh_database.constant import (
+    BH_RECORD_STATUS_NEW,
+    BH_RECORD_STATUS_MODIFIED,
+    BH_RECORD_STATUS_DELETED,
+    BH_SAVED_SUCCESSFUL_MSG,
+)
+
+from tests.employees import (
+    Employees,
+    employee,
+    tagged,
+)
+
+@pytest.fixture
+def employees_count():
+    return 10
+
+@pytest.fixture
+def savepoints(sqlite_employees):
+    # https://docs.sqlalchemy.org/en/20/dialects/sqlite.html#serializable-isolation-savepoints-transactional-ddl
+    @event.listens_for(Database.engine, 'connect')
+    def do_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(Database.engine, 'begin')
+    def do_begin(conn):
+        conn.exec_driver_sql('BEGIN')
+
+    Database.engine.dispose()
+
+    savepoints = []
+
+    @event.listens_for(Database.engine, 'savepoint')
+    def count_savepoints(conn, name):
+        savepoints.append(name)
+
+    return savepoints
+
+def emp_nos() -> list:
+    status = Employees().run_select_sql("select emp_no from employees order by emp_no", True)
+    return [record['emp_no'] for record in status.data]
+
+@pytest.mark.savepoint_batches
+def test_savepoint_batches_partial_failure(savepoints):
+    data = [tagged(employee(emp_no), BH_RECORD_STATUS_NEW) for emp_no in range(100, 132)]
+    # Violations: duplicate primary key, and a null first name.
+    data[5] = tagged(employee(1), BH_RECORD_STATUS_NEW)
+    data[20] = tagged(employee(120, first_name=None), BH_RECORD_STATUS_NEW)
+    data.append(tagged(employee(2, last_name='Changed'), BH_RECORD_STATUS_MODIFIED))
+    data.append(tagged({'emp_no': 3}, BH_RECORD_STATUS_DELETED))
+
+    employees = Employees()
+    status = employees.write_to_database(data, batch_size=8)
+    employees.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+    assert status.text != BH_SAVED_SUCCESSFUL_MSG
+
+    failed = status.data.employees_failed_list
+    assert [entry['record']['emp_no'] for entry in failed] == [1, 120]
+    assert all(entry['error'] != '' for entry in failed)
+
+    assert len(status.data.employees_new_list) == 30
+    assert len(status.data.employees_updated_list) == 1
+    assert len(status.data.employees_deleted_list) == 1
+
+    # Valid records committed.
+    assert emp_nos() == [1, 2] + list(range(4, 11)) + [emp_no for emp_no in range(100, 132) if emp_no not in (105, 120)]
+
+    status = Employees().run_select_sql("select last_name from employees where emp_no = 2", True)
+    assert status.data[0]['last_name'] == 'Changed'
+
+@pytest.mark.savepoint_batches
+def test_savepoint_batches_all_valid(savepoints):
+    employees = Employees()
+    status = employees.write_to_database(
+        [tagged(employee(emp_no), BH_RECORD_STATUS_NEW) for emp_no in range(100, 120)], batch_size=8)
+    employees.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.OK.value
+    assert status.text == BH_SAVED_SUCCESSFUL_MSG
+    assert list(status.data.employees_failed_list) == []
+    # One savepoint per batch, no bisection.
+    assert len(savepoints) == 3
+    assert len(emp_nos()) == 30
@@ -0,0 +1,237 @@
+"""Test automatic retry of transactions failed on retryable errors.
+
+These tests are database neutral: a SQLite database file stands in for the database
+server. A second, plain sqlite3 connection holding the write lock stands in for a
+conflicting transaction: SQLite reports SQLITE_BUSY rather than waiting for the lock.
+
+To run only tests in this module: pytest -m retry
+"""
+
+from http import HTTPStatus
+import sqlite3
+import pytest
+
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from bh_apistatus.result_status import make_status
+
+from bh_database.core import Database
+from bh_database.constant import BH_RECORD_STATUS_NEW
+from bh_database.retry import (
+    RetryBudget,
+    RetryMetrics,
+    RetryPolicy,
+    retry_reason,
+    retry_transaction,
+)
+
+from tests.employees import (
+    Employees,
+    employee,
+    tagged,
+)
+
+class DriverError(Exception):
+    pass
+
+def driver_error(*args, **attributes) -> DriverError:
+    error = DriverError(*args)
+    for name, value in attributes.items(): setattr(error, name, value)
+    return error
+
+@pytest.fixture
+def blocker(sqlite_employees, tmp_path):
+    @event.listens_for(Database.engine, 'connect')
+    def do_connect(dbapi_connection, connection_record):
+        dbapi_connection.execute('pragma busy_timeout = 0')
+
+    Database.engine.dispose()
+
+    # Holds the write lock on begin_lock(), until release_lock().
+    blocker = sqlite3.connect(tmp_path / 'employees.db', timeout=0, isolation_level=None)
+
+    yield blocker
+
+    blocker.close()
+
+def begin_lock(blocker):
+    blocker.execute('begin immediate')
+
+def release_lock(blocker):
+    if blocker.in_transaction: blocker.execute('rollback')
+
+def save(emp_no: int):
+    employees = Employees()
+    employees.begin_transaction()
+    status = employees.write_to_database([tagged(employee(emp_no), BH_RECORD_STATUS_NEW)])
+    employees.finalise_transaction(status)
+    return status
+
+def count_employees() -> int:
+    status = Employees().run_select_sql("select count(*) as total from employees", True)
+    return status.data[0]['total']
+
+@pytest.mark.retry
+def test_retry_reason():
+    # PostgreSQL: psycopg2, psycopg (3).
+    assert retry_reason(OperationalError('', None, driver_error('', pgcode='40001'))) == 'serialization_failure'
+    assert retry_reason(OperationalError('', None, driver_error('', sqlstate='40P01'))) == 'deadlock'
+    assert retry_reason(OperationalError('', None, driver_error('', pgcode='23505'))) == None
+    # MySQL: mysqlclient and PyMySQL, mysql-connector-python.
+    assert retry_reason(OperationalError('', None, driver_error(1213, 'Deadlock found'))) == 'deadlock'
+    assert retry_reason(driver_error('Lock wait timeout exceeded', errno=1205)) == 'lock_wait_timeout'
+    assert retry_reason(OperationalError('', None, driver_error(1062, 'Duplicate entry'))) == None
+    # Not a database error.
+    assert retry_reason(ValueError('not a database error')) == None
+
+@pytest.mark.retry
+def test_retry_after_lock_released(blocker):
+    begin_lock(blocker)
+
+    delays = []
+    def sleep(seconds):
+        delays.append(seconds)
+        release_lock(blocker)
+
+    metrics = RetryMetrics()
+
+    @retry_transaction(max_attempts=3, base_delay=0.01, metrics=metrics, sleep=sleep)
+    def save_employee(emp_no: int):
+        return save(emp_no)
+
+    status = save_employee(1)
+
+    assert status.code == HTTPStatus.OK.value
+    assert count_employees() == 1
+
+    assert len(delays) == 1
+    assert 0 <= delays[0] <= 0.01
+    assert metrics.snapshot() == {'calls': 1, 'attempts': 2, 'retries': 1, 'recovered': 1,
+                                  'exhausted': 0, 'backoff_seconds': delays[0],
+                                  'reasons': {'busy': 1}}
+
+@pytest.mark.retry
+def test_retry_same_data(blocker):
+    """The documented usage: the same records are written again by the retry."""
+    begin_lock(blocker)
+
+    def save_employees(data: list):
+        employees = Employees()
+        employees.begin_transaction()
+        status = employees.write_to_database(data)
+        employees.finalise_transaction(status)
+        return status
+
+    data = [tagged(employee(emp_no), BH_RECORD_STATUS_NEW) for emp_no in (1, 2)]
+    metrics = RetryMetrics()
+    policy = RetryPolicy(metrics=metrics, sleep=lambda seconds: release_lock(blocker))
+
+    status = policy.run(save_employees, data)
+
+    assert status.code == HTTPStatus.OK.value
+    assert metrics.recovered == 1
+    assert count_employees() == 2
+    # Left as they were.
+    assert data == [tagged(employee(emp_no), BH_RECORD_STATUS_NEW) for emp_no in (1, 2)]
+
+@pytest.mark.retry
+def test_retry_exhausted(blocker):
+    begin_lock(blocker)
+
+    delays = []
+    metrics = RetryMetrics()
+    policy = RetryPolicy(max_attempts=4, base_delay=0.01, max_delay=0.02, metrics=metrics,
+                         sleep=delays.append)
+
+    status = policy.run(save, 1)
+
+    assert status.code == HTTPStatus.INTERNAL_SERVER_ERROR.value
+    assert metrics.attempts == 4
+    assert metrics.retries == 3
+    assert metrics.exhausted == 1
+    assert metrics.recovered == 0
+    # Exponential, capped.
+    assert [delay <= limit for delay, limit in zip(delays, [0.01, 0.02, 0.02])] == [True] * 3
+
+    release_lock(blocker)
+    assert count_employees() == 0
+
+@pytest.mark.retry
+def test_retry_not_retryable(blocker):
+    assert save(1).code == HTTPStatus.OK.value
+
+    metrics = RetryMetrics()
+    policy = RetryPolicy(metrics=metrics, sleep=lambda seconds: None)
+
+    # Duplicate primary key.
+    status = policy.run(save, 1)
+
+    assert status.code == HTTPStatus.INTERNAL_SERVER_ERROR.value
+    assert metrics.attempts == 1
+    assert metrics.retries == 0
+    assert metrics.exhausted == 0
+
+@pytest.mark.retry
+def test_retry_budget(blocker):
+    begin_lock(blocker)
+
+    metrics = RetryMetrics()
+    budget = RetryBudget(ratio=0.5, capacity=1)
+    policy = RetryPolicy(max_attempts=5, budget=budget, metrics=metrics, sleep=lambda seconds: None)
+
+    # The only retry held.
+    assert policy.run(save, 1).code == HTTPStatus.INTERNAL_SERVER_ERROR.value
+    assert metrics.retries == 1
+    assert budget.available < 1
+
+    # Half a retry earned: fails fast.
+    assert policy.run(save, 1).code == HTTPStatus.INTERNAL_SERVER_ERROR.value
+    assert metrics.retries == 1
+    assert metrics.attempts == 3
+    assert metrics.exhausted == 2
+
+    # Earned again.
+    release_lock(blocker)
+    assert policy.run(save, 1).code == HTTPStatus.OK.value
+    assert budget.available == 1
+
+@pytest.mark.retry
+def test_retry_raised_error(blocker):
+    calls = []
+    metrics = RetryMetrics()
+
+    @retry_transaction(metrics=metrics, sleep=lambda seconds: None)
+    def deadlocked():
+        calls.append(1)
+        if (len(calls) < 3): raise OperationalError('', None, driver_error(1213, 'Deadlock found'))
+        return make_status()
+
+    assert deadlocked().code == HTTPStatus.OK.value
+    assert len(calls) == 3
+    assert metrics.reasons == {'deadlock': 2}
+
+    @retry_transaction(metrics=metrics, sleep=lambda seconds: None)
+    def failed():
+        calls.append(1)
+        raise ValueError('not retryable')
+
+    with pytest.raises(ValueError):
+        failed()
+    assert len(calls) == 4
+
+@pytest.mark.retry
+def test_retry_within_transaction(blocker):
+    begin_lock(blocker)
+
+    metrics = RetryMetrics()
+    policy = RetryPolicy(metrics=metrics, sleep=lambda seconds: None)
+
+    employees = Employees()
+    employees.begin_transaction()
+    # Only part of the transaction: not retried.
+    status = policy.run(employees.write_to_database, [tagged(employee(1), BH_RECORD_STATUS_NEW)])
+    employees.finalise_transaction(status)
+
+    assert status.code == HTTPStatus.INTERNAL_SERVER_ERROR.value
+    assert metrics.calls == 0
@@ -0,0 +1,179 @@
+"""Test autocommit stand-alone reads, and read only transactions.
+
+These tests are database neutral: a SQLite database file stands in for the database
+server. MySQL and PostgreSQL specifics are tested against the driver adapters.
+
+To run only tests in this module: pytest -m read_paths
+"""
+
+from http import HTTPStatus
+import pytest
+
+from sqlalchemy import event
+
+from bh_database.core import Database
+from bh_database.drivers import (
+    DriverAdapter,
+    MySQLAdapter,
+    make_adapter,
+    tenant_schema,
+)
+
+from tests.employees import Employees
+
+SELECT_EMPLOYEES = "select emp_no, last_name from employees order by emp_no"
+
+@pytest.fixture
+def employees_count():
+    return 5
+
+@pytest.fixture
+def isolation_levels(sqlite_employees):
+    # Isolation level of each statement's connection.
+    isolation_levels = []
+
+    @event.listens_for(Database.engine, 'before_cursor_execute')
+    def record_isolation_level(conn, cursor, statement, parameters, context, executemany):
+        isolation_levels.append(conn.get_execution_options().get('isolation_level'))
+
+    return isolation_levels
+
+class FakeSession:
+    def __init__(self):
+        self.executed = []
+        self.execution_options = None
+
+    def execute(self, clause):
+        self.executed.append(str(clause))
+
+    def connection(self, execution_options=None):
+        self.execution_options = execution_options
+
+@pytest.mark.read_paths
+def test_read_paths_adapters():
+    assert DriverAdapter().autocommit_reads() == True
+
+    for drivername in ['mysql+mysqldb', 'mysql+mysqlconnector']:
+        adapter = make_adapter(drivername)
+
+        assert isinstance(adapter, MySQLAdapter)
+        assert adapter.autocommit_reads() == False
+
+        session = FakeSession()
+        adapter.begin_read_only(session)
+        assert session.executed == ["START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY"]
+
+    adapter = make_adapter('postgresql+psycopg2')
+    assert adapter.autocommit_reads() == True
+
+    session = FakeSession()
+    adapter.begin_read(session)
+    assert session.execution_options == {'isolation_level': 'AUTOCOMMIT'}
+
+    adapter.begin_read_only(session)
+    assert session.execution_options == {'isolation_level': 'REPEATABLE READ', 'postgresql_readonly': True}
+
+    # SET LOCAL search_path needs a transaction.
+    token = tenant_schema.set('tenant_0042')
+    try:
+        assert adapter.autocommit_reads() == False
+    finally:
+        tenant_schema.reset(token)
+
+    assert make_adapter('postgresql+psycopg2', pooler_mode=True).autocommit_reads() == False
+
+@pytest.mark.read_paths
+def test_read_paths_autocommit(isolation_levels, monkeypatch):
+    employees = Employees()
+
+    status = employees.run_select_sql(SELECT_EMPLOYEES, True)
+    assert status.code == HTTPStatus.OK.value
+    assert len(status.data) == 5
+
+    status = employees.select_columns('emp_no', where=Employees.emp_no < 3, auto_session=True)
+    assert [record['emp_no'] for record in status.data] == [1, 2]
+
+    status = employees.get_by_pk(3, auto_session=True)
+    assert status.data[0]['last_name'] == 'Last 3'
+
+    status = employees.get_many_by_pk([4, 5], auto_session=True)
+    assert [record['emp_no'] for record in status.data] == [4, 5]
+
+    assert isolation_levels == ['AUTOCOMMIT'] * 4
+    assert not employees.session.in_transaction()
+
+    # Within a transaction in progress.
+    isolation_levels.clear()
+    employees.begin_transaction()
+    employees.run_select_sql(SELECT_EMPLOYEES)
+    employees.run_select_sql(SELECT_EMPLOYEES, True)
+    assert isolation_levels == [None, None]
+
+    # Opted out. The pooled connection is back out of autocommit mode.
+    isolation_levels.clear()
+    monkeypatch.setattr(Employees, 'autocommit_reads', False)
+    employees.run_select_sql(SELECT_EMPLOYEES, True)
+    assert isolation_levels == [None]
+
+@pytest.mark.read_paths
+def test_read_paths_read_only_transaction(isolation_levels, monkeypatch):
+    began = []
+    begin_read_only = Database.adapter.begin_read_only
+    monkeypatch.setattr(Database.adapter, 'begin_read_only',
+                        lambda session: began.append(session) or begin_read_only(session))
+
+    employees = Employees()
+    with employees.read_only_transaction():
+        first = employees.run_select_sql(SELECT_EMPLOYEES)
+        assert employees.session.in_transaction()
+        second = employees.select_columns('emp_no', 'last_name', order_by=Employees.emp_no)
+
+    assert list(first.data) == list(second.data)
+    assert len(began) == 1
+    assert not employees.session.in_transaction()
+    assert isolation_levels == [None, None]
+
+    # Rolled back on exception.
+    with pytest.raises(ValueError):
+        with employees.read_only_transaction():
+            employees.run_select_sql(SELECT_EMPLOYEES)
+            raise ValueError('failed')
+
+    assert not employees.session.in_transaction()
+
+    # Within a transaction in progress: not ended.
+    employees.begin_transaction()
+    with employees.read_only_transaction():
+        employees.run_select_sql(SELECT_EMPLOYEES)
+
+    assert len(began) == 2
+    assert employees.session.in_transaction()
+    employees.rollback_transaction()
+
+@pytest.mark.read_paths
+def test_read_paths_paginate(sqlite_employees, monkeypatch):
+    began = []
+    begin_read_only = Database.adapter.begin_read_only
+    monkeypatch.setattr(Database.adapter, 'begin_read_only',
+                        lambda session: began.append(session) or begin_read_only(session))
+
+    paginator = Employees.query.order_by(Employees.emp_no).paginate(2, 2, read_only=True)
+
+    assert len(began) == 1
+    assert paginator.total_records == 5
+    assert [employee.last_name for employee in paginator.items] == ['Last 3', 'Last 4']
+
+    # Left in progress, instances attached: deferred columns load on access.
+    assert Employees.session.in_transaction()
+    paginator = Employees.query.columns('emp_no').order_by(Employees.emp_no).paginate(1, 2, read_only=True)
+    assert len(began) == 1
+    assert paginator.items[0].last_name == 'Last 1'
+    Employees().commit_transaction()
+
+    # The default.
+    paginator = Employees.query.order_by(Employees.emp_no).paginate(3, 2)
+
+    assert len(began) == 1
+    assert Employees.session.in_transaction()
+    assert paginator.items[0].emp_no == 5
+    Employees().rollback_transaction()
@@ -0,0 +1,258 @@
+"""Test set-based, batched and retried write paths against PostgreSQL.
+
+The SQLite tests of these write paths can not tell whether their SQL runs on the real
+database server: these tests run it on PostgreSQL. All writes are rolled back, or
+write values back unchanged.
+
+To run only tests in this module: pytest -m write_paths_postgresql
+
+To run all tests with PostgreSQL database: pytest -k _postgresql_ -v
+
+On postgresql() fixture:
+------------------------
+
+To ensure each test module can run independently and does not inadvertently produce
+any side effects on later tests, or tests in other modules, the postgresql() fixture
+needs to be called only once for this module.
+
+The postgresql() fixture establishes a connection to the underlying PostgreSQL 
+Employees Sample Database. This call is similar to applications establish database
+connection on starting up.
+"""
+
+from http import HTTPStatus
+import datetime
+import pytest
+
+from sqlalchemy import (
+    event,
+    select,
+    text,
+)
+from sqlalchemy.exc import DBAPIError
+
+from bh_database import core
+from bh_database.core import Database
+from bh_database.constant import (
+    BH_RECORD_STATUS_NEW,
+    BH_RECORD_STATUS_MODIFIED,
+)
+from bh_database.id_generators import SequenceIdGenerator
+from bh_database.retry import (
+    RetryMetrics,
+    RetryPolicy,
+)
+
+from tests.employees import (
+    Employees,
+    DeptEmp,
+    tagged,
+)
+
+# The first employees of the sample database.
+EMP_NOS = list(range(10001, 10021))
+
+@pytest.fixture
+def statements():
+    recorded = []
+
+    def record_statements(conn, cursor, statement, parameters, context, executemany):
+        recorded.append(' '.join(statement.split()).lower())
+
+    event.listen(Database.engine, 'before_cursor_execute', record_statements)
+    yield recorded
+    event.remove(Database.engine, 'before_cursor_execute', record_statements)
+
+def last_names(session) -> list:
+    return list(session.execute(select(Employees.last_name).where(Employees.emp_no.in_(EMP_NOS))
+                                .order_by(Employees.emp_no)).scalars())
+
+def dept_emp_keys(session) -> list:
+    return [tuple(row) for row in session.execute(select(DeptEmp.emp_no, DeptEmp.dept_no)
+            .where(DeptEmp.emp_no.in_(EMP_NOS)).order_by(DeptEmp.emp_no, DeptEmp.dept_no))]
+
+def new_employee() -> dict:
+    return tagged({'birth_date': datetime.date(1967, 9, 11), 'first_name': 'Be Hai', 'last_name': 'Nguyen',
+                   'gender': 'F', 'hire_date': datetime.date(2022, 9, 11)}, BH_RECORD_STATUS_NEW)
+
+@pytest.mark.write_paths_postgresql
+def test_postgresql_prepare(postgresql):
+    """Database connection management.
+
+    The purpose of this method is to establish the connection to the database.
+    The postgresql() method need to run FIRST and ONCE to establish the connection.
+    """
+
+    assert core.BaseSQLAlchemy.session != None
+
+@pytest.mark.write_paths_postgresql
+def test_postgresql_staged_update(statements, monkeypatch):
+    """More modified records than staged_update_threshold: a single UPDATE ... FROM
+    the staging temporary table.
+    """
+    monkeypatch.setattr(Employees, 'staged_update_threshold', 10)
+
+    employees = Employees()
+    originals = last_names(employees.session)
+
+    employees.begin_transaction()
+    try:
+        status = employees.write_to_database(
+            [tagged({'emp_no': emp_no, 'last_name': f'Staged {emp_no}'}, BH_RECORD_STATUS_MODIFIED) 
+             for emp_no in EMP_NOS])
+
+        assert status.code == HTTPStatus.OK.value
+        assert len(status.data.employees_updated_list) == len(EMP_NOS)
+
+        updates = [statement for statement in statements if statement.startswith('update employees')]
+        assert len(updates) == 1
+        assert ' from bh_stage_' in updates[0]
+        assert sum(1 for statement in statements if statement.startswith('drop table bh_stage_')) == 1
+
+        assert last_names(employees.session) == [f'Staged {emp_no}' for emp_no in EMP_NOS]
+    finally:
+        employees.rollback_transaction()
+
+    assert last_names(employees.session) == originals
+
+@pytest.mark.write_paths_postgresql
+def test_postgresql_temp_table_failure():
+    """A failed statement aborts the transaction: the original error is raised, not 
+    the failed DROP of the temporary table.
+    """
+    employees = Employees()
+
+    employees.begin_transaction()
+    try:
+        with pytest.raises(DBAPIError) as raised:
+            with employees._temp_table(['emp_no'], [{'emp_no': EMP_NOS[0]}]):
+                employees.session.execute(text("select 1 / 0"))
+
+        assert 'division by zero' in str(raised.value)
+    finally:
+        employees.rollback_transaction()
+
+@pytest.mark.write_paths_postgresql
+def test_postgresql_delete_by_pk_temp_table(statements, monkeypatch):
+    """More composite keys than delete_temp_table_threshold: a single DELETE joined against
+    the temporary table of keys.
+    """
+    monkeypatch.setattr(DeptEmp, 'delete_temp_table_threshold', 10)
+
+    dept_emp = DeptEmp()
+    keys = dept_emp_keys(dept_emp.session)
+    assert len(keys) > 10
+
+    dept_emp.begin_transaction()
+    try:
+        status = dept_emp.delete_by_pk(keys)
+
+        assert status.code == HTTPStatus.OK.value
+        assert len(status.data.dept_emp_deleted_list) == len(keys)
+
+        deletes = [statement for statement in statements if statement.startswith('delete from dept_emp')]
+        assert len(deletes) == 1
+        assert 'where exists (select bh_keys_' in deletes[0]
+        assert sum(1 for statement in statements if statement.startswith('drop table bh_keys_')) == 1
+
+        assert dept_emp_keys(dept_emp.session) == []
+    finally:
+        dept_emp.rollback_transaction()
+
+    assert dept_emp_keys(dept_emp.session) == keys
+
+@pytest.mark.write_paths_postgresql
+def test_postgresql_sequence_ids(monkeypatch):
+    """Ids with nextval(...) of sequence employees_emp_no_seq, created by function
+    bh_create_id_sequence(...) of ./sql_scripts/postgres/07_id_sequences.sql.
+    """
+    generator = SequenceIdGenerator()
+    monkeypatch.setattr(Employees, 'id_generator', generator)
+
+    employees = Employees()
+    employees.begin_transaction()
+    try:
+        # The sequence is created within the transaction, and dropped on rollback.
+        first_id = employees.session.execute(text("select bh_create_id_sequence('employees', 'emp_no')")).scalar()
+        # 499999 is the last emp_no in the original test data.
+        assert first_id > 499999
+
+        assert generator.allocate(employees, 3) == [first_id, first_id + 1, first_id + 2]
+
+        status = employees.write_to_database([new_employee()])
+
+        assert status.code == HTTPStatus.OK.value
+        assert status.data.employees_new_list[0]['emp_no'] == first_id + 3
+    finally:
+        employees.rollback_transaction()
+
+    assert Employees.query.filter(Employees.emp_no >= first_id).count() == 0
+
+@pytest.mark.write_paths_postgresql
+def test_postgresql_returning(statements):
+    """INSERT ... RETURNING and UPDATE ... RETURNING: the returned columns are set in the 
+    records, without a SELECT after writing.
+    """
+    employees = Employees()
+    assert employees._supports_returning() == True
+    assert employees._supports_returning(update=True) == True
+
+    new_record = dict(new_employee(), birth_date='1967-09-11', hire_date='2022-09-11')
+    data = [new_record, tagged({'emp_no': 10001, 'hire_date': '2000-01-31'}, BH_RECORD_STATUS_MODIFIED)]
+
+    employees.begin_transaction()
+    try:
+        status = employees.write_to_database(data, returning=['hire_date'])
+
+        assert status.code == HTTPStatus.OK.value
+        # As returned by the database: typed.
+        assert status.data.employees_new_list[0]['hire_date'] == datetime.date(2022, 9, 11)
+        assert status.data.employees_updated_list[0]['hire_date'] == datetime.date(2000, 1, 31)
+
+        assert any(statement.startswith('insert into employees') and ' returning ' in statement 
+                   for statement in statements)
+        assert any(statement.startswith('update employees') and ' returning ' in statement 
+                   for statement in statements)
+        assert not any(statement.startswith('select employees.emp_no, employees.hire_date') 
+                       for statement in statements)
+    finally:
+        employees.rollback_transaction()
+
+@pytest.mark.write_paths_postgresql
+def test_postgresql_retry_serialization_failure():
+    """A REPEATABLE READ transaction which updates a row changed by another transaction 
+    since its snapshot fails with serialization failure 40001, and is retried.
+    """
+    emp_no = EMP_NOS[0]
+    status = Employees().run_select_sql(f"select last_name from employees where emp_no = {emp_no}", True)
+    last_name = status.data[0]['last_name']
+
+    attempts = []
+
+    def save():
+        employees = Employees()
+        employees.begin_transaction()
+        employees.session.connection(execution_options={'isolation_level': 'REPEATABLE READ'})
+        # Takes the snapshot.
+        employees.session.execute(select(Employees.last_name).where(Employees.emp_no == emp_no))
+
+        attempts.append(1)
+        if (len(attempts) == 1):
+            # Another transaction, on another connection, changes the row.
+            with Database.engine.begin() as connection:
+                connection.execute(text("update employees set last_name = last_name where emp_no = :emp_no"), 
+                                   {'emp_no': emp_no})
+
+        # Written back unchanged.
+        status = employees.write_to_database(
+            [tagged({'emp_no': emp_no, 'last_name': last_name}, BH_RECORD_STATUS_MODIFIED)])
+        employees.finalise_transaction(status)
+        return status
+
+    metrics = RetryMetrics()
+    status = RetryPolicy(metrics=metrics, sleep=lambda seconds: None).run(save)
+
+    assert status.code == HTTPStatus.OK.value
+    assert len(attempts) == 2
+    assert metrics.reasons == {'serialization_failure': 1}
+    assert metrics.recovered == 1
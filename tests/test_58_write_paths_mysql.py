@@ -0,0 +1,256 @@
+"""Test set-based, batched and retried write paths against MySQL.
+
+The SQLite tests of these write paths can not tell whether their SQL runs on the real
+database server: these tests run it on MySQL. All writes are rolled back, or
+write values back unchanged.
+
+To run only tests in this module: pytest -m write_paths_mysql
+
+To run all tests with MySQL database: pytest -k _mysql_ -v
+
+On mysql() fixture:
+-------------------
+
+To ensure each test module can run independently and does not inadvertently produce
+any side effects on later tests, or tests in other modules, the mysql() fixture
+needs to be called only once for this module.
+
+The mysql() fixture establishes a connection to the underlying MySQL Employees Sample 
+Database. This call is similar to applications establish database connection on starting up.
+"""
+
+from http import HTTPStatus
+import datetime
+import pytest
+
+from sqlalchemy import (
+    event,
+    select,
+    text,
+)
+
+from bh_database import core
+from bh_database.core import Database
+from bh_database.constant import (
+    BH_RECORD_STATUS_NEW,
+    BH_RECORD_STATUS_MODIFIED,
+)
+from bh_database.id_generators import SequenceIdGenerator
+from bh_database.retry import (
+    RetryMetrics,
+    RetryPolicy,
+)
+
+from tests.employees import (
+    Employees,
+    DeptEmp,
+    tagged,
+)
+
+# The first employees of the sample database.
+EMP_NOS = list(range(10001, 10021))
+
+@pytest.fixture
+def statements():
+    recorded = []
+
+    def record_statements(conn, cursor, statement, parameters, context, executemany):
+        recorded.append(' '.join(statement.split()).lower())
+
+    event.listen(Database.engine, 'before_cursor_execute', record_statements)
+    yield recorded
+    event.remove(Database.engine, 'before_cursor_execute', record_statements)
+
+def last_names(session) -> list:
+    return list(session.execute(select(Employees.last_name).where(Employees.emp_no.in_(EMP_NOS))
+                                .order_by(Employees.emp_no)).scalars())
+
+def dept_emp_keys(session) -> list:
+    return [tuple(row) for row in session.execute(select(DeptEmp.emp_no, DeptEmp.dept_no)
+            .where(DeptEmp.emp_no.in_(EMP_NOS)).order_by(DeptEmp.emp_no, DeptEmp.dept_no))]
+
+def new_employee() -> dict:
+    return tagged({'birth_date': datetime.date(1967, 9, 11), 'first_name': 'Be Hai', 'last_name': 'Nguyen',
+                   'gender': 'F', 'hire_date': datetime.date(2022, 9, 11)}, BH_RECORD_STATUS_NEW)
+
+@pytest.mark.write_paths_mysql
+def test_mysql_prepare(mysql):
+    """Database connection management.
+
+    The purpose of this method is to establish the connection to the database.
+    The mysql() method need to run FIRST and ONCE to establish the connection.
+    """
+
+    assert core.BaseSQLAlchemy.session != None
+
+@pytest.mark.write_paths_mysql
+def test_mysql_staged_update(statements, monkeypatch):
+    """More modified records than staged_update_threshold: a single multiple-table UPDATE
+    joined against the staging temporary table.
+    """
+    monkeypatch.setattr(Employees, 'staged_update_threshold', 10)
+
+    employees = Employees()
+    originals = last_names(employees.session)
+
+    employees.begin_transaction()
+    try:
+        status = employees.write_to_database(
+            [tagged({'emp_no': emp_no, 'last_name': f'Staged {emp_no}'}, BH_RECORD_STATUS_MODIFIED) 
+             for emp_no in EMP_NOS])
+
+        assert status.code == HTTPStatus.OK.value
+        assert len(status.data.employees_updated_list) == len(EMP_NOS)
+
+        updates = [statement for statement in statements if statement.startswith('update employees')]
+        assert len(updates) == 1
+        assert updates[0].startswith('update employees, bh_stage_')
+        # DROP TABLE would implicitly commit.
+        assert sum(1 for statement in statements if statement.startswith('drop temporary table bh_stage_')) == 1
+
+        assert last_names(employees.session) == [f'Staged {emp_no}' for emp_no in EMP_NOS]
+    finally:
+        employees.rollback_transaction()
+
+    assert last_names(employees.session) == originals
+
+@pytest.mark.write_paths_mysql
+def test_mysql_delete_by_pk_temp_table(statements, monkeypatch):
+    """More composite keys than delete_temp_table_threshold: a single DELETE joined against
+    the temporary table of keys.
+    """
+    monkeypatch.setattr(DeptEmp, 'delete_temp_table_threshold', 10)
+
+    dept_emp = DeptEmp()
+    keys = dept_emp_keys(dept_emp.session)
+    assert len(keys) > 10
+
+    dept_emp.begin_transaction()
+    try:
+        status = dept_emp.delete_by_pk(keys)
+
+        assert status.code == HTTPStatus.OK.value
+        assert len(status.data.dept_emp_deleted_list) == len(keys)
+
+        deletes = [statement for statement in statements if statement.startswith('delete from dept_emp')]
+        assert len(deletes) == 1
+        assert 'where exists (select bh_keys_' in deletes[0]
+        assert sum(1 for statement in statements if statement.startswith('drop temporary table bh_keys_')) == 1
+
+        assert dept_emp_keys(dept_emp.session) == []
+    finally:
+        dept_emp.rollback_transaction()
+
+    assert dept_emp_keys(dept_emp.session) == keys
+
+@pytest.mark.write_paths_mysql
+def test_mysql_sequence_ids(statements, monkeypatch):
+    """Ids from row employees_emp_no_seq of table bh_sequence, created by procedure
+    bh_create_id_sequence(...) of ./sql_scripts/mysql/07_id_sequences.sql, updated with 
+    LAST_INSERT_ID(expr).
+    """
+    employees = Employees()
+
+    # Creates, or re-seeds, the row: Ids never go backward.
+    employees.begin_transaction()
+    employees.session.execute(text("call bh_create_id_sequence('employees', 'emp_no')"))
+    employees.commit_transaction()
+
+    generator = SequenceIdGenerator()
+    monkeypatch.setattr(Employees, 'id_generator', generator)
+
+    statements.clear()
+    employees.begin_transaction()
+    try:
+        ids = generator.allocate(employees, 3)
+        # 499999 is the last emp_no in the original test data.
+        assert ids[0] > 499999
+        assert ids == list(range(ids[0], ids[0] + 3))
+
+        # On the generator's own engine, not on a connection of Database.engine.
+        assert not any('bh_sequence' in statement for statement in statements)
+
+        status = employees.write_to_database([new_employee()])
+
+        assert status.code == HTTPStatus.OK.value
+        new_emp_no = status.data.employees_new_list[0]['emp_no']
+        assert new_emp_no > ids[2]
+    finally:
+        employees.rollback_transaction()
+        generator._engine.dispose()
+
+    assert Employees.query.filter(Employees.emp_no == new_emp_no).count() == 0
+
+@pytest.mark.write_paths_mysql
+def test_mysql_returning(statements):
+    """MySQL has no RETURNING: the returning columns are selected after writing, with 
+    a single SELECT ... WHERE pk IN (...).
+    """
+    employees = Employees()
+    assert employees._supports_returning() == False
+    assert employees._supports_returning(update=True) == False
+
+    new_record = dict(new_employee(), birth_date='1967-09-11', hire_date='2022-09-11')
+    data = [new_record, tagged({'emp_no': 10001, 'hire_date': '2000-01-31'}, BH_RECORD_STATUS_MODIFIED)]
+
+    employees.begin_transaction()
+    try:
+        status = employees.write_to_database(data, returning=['hire_date'])
+
+        assert status.code == HTTPStatus.OK.value
+        # As selected from the database: typed.
+        assert status.data.employees_new_list[0]['hire_date'] == datetime.date(2022, 9, 11)
+        assert status.data.employees_updated_list[0]['hire_date'] == datetime.date(2000, 1, 31)
+
+        assert not any(' returning ' in statement for statement in statements)
+        reselects = [statement for statement in statements 
+                     if statement.startswith('select employees.emp_no, employees.hire_date')]
+        assert len(reselects) == 1
+    finally:
+        employees.rollback_transaction()
+
+@pytest.mark.write_paths_mysql
+def test_mysql_retry_lock_wait_timeout():
+    """An UPDATE of a row locked by another transaction fails with lock wait timeout 1205, 
+    and is retried once the lock is released.
+    """
+    emp_no = EMP_NOS[0]
+    status = Employees().run_select_sql(f"select last_name from employees where emp_no = {emp_no}", True)
+    last_name = status.data[0]['last_name']
+
+    # Another transaction, on another connection, holds the row lock.
+    blocker = Database.engine.connect()
+    try:
+        blocker.execute(text("select emp_no from employees where emp_no = :emp_no for update"), 
+                        {'emp_no': emp_no})
+
+        delays = []
+        def sleep(seconds):
+            delays.append(seconds)
+            blocker.rollback()
+
+        def save():
+            employees = Employees()
+            employees.begin_transaction()
+            # Seconds, default is 50.
+            employees.session.execute(text("set session innodb_lock_wait_timeout = 1"))
+
+            # Written back unchanged.
+            status = employees.write_to_database(
+                [tagged({'emp_no': emp_no, 'last_name': last_name}, BH_RECORD_STATUS_MODIFIED)])
+            employees.finalise_transaction(status)
+            return status
+
+        metrics = RetryMetrics()
+        status = RetryPolicy(metrics=metrics, sleep=sleep).run(save)
+
+        assert status.code == HTTPStatus.OK.value
+        assert len(delays) == 1
+        assert metrics.reasons == {'lock_wait_timeout': 1}
+        assert metrics.recovered == 1
+    finally:
+        blocker.close()
+
+        # Pooled connections keep the session lock wait timeout.
+        Employees().session.close()
+        Database.engine.dispose()